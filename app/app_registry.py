@@ -0,0 +1,176 @@
+"""
+Registro de aplicaciones del portafolio
+=======================================
+
+Streamlit vuelve a ejecutar ``main.py`` en cada interacción. Antes, cada
+rerun volvía a importar el archivo completo de la aplicación seleccionada
+(``spec_from_file_location`` + ``exec_module``), incluyendo sus imports y
+su código de nivel superior. Este registro importa cada aplicación una sola
+vez por proceso y guarda el módulo junto con la función que la ejecuta.
+
+- Las aplicaciones se importan con su nombre de archivo desde ``app/apps``
+  y quedan en ``sys.modules`` (compartidas entre sesiones).
+- En cada rerun sólo se crea la instancia de la aplicación y se llama a
+  ``run()``, como antes.
+- La recarga en caliente (``reload``) sólo está permitida en modo
+  desarrollo (variable de entorno ``DEBUG_MODE=true``).
+- Se registran el tiempo de importación y la latencia de cada ejecución.
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+APPS_DIR = Path(__file__).parent / "apps"
+
+# Modo desarrollo: habilita la recarga en caliente y el panel de tiempos
+DEV_MODE = os.getenv('DEBUG_MODE', 'false').lower() in ('1', 'true', 'yes')
+
+# Clases de aplicación, en el orden en que se buscan dentro del módulo
+APP_CLASSES = [
+    'BudgetAnalysisApp',
+    'WaterQualityApp',
+    'CO2EmissionsApp',
+    'DemographicsApp',
+    'FirestoreFeedbackApp',  # Nueva versión con Firestore
+    'FeedbackApp',           # Versión anterior
+    'ServicesDisplay'        # Servicios Profesionales
+]
+
+# Ejecuciones recientes que se conservan por aplicación
+RUN_HISTORY = 50
+
+
+def resolve_app_factory(module):
+    """
+    Obtiene la función que ejecuta una aplicación a partir de su módulo.
+
+    Busca primero una clase de aplicación conocida (se instancia en cada
+    rerun) y luego las funciones ``run()``, ``main()`` o el objeto ``app``.
+
+    Returns:
+        Función sin argumentos que ejecuta la aplicación, o None
+    """
+    for class_name in APP_CLASSES:
+        app_class = getattr(module, class_name, None)
+        if app_class is not None:
+            return lambda: app_class().run()
+    if hasattr(module, 'run'):
+        return module.run
+    if hasattr(module, 'main'):
+        return module.main
+    if hasattr(module, 'app'):
+        # Asegurarse de que app es una función o un objeto llamable
+        return module.app if callable(module.app) else module.app.run
+    return None
+
+
+class LoadedApp:
+    """Módulo de una aplicación ya importado, con su función de ejecución y sus tiempos"""
+
+    def __init__(self, module, path, load_seconds):
+        self.module = module
+        self.factory = resolve_app_factory(module)
+        self.path = path
+        self.mtime = path.stat().st_mtime
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.runs = 0
+        self.run_seconds = deque(maxlen=RUN_HISTORY)
+
+    @property
+    def is_stale(self):
+        """True si el archivo cambió después de importarlo"""
+        try:
+            return self.path.stat().st_mtime != self.mtime
+        except OSError:
+            return False
+
+    def stats(self):
+        """Resumen de tiempos (segundos) de la aplicación"""
+        recent = list(self.run_seconds)
+        return {
+            'file': self.path.name,
+            'load_seconds': self.load_seconds,
+            'runs': self.runs,
+            'last_run_seconds': recent[-1] if recent else None,
+            'mean_run_seconds': sum(recent) / len(recent) if recent else None,
+            'stale': self.is_stale
+        }
+
+
+class AppRegistry:
+    """Importa cada aplicación una vez por proceso y mide sus ejecuciones"""
+
+    def __init__(self, apps_dir=APPS_DIR, dev_mode=DEV_MODE):
+        self.apps_dir = Path(apps_dir)
+        self.dev_mode = dev_mode
+        self._apps = {}
+        self._lock = threading.Lock()
+
+    def _import(self, app_file, reload=False):
+        """Importa (o recarga) el módulo de una aplicación"""
+        # Agregar el directorio de apps al path para imports relativos
+        if str(self.apps_dir) not in sys.path:
+            sys.path.insert(0, str(self.apps_dir))
+
+        path = self.apps_dir / app_file
+        module_name = path.stem
+        start = time.perf_counter()
+        module = sys.modules.get(module_name)
+        if module is not None and reload:
+            module = importlib.reload(module)
+        else:
+            module = importlib.import_module(module_name)
+        return LoadedApp(module, path, time.perf_counter() - start)
+
+    def load(self, app_file):
+        """Módulo de la aplicación, importándolo sólo la primera vez"""
+        loaded = self._apps.get(app_file)
+        if loaded is None:
+            with self._lock:
+                loaded = self._apps.get(app_file)
+                if loaded is None:
+                    loaded = self._import(app_file)
+                    self._apps[app_file] = loaded
+        return loaded
+
+    def reload(self, app_file):
+        """Vuelve a importar una aplicación (sólo en modo desarrollo)"""
+        if not self.dev_mode:
+            raise RuntimeError("La recarga en caliente sólo está disponible en modo desarrollo (DEBUG_MODE=true)")
+        with self._lock:
+            loaded = self._import(app_file, reload=app_file in self._apps)
+            self._apps[app_file] = loaded
+        return loaded
+
+    def run(self, app_file):
+        """
+        Ejecuta una aplicación y registra la latencia de la ejecución.
+
+        Returns:
+            False si el módulo no expone una clase o función de aplicación
+        """
+        loaded = self.load(app_file)
+        if loaded.factory is None:
+            return False
+        start = time.perf_counter()
+        try:
+            loaded.factory()
+        finally:
+            # También ante st.rerun()/st.stop(), que se propagan como excepciones
+            loaded.runs += 1
+            loaded.run_seconds.append(time.perf_counter() - start)
+        return True
+
+    def stats(self):
+        """Tiempos de todas las aplicaciones importadas"""
+        return [loaded.stats() for loaded in list(self._apps.values())]
+
+
+# Instancia global (una por proceso: este módulo no se re-ejecuta en cada rerun)
+app_registry = AppRegistry()
@@ -12,55 +12,67 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import urllib.request
-import json
+import os
+import sys
+from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 
+# Agregar el directorio de apps al path para imports de modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from modules.budget_cube import BudgetCube, build_budget_cube
+from modules.ckan_fetcher import CKANDatastoreFetcher, CKANFetchError
+from modules.concentration import ConcentrationMetrics, compute_concentration
+from modules.curve_simplify import simplify_curve
+from modules.method_cache import cached_method, frames_fingerprint
+from modules.reallocation import ReallocationSimulator
+
 # Función global cacheada
 @st.cache_data(ttl=3600)  # 1 hora de caché
-def fetch_budget_data_cached(api_url: str, resource_id: str) -> Optional[pd.DataFrame]:
+def fetch_budget_data_cached(api_url: str, resource_id: str) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
     """
     Función cacheada para obtener datos del presupuesto
     
+    Descarga el recurso completo por páginas concurrentes (antes una sola
+    consulta con limit=10000 truncaba el recurso). La huella de los datos
+    se calcula aquí, una vez por carga, y no en cada rerun.
+    
     Args:
         api_url: URL base de la API
         resource_id: ID del recurso a consultar
         
     Returns:
-        DataFrame procesado o None si hay error
+        Tuple con el DataFrame procesado y su huella, o (None, None) si hay error
     """
+    fetcher = CKANDatastoreFetcher(api_url)
     try:
-        url = f"{api_url}?resource_id={resource_id}&limit=10000"
-        headers = {'User-Agent': 'Mozilla/5.0', 'Accept': 'application/json'}
-        
         with st.spinner('Consultando datos oficiales...'):
-            request = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(request) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                
-                if not data.get('success'):
-                    st.error('La API no retornó datos válidos')
-                    return None
-                
-                records = data.get('result', {}).get('records', [])
-                if not records:
-                    st.error('No se encontraron registros')
-                    return None
-                df = pd.DataFrame(records)
-                df['Monto Pesos'] = pd.to_numeric(df['Monto Pesos'], errors='coerce')
-                df['Monto Dolar'] = pd.to_numeric(df['Monto Dolar'], errors='coerce')
-                return df.fillna(0)
-                
+            df = fetcher.fetch_frame(resource_id)
+        
+        if df.empty:
+            st.error('No se encontraron registros')
+            return None, None
+        df['Monto Pesos'] = pd.to_numeric(df['Monto Pesos'], errors='coerce')
+        df['Monto Dolar'] = pd.to_numeric(df['Monto Dolar'], errors='coerce')
+        df = df.fillna(0)
+        return df, frames_fingerprint(df, sample_rows=None)
+    
+    except CKANFetchError as e:
+        st.error(f'La API no retornó datos válidos: {str(e)}')
+        return None, None
     except Exception as e:
         st.error(f"Error al obtener datos: {str(e)}")
-        return None
+        return None, None
+    finally:
+        fetcher.close()
 
 # Configuración de la aplicación
 @dataclass
 class AppConfig:
     """Configuración global de la aplicación"""
-    API_URL: str = 'https://datos.gob.cl/api/3/action/datastore_search'
+    # BUDGET_API_URL permite apuntar a un datastore local (scripts/ckan_stub_server.py)
+    API_URL: str = os.getenv('BUDGET_API_URL', 'https://datos.gob.cl/api/3/action/datastore_search')
     RESOURCE_ID: str = '372b0680-d5f0-4d53-bffa-7997cf6e6512'
     CACHE_TTL: int = 3600  # 1 hora
     NIVELES: List[str] = ('Partida', 'Capitulo', 'Programa', 'Subtitulo')
@@ -73,6 +85,7 @@ class BudgetAnalysisApp:
         self.config = AppConfig()
         self.load_custom_styles()
         self.data: Optional[pd.DataFrame] = None
+        self.data_fingerprint: Optional[str] = None
         self.nivel_actual: Optional[str] = None
         self.insights: Dict[str, str] = self.get_insights_dict() # La configuración de la página se maneja en main.py
 
@@ -133,12 +146,36 @@ class BudgetAnalysisApp:
 
     def fetch_budget_data(self) -> Optional[pd.DataFrame]:
         """
-        Obtiene datos del presupuesto usando la función cacheada
+        Obtiene datos del presupuesto usando la función cacheada y los deja
+        en ``self.data`` junto a su huella (clave del cubo y las métricas)
         
         Returns:
             DataFrame procesado o None si hay error
         """
-        return fetch_budget_data_cached(self.config.API_URL, self.config.RESOURCE_ID)
+        self.data, self.data_fingerprint = fetch_budget_data_cached(
+            self.config.API_URL, self.config.RESOURCE_ID
+        )
+        return self.data
+
+    @cached_method(ttl=3600)
+    def get_budget_cube(self) -> BudgetCube:
+        """
+        Cubo jerárquico de los datos cargados, construido una vez por conjunto de datos
+        
+        Returns:
+            BudgetCube con los agregados por nivel y por camino jerárquico
+        """
+        return build_budget_cube(self.data, self.config.NIVELES)
+
+    @cached_method(ttl=3600)
+    def get_concentration(self) -> Dict[str, ConcentrationMetrics]:
+        """
+        Métricas de concentración de todos los niveles, calculadas una vez por conjunto de datos
+        
+        Returns:
+            Diccionario nivel -> ConcentrationMetrics (HHI, Gini, Theil, top-k y curva acumulada)
+        """
+        return compute_concentration(self.get_budget_cube(), self.config.NIVELES)
 
     def get_insights_dict(self) -> Dict[str, str]:
         """
@@ -174,43 +211,37 @@ class BudgetAnalysisApp:
             """
         }
 
-    def calculate_concentration_metrics(self, df: pd.DataFrame, nivel: str) -> Tuple[float, float, float]:
+    def calculate_concentration_metrics(self, nivel: str) -> Tuple[float, float, float]:
         """
         Calcula métricas de concentración presupuestaria
         
+        El HHI (simplificado, normalizado entre 0 y 1) es la suma de las
+        participaciones porcentuales al cuadrado dividida por 10000; los top
+        son el porcentaje del total en las 3 y 10 entidades de mayor monto.
+        Lee el resultado cacheado de ``get_concentration()`` (ver
+        modules/concentration.py).
+        
         Args:
-            df: DataFrame con los datos
             nivel: Nivel jerárquico a analizar
             
         Returns:
             Tuple con índice de concentración, % top 3 y % top 10
         """
-        grouped = df.groupby(nivel)['Monto Pesos'].sum().sort_values(ascending=False)
-        total = grouped.sum()
-        
-        # Calcular métricas
-        top_3_pct = (grouped.head(3).sum() / total) * 100
-        top_10_pct = (grouped.head(10).sum() / total) * 100
-        
-        # Índice de concentración (HHI simplificado)
-        shares = (grouped / total) * 100
-        hhi = (shares ** 2).sum() / 10000  # Normalizado entre 0 y 1
-        
-        return hhi, top_3_pct, top_10_pct
+        return self.get_concentration()[nivel].as_tuple()
 
-    def plot_budget_evolution(self, df: pd.DataFrame, nivel: str) -> go.Figure:
+    def plot_budget_evolution(self, cube: BudgetCube, nivel: str) -> go.Figure:
         """
         Crea visualización de tendencias y patrones
         
         Args:
-            df: DataFrame con los datos
+            cube: Cubo jerárquico de los datos
             nivel: Nivel jerárquico a analizar
             
         Returns:
             Figura de Plotly
         """
         # Simulamos evolución temporal (ya que los datos son de un punto en el tiempo)
-        grouped = df.groupby(nivel)['Monto Pesos'].sum().sort_values(ascending=False).head(5)
+        grouped = cube.totals(nivel).head(5)
         
         # Crear matriz de datos simulados
         periods = ['2021', '2022', '2023', '2024', '2025']
@@ -248,23 +279,22 @@ class BudgetAnalysisApp:
         
         return fig
 
-    def plot_distribution_analysis(self, df: pd.DataFrame, nivel: str) -> go.Figure:
+    def plot_distribution_analysis(self, metrics: ConcentrationMetrics, nivel: str) -> go.Figure:
         """
         Crea visualización de distribución y desigualdad
         
         Args:
-            df: DataFrame con los datos
+            metrics: Métricas de concentración del nivel (con su curva acumulada)
             nivel: Nivel jerárquico a analizar
             
         Returns:
             Figura de Plotly
         """
-        grouped = df.groupby(nivel)['Monto Pesos'].sum().sort_values(ascending=False)
-        total_entities = len(grouped)
-        cumsum = grouped.cumsum() / grouped.sum() * 100
+        # Línea de perfecta igualdad (una recta: bastan sus extremos)
+        perfect_equality = [0, 100]
         
-        # Línea de perfecta igualdad
-        perfect_equality = np.linspace(0, 100, total_entities)
+        # Curva con presupuesto de puntos; se conservan los extremos, el codo y el top 3 / top 10
+        lorenz_x, lorenz_y = simplify_curve(metrics.lorenz_x, metrics.lorenz_y, keep=(2, 9))
         
         # Crear figura
         fig = go.Figure()
@@ -272,7 +302,7 @@ class BudgetAnalysisApp:
         # Agregar línea de perfecta igualdad
         fig.add_trace(
             go.Scatter(
-                x=np.linspace(0, 100, total_entities),
+                x=perfect_equality,
                 y=perfect_equality,
                 name='Igualdad Perfecta',
                 line=dict(color='gray', dash='dash'),
@@ -283,8 +313,8 @@ class BudgetAnalysisApp:
         # Agregar curva de Lorenz
         fig.add_trace(
             go.Scatter(
-                x=np.linspace(0, 100, total_entities),
-                y=cumsum.values,
+                x=lorenz_x,
+                y=lorenz_y,
                 name='Distribución Real',
                 line=dict(color='firebrick'),
                 fill='tonexty',
@@ -293,7 +323,7 @@ class BudgetAnalysisApp:
         )
         
         fig.update_layout(
-            title=f'Análisis de Desigualdad en la Distribución - {nivel}',
+            title=f'Análisis de Desigualdad en la Distribución - {nivel} (Gini: {metrics.gini:.2f})',
             height=500,
             showlegend=True,
             legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
@@ -304,17 +334,55 @@ class BudgetAnalysisApp:
         
         return fig
 
-    def show_concentration_metrics(self, df: pd.DataFrame, nivel: str) -> None:
+    def plot_budget_hierarchy(self, cube: BudgetCube, chart_type: str = 'sunburst') -> go.Figure:
+        """
+        Crea visualización jerárquica navegable (clic en un sector para bajar de nivel)
+        
+        Args:
+            cube: Cubo jerárquico de los datos
+            chart_type: 'sunburst' o 'treemap'
+            
+        Returns:
+            Figura de Plotly
+        """
+        nodes = cube.hierarchy()
+        is_leaf = (nodes['depth'] == nodes['depth'].max()).to_numpy()
+        
+        # Con branchvalues='remainder' el tamaño de un padre es la suma de sus hijos;
+        # el monto real de cada nodo va en customdata para el hover
+        trace_args = dict(
+            ids=nodes.index,
+            parents=nodes['parent'],
+            labels=nodes['nivel'] + ' ' + nodes['code'].astype(str),
+            values=np.where(is_leaf, nodes['pesos_sum'].clip(lower=0), 0),
+            branchvalues='remainder',
+            customdata=np.column_stack([nodes['pesos_sum'], nodes['pesos_sum'] / cube.total_pesos * 100]),
+            hovertemplate="%{label}<br>Monto: $%{customdata[0]:,.0f}<br>"
+                          "%{customdata[1]:.1f}% del total<extra></extra>",
+            maxdepth=3
+        )
+        trace = go.Treemap(**trace_args) if chart_type == 'treemap' else go.Sunburst(**trace_args)
+        
+        fig = go.Figure(trace)
+        fig.update_layout(
+            title='Estructura del Presupuesto por Partida, Capítulo, Programa y Subtítulo',
+            height=600,
+            margin=dict(t=60, l=10, r=10, b=10)
+        )
+        
+        return fig
+
+    def show_concentration_metrics(self, nivel: str) -> None:
         """
         Muestra métricas de concentración
         
         Args:
-            df: DataFrame con los datos
-            nivel: Nivel jerárquico actual
+            nivel: Nivel jerárquico seleccionado
         """
-        hhi, top_3_pct, top_10_pct = self.calculate_concentration_metrics(df, nivel)
+        hhi, top_3_pct, top_10_pct = self.calculate_concentration_metrics(nivel)
+        metrics = self.get_concentration()[nivel]
         
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4, col5 = st.columns(5)
         
         with col1:
             st.markdown(f"""
@@ -342,6 +410,24 @@ class BudgetAnalysisApp:
                     <div class="help-text">Porcentaje del presupuesto en top 10</div>
                 </div>
             """, unsafe_allow_html=True)
+        
+        with col4:
+            st.markdown(f"""
+                <div class="metric-container">
+                    <div class="metric-label">Coeficiente de Gini</div>
+                    <div class="metric-value">{metrics.gini:.2f}</div>
+                    <div class="help-text">0 es igualdad perfecta, 1 desigualdad máxima</div>
+                </div>
+            """, unsafe_allow_html=True)
+        
+        with col5:
+            st.markdown(f"""
+                <div class="metric-container">
+                    <div class="metric-label">Índice de Theil</div>
+                    <div class="metric-value">{metrics.theil:.2f}</div>
+                    <div class="help-text">0 es igualdad perfecta, máximo ln({metrics.n})</div>
+                </div>
+            """, unsafe_allow_html=True)
 
     def show_insights(self, nivel: str) -> None:
         """
@@ -358,21 +444,155 @@ class BudgetAnalysisApp:
                 </div>
             """, unsafe_allow_html=True)
 
-    def show_detailed_data(self, df: pd.DataFrame, nivel: str) -> None:
+    def get_reallocation_state(self, cube: BudgetCube, nivel: str) -> Dict[str, Any]:
+        """
+        Estado del simulador de reasignaciones de la sesión para un nivel
+        
+        Se crea una vez por sesión, nivel y conjunto de datos; las
+        transferencias aplicadas se conservan entre reruns.
+        
+        Args:
+            cube: Cubo jerárquico de los datos
+            nivel: Nivel jerárquico seleccionado
+            
+        Returns:
+            Diccionario con el simulador, las transferencias aplicadas y la huella de los datos
+        """
+        key = f'budget_simulator_{nivel}'
+        state = st.session_state.get(key)
+        if state is None or state['fingerprint'] != self.data_fingerprint:
+            totals = cube.level(nivel)['pesos_sum']
+            state = {
+                'fingerprint': self.data_fingerprint,
+                'simulator': ReallocationSimulator(totals.to_numpy(), totals.index),
+                'transfers': []
+            }
+            st.session_state[key] = state
+        return state
+
+    def _apply_transfer(self, state: Dict[str, Any], nivel: str) -> None:
+        """Callback del botón Aplicar: registra la transferencia y vuelve el slider a 0"""
+        origen = st.session_state[f'sim_from_{nivel}']
+        destino = st.session_state[f'sim_to_{nivel}']
+        monto = state['simulator'].value(origen) * st.session_state[f'sim_pct_{nivel}'] / 100
+        if monto and origen != destino:
+            state['simulator'].transfer(origen, destino, monto)
+            state['transfers'].append((origen, destino, monto))
+        st.session_state[f'sim_pct_{nivel}'] = 0
+
+    def _undo_transfer(self, state: Dict[str, Any], nivel: str) -> None:
+        """Callback del botón Deshacer: revierte la última transferencia aplicada"""
+        if state['transfers']:
+            state['simulator'].undo(2)
+            state['transfers'].pop()
+        st.session_state[f'sim_pct_{nivel}'] = 0
+
+    def _reset_transfers(self, state: Dict[str, Any], nivel: str) -> None:
+        """Callback del botón Reiniciar: vuelve a los montos originales"""
+        state['simulator'].reset()
+        state['transfers'].clear()
+        st.session_state[f'sim_pct_{nivel}'] = 0
+
+    def show_reallocation_simulator(self, cube: BudgetCube, nivel: str, base: ConcentrationMetrics) -> None:
+        """
+        Muestra el simulador de reasignaciones ("qué pasaría si")
+        
+        Cada movimiento del slider aplica la transferencia al simulador, lee
+        las métricas y la deshace, en O(log n) (ver modules/reallocation.py).
+        
+        Args:
+            cube: Cubo jerárquico de los datos
+            nivel: Nivel jerárquico seleccionado
+            base: Métricas de concentración de los datos originales
+        """
+        with st.expander('🔀 Simulador de Reasignación', expanded=False):
+            st.markdown(f"""
+                <div class="help-text">
+                Mueva montos entre entidades del nivel {nivel} y observe cómo cambian las
+                métricas de concentración respecto del presupuesto original.
+                </div>
+            """, unsafe_allow_html=True)
+            
+            state = self.get_reallocation_state(cube, nivel)
+            simulator = state['simulator']
+            labels = cube.totals(nivel).index.tolist()
+            
+            col1, col2, col3 = st.columns([2, 2, 3])
+            with col1:
+                origen = st.selectbox(
+                    'Desde:',
+                    labels,
+                    key=f'sim_from_{nivel}',
+                    format_func=lambda x: f"{x} (${simulator.value(x):,.0f})"
+                )
+            with col2:
+                destino = st.selectbox(
+                    'Hacia:',
+                    [label for label in labels if label != origen],
+                    key=f'sim_to_{nivel}',
+                    format_func=lambda x: f"{x} (${simulator.value(x):,.0f})"
+                )
+            with col3:
+                pct = st.slider(
+                    'Porcentaje del monto de origen a transferir',
+                    0, 100, 0,
+                    key=f'sim_pct_{nivel}'
+                )
+            monto = simulator.value(origen) * pct / 100
+            
+            # Vista previa: aplicar, medir y deshacer
+            changes = len(simulator.history)
+            if destino is not None:
+                simulator.transfer(origen, destino, monto)
+            metrics = simulator.metrics()
+            simulator.undo(len(simulator.history) - changes)
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.button('✅ Aplicar transferencia', on_click=self._apply_transfer, args=(state, nivel),
+                          disabled=destino is None or monto == 0, use_container_width=True)
+            with col2:
+                st.button('↩️ Deshacer última', on_click=self._undo_transfer, args=(state, nivel),
+                          disabled=not state['transfers'], use_container_width=True)
+            with col3:
+                st.button('🔄 Reiniciar', on_click=self._reset_transfers, args=(state, nivel),
+                          disabled=not state['transfers'], use_container_width=True)
+            
+            # Métricas simuladas con la diferencia respecto del presupuesto original
+            cols = st.columns(5)
+            for col, (label, value, original, fmt) in zip(cols, [
+                ('Índice de Concentración', metrics.hhi, base.hhi, '{:.3f}'),
+                ('Concentración Top 3', metrics.top_3_pct, base.top_3_pct, '{:.2f}%'),
+                ('Concentración Top 10', metrics.top_10_pct, base.top_10_pct, '{:.2f}%'),
+                ('Coeficiente de Gini', metrics.gini, base.gini, '{:.3f}'),
+                ('Índice de Theil', metrics.theil, base.theil, '{:.3f}')
+            ]):
+                delta = value - original
+                with col:
+                    # Sin transferencias la diferencia es sólo redondeo: no mostrarla
+                    st.metric(label, fmt.format(value), fmt.format(delta) if round(delta, 6) else None,
+                              delta_color='inverse')
+            
+            if state['transfers']:
+                st.dataframe(
+                    pd.DataFrame(state['transfers'], columns=['Desde', 'Hacia', 'Monto']).style.format({
+                        'Monto': '${:,.0f}'
+                    }),
+                    use_container_width=True
+                )
+
+    def show_detailed_data(self, cube: BudgetCube, nivel: str) -> None:
         """
         Muestra tabla detallada de datos
         
         Args:
-            df: DataFrame con los datos
+            cube: Cubo jerárquico de los datos
             nivel: Nivel jerárquico seleccionado
         """
         with st.expander('📑 Ver Datos Detallados', expanded=False):
             # Preparar datos
-            detailed_df = (df.groupby(nivel)
-                         .agg({
-                             'Denominacion': 'first',
-                             'Monto Pesos': ['sum', 'count', 'mean']
-                         })
+            detailed_df = (cube.level(nivel)
+                         [['Denominacion', 'pesos_sum', 'pesos_count', 'pesos_mean']]
                          .round(2))
             
             detailed_df.columns = ['Denominación', 'Monto Total', 'N° Items', 'Monto Promedio']
@@ -436,6 +656,9 @@ class BudgetAnalysisApp:
         df = self.fetch_budget_data()
         
         if df is not None:
+            cube = self.get_budget_cube()
+            concentration = self.get_concentration()
+            
             # Selector de nivel jerárquico
             nivel = st.selectbox(
                 'Seleccione nivel jerárquico para análisis:',
@@ -448,7 +671,8 @@ class BudgetAnalysisApp:
             
             # Métricas de concentración
             st.subheader('📊 Métricas de Concentración')
-            self.show_concentration_metrics(df, nivel)
+            self.show_concentration_metrics(nivel)
+            self.show_reallocation_simulator(cube, nivel, concentration[nivel])
             
             # Análisis de distribución
             st.subheader('📈 Análisis de Distribución')
@@ -456,19 +680,33 @@ class BudgetAnalysisApp:
             
             with col1:
                 st.plotly_chart(
-                    self.plot_distribution_analysis(df, nivel),
+                    self.plot_distribution_analysis(concentration[nivel], nivel),
                     use_container_width=True
                 )
             
             with col2:
                 st.plotly_chart(
-                    self.plot_budget_evolution(df, nivel),
+                    self.plot_budget_evolution(cube, nivel),
                     use_container_width=True
                 )
             
+            # Exploración jerárquica
+            st.subheader('🧭 Exploración Jerárquica')
+            chart_type = st.radio(
+                'Tipo de gráfico:',
+                ['sunburst', 'treemap'],
+                format_func=lambda x: 'Sunburst' if x == 'sunburst' else 'Treemap',
+                horizontal=True,
+                help="Haga clic en un sector para ver su detalle en el nivel siguiente"
+            )
+            st.plotly_chart(
+                self.plot_budget_hierarchy(cube, chart_type),
+                use_container_width=True
+            )
+            
             # Datos detallados
             st.subheader('📑 Datos Detallados')
-            self.show_detailed_data(df, nivel)
+            self.show_detailed_data(cube, nivel)
             
             # Nota informativa
             st.markdown("""
@@ -479,6 +717,7 @@ class BudgetAnalysisApp:
                 - Los gráficos son interactivos - use el zoom y hover para más detalles
                 - La evolución temporal es una simulación con fines ilustrativos
                 - El índice de concentración está normalizado entre 0 y 1
+                - Gini y Theil se calculan sobre los montos totales de cada entidad del nivel
                 </div>
             """, unsafe_allow_html=True)
             
@@ -8,13 +8,9 @@ invernadero en Chile.
 """
 
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import folium
-from streamlit_folium import st_folium
 from datetime import datetime
 import os
 import sys
@@ -23,84 +19,86 @@ from pathlib import Path
 # Importar configuraciones y utilidades modularizadas
 from modules.config import CHILE_REGIONS, MAP_CONFIG
 from modules.emissions_config import CO2_EMISSION_SECTORS, POLLUTANT_TYPES, EMISSION_SCALES, EMISSION_COLORS
-from modules.data_loaders import load_emissions_data
-from modules.emissions import create_demo_emissions_data, process_real_emissions_data, classify_emission_level, get_emission_color
-from modules.map_utils import create_interactive_emissions_map
+from modules.data_loaders import load_emissions_data, load_emissions_aggregates
+from modules.emissions import create_demo_emissions_data, classify_emission_level, get_emission_color
+from modules.map_utils import create_interactive_emissions_map, render_map
 
 # CSS personalizado
-st.markdown("""
-<style>
-    .main-header {
-        background: linear-gradient(90deg, #dc2626, #ef4444);
-        padding: 2rem;
-        border-radius: 10px;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
+def load_custom_css():
+    """Carga el CSS personalizado de la aplicación de emisiones"""
+    st.markdown("""
+    <style>
+        .main-header {
+            background: linear-gradient(90deg, #dc2626, #ef4444);
+            padding: 2rem;
+            border-radius: 10px;
+            text-align: center;
+            margin-bottom: 2rem;
+        }
     
-    .main-header h1 {
-        color: white;
-        margin: 0;
-        font-size: 2.5rem;
-    }
+        .main-header h1 {
+            color: white;
+            margin: 0;
+            font-size: 2.5rem;
+        }
     
-    .main-header p {
-        color: rgba(255,255,255,0.9);
-        margin: 0.5rem 0 0 0;
-        font-size: 1.1rem;
-    }
+        .main-header p {
+            color: rgba(255,255,255,0.9);
+            margin: 0.5rem 0 0 0;
+            font-size: 1.1rem;
+        }
     
-    .metric-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        border-left: 4px solid #dc2626;
-        margin-bottom: 1rem;
-    }
+        .metric-card {
+            background: white;
+            padding: 1.5rem;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+            border-left: 4px solid #dc2626;
+            margin-bottom: 1rem;
+        }
     
-    .insight-box {
-        background: #fef2f2;
-        border: 1px solid #fecaca;
-        border-radius: 8px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
+        .insight-box {
+            background: #fef2f2;
+            border: 1px solid #fecaca;
+            border-radius: 8px;
+            padding: 1rem;
+            margin: 1rem 0;
+        }
     
-    .insight-box h4 {
-        color: #dc2626;
-        margin-top: 0;
-    }
+        .insight-box h4 {
+            color: #dc2626;
+            margin-top: 0;
+        }
     
-    .warning-box {
-        background: #fffbeb;
-        border: 1px solid #fed7aa;
-        border-radius: 8px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
+        .warning-box {
+            background: #fffbeb;
+            border: 1px solid #fed7aa;
+            border-radius: 8px;
+            padding: 1rem;
+            margin: 1rem 0;
+        }
     
-    .warning-box h4 {
-        color: #ea580c;
-        margin-top: 0;
-    }
+        .warning-box h4 {
+            color: #ea580c;
+            margin-top: 0;
+        }
     
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 2px;
-    }
+        .stTabs [data-baseweb="tab-list"] {
+            gap: 2px;
+        }
     
-    .stTabs [data-baseweb="tab"] {
-        background-color: #f8fafc;
-        border-radius: 8px 8px 0 0;
-        border: 1px solid #e2e8f0;
-    }
+        .stTabs [data-baseweb="tab"] {
+            background-color: #f8fafc;
+            border-radius: 8px 8px 0 0;
+            border: 1px solid #e2e8f0;
+        }
     
-    .stTabs [aria-selected="true"] {
-        background-color: #dc2626;
-        color: white;
-    }
-</style>
-""", unsafe_allow_html=True)
+        .stTabs [aria-selected="true"] {
+            background-color: #dc2626;
+            color: white;
+        }
+    </style>
+    """, unsafe_allow_html=True)
 
 class CO2EmissionsApp:
     """Aplicación principal para análisis de emisiones CO2"""
@@ -116,16 +114,11 @@ class CO2EmissionsApp:
             # Intentar cargar datos del archivo CSV del RETC
             data_path = Path.cwd().parent / 'data' / 'raw' / 'retc_emisiones_aire_2023.csv'
             
-            if data_path.exists():                # Leer CSV con parámetros específicos para el formato RETC
-                raw_data = pd.read_csv(
-                    data_path,
-                    sep=';',  # Separador punto y coma
-                    encoding='utf-8',  # Encoding UTF-8
-                    low_memory=False,  # Para archivos grandes
-                    on_bad_lines='skip'  # Saltar líneas mal formateadas (pandas 1.3+)
-                )                # Procesar datos reales para crear estructura similar a demo_data
-                self.data = process_real_emissions_data(raw_data)
-                st.success(f"✅ Datos reales cargados: {len(raw_data):,} registros del RETC 2023")
+            if data_path.exists():
+                # Ingesta por bloques: agrega región/sector/fuente/contaminante sin cargar el CSV completo
+                self.data = load_emissions_aggregates(data_path)
+                if self.data is None:
+                    raise ValueError("No se pudieron procesar los datos del RETC")
                 return True
             else:
                 st.info("📊 Usando datos de demostración basados en el análisis del RETC 2023")
@@ -618,12 +611,13 @@ class CO2EmissionsApp:
             emissions_map = create_interactive_emissions_map(
                 map_data,
                 region_col='region',
-                emissions_col='emisiones_co2_ton'
+                emissions_col='emisiones_co2_ton',
+                return_artifact=True
             )
             
             if emissions_map:
                 # Mostrar el mapa
-                map_data = st_folium(
+                map_data = render_map(
                     emissions_map, 
                     width=800, 
                     height=600
@@ -705,6 +699,9 @@ class CO2EmissionsApp:
     
     def run(self):
         """Ejecuta la aplicación principal"""
+        # CSS en cada rerun: el módulo se importa una sola vez
+        load_custom_css()
+        
         # Cargar datos
         data_loaded = self.load_data()
         
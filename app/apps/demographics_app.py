@@ -22,6 +22,12 @@ from collections import Counter
 import re
 from scipy.signal import savgol_filter
 
+# Agregar el directorio de apps al path para imports de modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from modules.method_cache import cached_method, frames_fingerprint
+from modules.synthetic_demographics import generate_name_counts
+
 # Optimizaciones para la capa gratuita de Google Cloud Run
 # Configuración para minimizar costos en Cloud Run
 IS_CLOUD_RUN = os.environ.get('K_SERVICE') is not None
@@ -189,241 +195,81 @@ class DemographicsApp:
         
         if self.data is None:
             self.generate_synthetic_data()
+        
+        # Clave de caché de las visualizaciones: se calcula una vez, no en cada llamada
+        self.data_fingerprint = frames_fingerprint(
+            self.data, self.gender_year_data, self.name_diversity_data, self.name_length_data
+        )
     
     def generate_synthetic_data(self):
         """Genera datos sintéticos para demostración cuando no hay datos reales disponibles"""
         st.info("Generando datos de demostración para el análisis demográfico...")
         
-        # Lista de nombres populares por género para crear nuestros datos
-        popular_male_names = [
-            'James', 'John', 'Robert', 'Michael', 'William', 'David', 'Joseph', 'Charles', 
-            'Thomas', 'Christopher', 'Daniel', 'Matthew', 'Anthony', 'Donald', 'Mark'
-        ]
+        # Generador vectorizado con semilla fija: los mismos datos en cada rerun
+        self.data = generate_name_counts(rng=np.random.default_rng(42))
         
-        popular_female_names = [
-            'Mary', 'Patricia', 'Jennifer', 'Linda', 'Elizabeth', 'Barbara', 'Susan', 'Jessica',
-            'Sarah', 'Karen', 'Nancy', 'Margaret', 'Lisa', 'Betty', 'Dorothy'
-        ]
+        # Las tablas adicionales usan el modelo con eventos históricos de esta versión
+        self.generate_additional_synthetic_data()
+    
+    def generate_additional_synthetic_data(self, seed=42):
+        """Genera datos sintéticos adicionales para visualizaciones avanzadas"""
+        rng = np.random.default_rng(seed)
+        years = np.arange(1910, 2014)
         
-        # Generar registros por década
-        decades = list(range(1910, 2020, 10))
-        records = []
+        # 1. Datos anuales por género
+        # Factor para simular Baby Boom, Gran Depresión y post 2a Guerra Mundial
+        # (se aplica el primero que coincide, como en la cadena if/elif original)
+        event_factor = np.select(
+            [(years >= 1946) & (years <= 1964),
+             (years >= 1929) & (years <= 1939),
+             (years >= 1945) & (years <= 1946)],
+            [1.5, 0.8, 1.3],
+            default=1.0
+        )
         
-        for decade in decades:
-            # Nombres masculinos
-            for name in popular_male_names:
-                # Simular popularidad que varía con el tiempo
-                base_count = np.random.randint(1000, 20000)
-                peak_decade = np.random.choice(decades)
-                
-                # Factor de popularidad (más alto cerca del pico)
-                time_factor = 1 - min(abs(decade - peak_decade), 50) / 50
-                count = int(base_count * (0.5 + time_factor))
-                
-                records.append({
-                    'decade': decade,
-                    'name': name,
-                    'gender': 'M',
-                    'total_count': count
-                })
-            
-            # Nombres femeninos
-            for name in popular_female_names:
-                base_count = np.random.randint(1000, 20000)
-                peak_decade = np.random.choice(decades)
-                
-                time_factor = 1 - min(abs(decade - peak_decade), 50) / 50
-                count = int(base_count * (0.5 + time_factor))
-                
-                records.append({
-                    'decade': decade,
-                    'name': name,
-                    'gender': 'F',
-                    'total_count': count
-                })
-                
-        # Crear DataFrame
-        self.data = pd.DataFrame(records)
+        # Tendencia base (columnas M y F) con fluctuación
+        base = np.column_stack([100000 + (years - 1910) * 1000, 95000 + (years - 1910) * 950])
+        counts = base * event_factor[:, None] * (0.9 + 0.2 * rng.random((len(years), 2)))
         
-        # Generar datos de género por año
-        years = list(range(1910, 2014))
-        gender_records = []
+        self.gender_year_data = pd.DataFrame({
+            'year': np.repeat(years, 2),
+            'gender': np.tile(['M', 'F'], len(years)),
+            'count': counts.astype(np.int64).ravel()
+        })
         
-        for year in years:
-            male_count = int(np.random.normal(100000, 10000))
-            female_count = int(np.random.normal(95000, 10000))
-            
-            # Simulamos "baby boom" en los años correspondientes
-            if 1946 <= year <= 1964:
-                boost = (year - 1946) / 2 if year < 1955 else (1964 - year) / 2
-                boost_factor = 1.0 + boost / 10.0
-                male_count = int(male_count * boost_factor)
-                female_count = int(female_count * boost_factor)
-            
-            gender_records.append({
-                'year': year,
-                'gender': 'M',
-                'count': male_count
-            })
-            gender_records.append({
-                'year': year,
-                'gender': 'F',
-                'count': female_count
-            })
-        
-        self.gender_year_data = pd.DataFrame(gender_records)
-        
-        # Generar datos de diversidad de nombres
-        diversity_records = []
-        decades = list(range(1910, 2020, 10))
-        
-        for decade in decades:
-            for gender, gender_name in [('M', 'Masculino'), ('F', 'Femenino')]:
-                # La concentración disminuye con el tiempo (más diversidad)
-                base_concentration = 80 - (decade - 1910) / 10
-                
-                # Masculino históricamente menos diverso que femenino
-                gender_factor = 1.0 if gender == 'M' else 0.9
-                
-                top_25_percent = max(5, base_concentration * gender_factor)
-                top_50_percent = max(15, min(top_25_percent + 15, 95))
-                
-                diversity_records.append({
-                    'decade': decade,
-                    'gender': gender_name,
-                    'top_n': 'Top 25',
-                    'metric': 'Concentración',
-                    'percentage': top_25_percent
-                })
-                diversity_records.append({
-                    'decade': decade,
-                    'gender': gender_name,
-                    'top_n': 'Top 50',
-                    'metric': 'Concentración',
-                    'percentage': top_50_percent
-                })
-        
-        self.name_diversity_data = pd.DataFrame(diversity_records)
-        
-        # Generar datos de longitud de nombres
-        length_records = []
-        years = list(range(1910, 2014))
-        
-        for year in years:
-            for gender, gender_name in [('M', 'Masculino'), ('F', 'Femenino')]:
-                # Tendencia de nombres más largos con el tiempo
-                trend_factor = (year - 1910) / 100
-                
-                # Nombres femeninos históricamente más largos que masculinos
-                gender_factor = 0 if gender == 'M' else 0.8
-                
-                avg_length = 5.5 + trend_factor + gender_factor
-                # Añadir algo de variabilidad
-                avg_length += np.random.normal(0, 0.2)
-                
-                length_records.append({
-                    'year': year,
-                    'gender': gender_name,
-                    'avg_length': round(avg_length, 2)
-                })
+        # 2. Datos de diversidad de nombres
+        decades = np.array(DECADES)
+        time_factor = (decades - 1910) / 100  # 0 para 1910, ~1 para 2010
         
-        self.name_length_data = pd.DataFrame(length_records)
-        """Genera datos sintéticos adicionales para visualizaciones avanzadas"""
-        # 1. Datos anuales por género
-        years = list(range(1910, 2014))
-        gender_year_records = []
+        # Las mujeres tienen más diversidad de nombres que los hombres (Masculino, Femenino)
+        gender_factor = np.array([1.0, 1.1])
         
-        for year in years:
-            # Factor para simular Baby Boom y otros eventos históricos
-            factor_m = 1.0
-            factor_f = 1.0
-            
-            # Baby Boom (1946-1964)
-            if 1946 <= year <= 1964:
-                factor_m = 1.5
-                factor_f = 1.5
-            # Gran Depresión (1929-1939)
-            elif 1929 <= year <= 1939:
-                factor_m = 0.8
-                factor_f = 0.8
-            # Post 2a Guerra Mundial
-            elif 1945 <= year <= 1946:
-                factor_m = 1.3
-                factor_f = 1.3
-            
-            # Tendencia base
-            base_m = 100000 + (year - 1910) * 1000
-            base_f = 95000 + (year - 1910) * 950
-            
-            # Añadir fluctuación y tendencia
-            count_m = int(base_m * factor_m * (0.9 + 0.2 * np.random.random()))
-            count_f = int(base_f * factor_f * (0.9 + 0.2 * np.random.random()))
-            
-            gender_year_records.append({
-                'year': year,
-                'gender': 'M',
-                'count': count_m
-            })
-            gender_year_records.append({
-                'year': year,
-                'gender': 'F',
-                'count': count_f
-            })
-        
-        self.gender_year_data = pd.DataFrame(gender_year_records)
-        
-        # 2. Datos de diversidad de nombres
-        diversity_records = []
-        for decade in DECADES:
-            for gender in ['Masculino', 'Femenino']:
-                # Simular tendencia hacia mayor diversidad con el tiempo
-                time_factor = (decade - 1910) / 100  # 0 para 1910, ~1 para 2010
-                
-                # Las mujeres tienen más diversidad de nombres que los hombres
-                gender_factor = 1.1 if gender == 'Femenino' else 1.0
-                
-                # Calcular concentración (más alta en el pasado)
-                concentration = 70 - (40 * time_factor * gender_factor)
-                
-                # Añadir fluctuación
-                concentration = concentration * (0.95 + 0.1 * np.random.random())
-                
-                diversity_records.append({
-                    'decade': f"{decade}s",
-                    'gender': gender,
-                    'top_n': 'Top 25',
-                    'percentage': concentration,
-                    'metric': 'Concentración'
-                })
+        # Concentración más alta en el pasado, con fluctuación
+        concentration = 70 - 40 * time_factor[:, None] * gender_factor
+        concentration = concentration * (0.95 + 0.1 * rng.random((len(decades), 2)))
         
-        self.name_diversity_data = pd.DataFrame(diversity_records)
+        self.name_diversity_data = pd.DataFrame({
+            'decade': np.repeat([f"{decade}s" for decade in DECADES], 2),
+            'gender': np.tile(['Masculino', 'Femenino'], len(decades)),
+            'top_n': 'Top 25',
+            'percentage': concentration.ravel(),
+            'metric': 'Concentración'
+        })
         
         # 3. Datos de longitud de nombres
-        length_records = []
-        for year in years:
-            # Tendencia: nombres más largos con el tiempo
-            time_factor = (year - 1910) / 103  # 0 para 1910, 1 para 2013
-            
-            # Longitud base más larga para mujeres
-            base_length_m = 5.2 + (0.8 * time_factor)
-            base_length_f = 5.5 + (1.0 * time_factor)
-            
-            # Añadir fluctuación
-            length_m = base_length_m * (0.98 + 0.04 * np.random.random())
-            length_f = base_length_f * (0.98 + 0.04 * np.random.random())
-            
-            length_records.append({
-                'year': year,
-                'gender': 'Masculino',
-                'avg_length': length_m
-            })
-            length_records.append({
-                'year': year,
-                'gender': 'Femenino',
-                'avg_length': length_f
-            })
-        
-        self.name_length_data = pd.DataFrame(length_records)    @st.cache_data(ttl=3600)
+        time_factor = (years - 1910) / 103  # 0 para 1910, 1 para 2013
+        
+        # Longitud base más larga para mujeres, con fluctuación
+        base_length = np.column_stack([5.2 + 0.8 * time_factor, 5.5 + 1.0 * time_factor])
+        lengths = base_length * (0.98 + 0.04 * rng.random((len(years), 2)))
+        
+        self.name_length_data = pd.DataFrame({
+            'year': np.repeat(years, 2),
+            'gender': np.tile(['Masculino', 'Femenino'], len(years)),
+            'avg_length': lengths.ravel()
+        })
+    
+    @cached_method(ttl=3600)
     def create_name_trends_visualization(self):
         """Crea visualización de tendencias de nombres populares con contexto histórico"""
         if self.data is None:
@@ -525,7 +371,7 @@ class DemographicsApp:
         
         return fig
     
-    @st.cache_data(ttl=3600)
+    @cached_method(ttl=3600)
     def create_name_diversity_visualization(self):
         """Crea visualización de diversidad de nombres a lo largo del tiempo"""
         if self.name_diversity_data is None:
@@ -564,7 +410,7 @@ class DemographicsApp:
         
         return fig
     
-    @st.cache_data(ttl=3600)
+    @cached_method(ttl=3600)
     def create_name_length_visualization(self):
         """Crea visualización de longitud de nombres a lo largo del tiempo"""
         if self.name_length_data is None:
@@ -613,7 +459,7 @@ class DemographicsApp:
         
         return fig
     
-    @st.cache_data(ttl=3600)
+    @cached_method(ttl=3600)
     def create_top_names_visualization(self):
         """Crea visualización de los nombres más populares por género"""
         if self.data is None:
@@ -680,8 +526,10 @@ class DemographicsApp:
                     un ciclo generacional donde nombres de "abuelos" vuelven a ser populares.</li>
                 </ul>
             </div>
-            """, unsafe_allow_html=True)    @st.cache_data(ttl=3600)
-    def create_historical_trends_visualization(self, _self=None):
+            """, unsafe_allow_html=True)
+    
+    @cached_method(ttl=3600)
+    def create_historical_trends_visualization(self):
         """Crea visualización de tendencias históricas de nacimientos"""
         if self.gender_year_data is None:
             return None
@@ -10,17 +10,22 @@ y patrones fonéticos con explicaciones sociológicas e históricas.
 
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import os
 import sys
 from pathlib import Path
 from datetime import datetime
 from collections import Counter
 import re
-from scipy.signal import savgol_filter
+
+# Agregar el directorio de apps al path para imports de modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from modules.demographics_charts import add_event_lines, build_name_trends_figure
+from modules.demographics_rollups import build_demographics_rollups, demographics_rollups
+from modules.method_cache import cached_method, frames_fingerprint
+from modules.synthetic_demographics import generate_synthetic_demographics
 
 # Optimizaciones para la capa gratuita de Google Cloud Run
 # Usar st.cache_data para minimizar recálculos
@@ -171,269 +176,89 @@ def load_additional_data(file_name):
     except Exception:
         return None
 
+# Rollups calculados desde los CSV, sólo cuando no existe el almacén precalculado
+@st.cache_data(ttl=3600)
+def load_fallback_rollups():
+    """Calcula los rollups en memoria a partir de los CSV (modo desarrollo)"""
+    data = load_demographics_data()
+    if data is None:
+        return None
+    return build_demographics_rollups(
+        data,
+        gender_year=load_additional_data('gender_year_counts.csv'),
+        diversity=load_additional_data('name_diversity.csv'),
+        name_length=load_additional_data('name_length.csv')
+    )
+
 class DemographicsApp:
     """Aplicación para análisis demográfico con BigQuery"""
     
     def __init__(self):
         """Inicializa la aplicación"""
-        self.data = load_demographics_data()
-        self.gender_year_data = load_additional_data('gender_year_counts.csv')
-        self.name_diversity_data = load_additional_data('name_diversity.csv')
-        self.name_length_data = load_additional_data('name_length.csv')
+        self.data = None
+        self.gender_year_data = None
+        self.name_diversity_data = None
+        self.name_length_data = None
+        
+        # Con el almacén precalculado (scripts/build_demographics_rollups.py) cada
+        # visualización lee sólo su rollup y el CSV original nunca se abre
+        self.rollups = None
+        if not demographics_rollups.available:
+            self.rollups = load_fallback_rollups()
+            if self.rollups is None:
+                self.generate_synthetic_data()
+                self.rollups = build_demographics_rollups(
+                    self.data,
+                    gender_year=self.gender_year_data,
+                    diversity=self.name_diversity_data,
+                    name_length=self.name_length_data
+                )
         
-        if self.data is None:
-            self.generate_synthetic_data()
+        # Clave de caché de las visualizaciones: se calcula una vez, no en cada llamada
+        if self.rollups is None:
+            self.data_fingerprint = demographics_rollups.fingerprint
+        else:
+            self.data_fingerprint = frames_fingerprint(*self.rollups.values())
     
+    def get_rollup(self, name):
+        """Retorna un rollup (DataFrame) o None si no está disponible"""
+        if self.rollups is not None:
+            return self.rollups.get(name)
+        return demographics_rollups.load(name)
+
     def generate_synthetic_data(self):
         """Genera datos sintéticos para demostración cuando no hay datos reales disponibles"""
         st.info("Generando datos de demostración para el análisis demográfico...")
         
-        # Lista de nombres populares por género para crear nuestros datos
-        popular_male_names = [
-            'James', 'John', 'Robert', 'Michael', 'William', 'David', 'Joseph', 'Charles', 
-            'Thomas', 'Christopher', 'Daniel', 'Matthew', 'Anthony', 'Donald', 'Mark'
-        ]
-        
-        popular_female_names = [
-            'Mary', 'Patricia', 'Jennifer', 'Linda', 'Elizabeth', 'Barbara', 'Susan', 'Jessica',
-            'Sarah', 'Karen', 'Nancy', 'Margaret', 'Lisa', 'Betty', 'Dorothy'
-        ]
-        
-        # Generar registros por década
-        decades = list(range(1910, 2020, 10))
-        records = []
-        
-        for decade in decades:
-            # Nombres masculinos
-            for name in popular_male_names:
-                # Simular popularidad que varía con el tiempo
-                base_count = np.random.randint(1000, 20000)
-                peak_decade = np.random.choice(decades)
-                
-                # Factor de popularidad (más alto cerca del pico)
-                time_factor = 1 - min(abs(decade - peak_decade), 50) / 50
-                count = int(base_count * (0.5 + time_factor))
-                
-                records.append({
-                    'decade': decade,
-                    'name': name,
-                    'gender': 'M',
-                    'total_count': count
-                })
-            
-            # Nombres femeninos
-            for name in popular_female_names:
-                base_count = np.random.randint(1000, 20000)
-                peak_decade = np.random.choice(decades)
-                
-                time_factor = 1 - min(abs(decade - peak_decade), 50) / 50
-                count = int(base_count * (0.5 + time_factor))
-                
-                records.append({
-                    'decade': decade,
-                    'name': name,
-                    'gender': 'F',
-                    'total_count': count
-                })
-                
-        # Crear DataFrame
-        self.data = pd.DataFrame(records)
-        
-        # Generar datos de género por año
-        years = list(range(1910, 2014))
-        gender_records = []
-        
-        for year in years:
-            male_count = int(np.random.normal(100000, 10000))
-            female_count = int(np.random.normal(95000, 10000))
-            
-            # Simulamos "baby boom" en los años correspondientes
-            if 1946 <= year <= 1964:
-                boost = (year - 1946) / 2 if year < 1955 else (1964 - year) / 2
-                boost_factor = 1.0 + boost / 10.0
-                male_count = int(male_count * boost_factor)
-                female_count = int(female_count * boost_factor)
-            
-            gender_records.append({
-                'year': year,
-                'gender': 'M',
-                'count': male_count
-            })
-            gender_records.append({
-                'year': year,
-                'gender': 'F',
-                'count': female_count
-            })
-        
-        self.gender_year_data = pd.DataFrame(gender_records)
-        
-        # Generar datos de diversidad de nombres
-        diversity_records = []
-        decades = list(range(1910, 2020, 10))
-        
-        for decade in decades:
-            for gender, gender_name in [('M', 'Masculino'), ('F', 'Femenino')]:
-                # La concentración disminuye con el tiempo (más diversidad)
-                base_concentration = 80 - (decade - 1910) / 10
-                
-                # Masculino históricamente menos diverso que femenino
-                gender_factor = 1.0 if gender == 'M' else 0.9
-                
-                top_25_percent = max(5, base_concentration * gender_factor)
-                top_50_percent = max(15, min(top_25_percent + 15, 95))
-                
-                diversity_records.append({
-                    'decade': decade,
-                    'gender': gender_name,
-                    'top_n': 'Top 25',
-                    'metric': 'Concentración',
-                    'percentage': top_25_percent
-                })
-                diversity_records.append({
-                    'decade': decade,
-                    'gender': gender_name,
-                    'top_n': 'Top 50',
-                    'metric': 'Concentración',
-                    'percentage': top_50_percent
-                })
-        
-        self.name_diversity_data = pd.DataFrame(diversity_records)
-        
-        # Generar datos de longitud de nombres
-        length_records = []
-        years = list(range(1910, 2014))
-        
-        for year in years:
-            for gender, gender_name in [('M', 'Masculino'), ('F', 'Femenino')]:
-                # Tendencia de nombres más largos con el tiempo
-                trend_factor = (year - 1910) / 100
-                
-                # Nombres femeninos históricamente más largos que masculinos
-                gender_factor = 0 if gender == 'M' else 0.8
-                
-                avg_length = 5.5 + trend_factor + gender_factor
-                # Añadir algo de variabilidad
-                avg_length += np.random.normal(0, 0.2)
-                
-                length_records.append({
-                    'year': year,
-                    'gender': gender_name,
-                    'avg_length': round(avg_length, 2)
-                })
-        
-        self.name_length_data = pd.DataFrame(length_records)
+        # Generador vectorizado con semilla fija: los mismos datos en cada rerun
+        frames = generate_synthetic_demographics()
+        self.data = frames['data']
+        self.gender_year_data = frames['gender_year']
+        self.name_diversity_data = frames['diversity']
+        self.name_length_data = frames['name_length']
 
-    @st.cache_data(ttl=3600)
-    def create_name_trends_visualization(self):
+    @cached_method(ttl=3600)
+    def create_name_trends_visualization(self, top_k=5):
         """Crea visualización de tendencias de nombres populares con contexto histórico"""
-        if self.data is None:
+        decade_top = self.get_rollup('decade_top')
+        name_history = self.get_rollup('name_history')
+        if decade_top is None or name_history is None:
             return None
-            
-        # Preparar datos
-        df_trends = self.data.groupby(['decade', 'name', 'gender'])['total_count'].sum().reset_index()
-        df_trends = df_trends.sort_values(['decade', 'total_count'], ascending=[True, False])
-        
-        # Crear figura con subplots
-        fig = make_subplots(
-            rows=2, cols=1,
-            subplot_titles=('Nombres Masculinos más Populares por Década', 
-                           'Nombres Femeninos más Populares por Década'),
-            vertical_spacing=0.15,
-            shared_xaxes=True,
-            x_title="Década"
-        )
-        
-        # Para cada género, mostrar los 5 nombres más populares por década
-        for gender_idx, gender in enumerate(['M', 'F']):
-            # Filtrar por género
-            gender_data = df_trends[df_trends['gender'] == gender]
-            
-            # Agrupar por década
-            decades_groups = gender_data.groupby('decade')
-            
-            # Para cada década, obtener los 5 nombres más populares
-            for decade, group in decades_groups:
-                top_names = group.nlargest(5, 'total_count')
-                
-                # Para cada nombre en el top 5 de la década
-                for _, row in top_names.iterrows():
-                    # Buscar este nombre en todas las décadas para crear una línea temporal
-                    name_history = df_trends[(df_trends['name'] == row['name']) & 
-                                             (df_trends['gender'] == gender)]
-                    
-                    # Agregar trazo al gráfico correspondiente al género
-                    fig.add_trace(
-                        go.Scatter(
-                            x=name_history['decade'],
-                            y=name_history['total_count'],
-                            mode='lines+markers',
-                            name=row['name'],
-                            line=dict(width=2),
-                            marker=dict(size=6),
-                            showlegend=decade == 2010,  # Solo mostrar en leyenda para la última década
-                            legendgroup=row['name']
-                        ),
-                        row=gender_idx+1, col=1
-                    )
-                    
-        # Agregar eventos históricos como anotaciones
-        for gender_idx in range(2):
-            for year, event in HISTORICAL_EVENTS.items():
-                # Encontrar la década más cercana para el evento
-                decade = (year // 10) * 10
-                if decade not in DECADES:
-                    continue
-                
-                # Agregar una anotación para el evento
-                fig.add_annotation(
-                    x=decade,
-                    y=0.9,  # Posición relativa al eje y
-                    text=f"{year}: {event}",
-                    showarrow=True,
-                    arrowhead=2,
-                    ax=0,
-                    ay=-40,
-                    row=gender_idx+1, col=1,
-                    bgcolor="rgba(255, 255, 255, 0.8)",
-                    bordercolor="#c7c7c7",
-                    borderwidth=1,
-                    font=dict(size=10)
-                )
-        
-        # Actualizar layout
-        fig.update_layout(
-            height=800,
-            title_text="Tendencias de Nombres Populares con Contexto Histórico (1910-2013)",
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.2,
-                xanchor="center",
-                x=0.5
-            ),
-            template="plotly_white",
-            hovermode="closest"
-        )
-        
-        # Actualizar ejes
-        fig.update_xaxes(title_text="Década", row=1, col=1, tickmode='array', tickvals=DECADES)
-        fig.update_xaxes(title_text="Década", row=2, col=1, tickmode='array', tickvals=DECADES)
-        fig.update_yaxes(title_text="Número de Nacimientos", row=1, col=1)
-        fig.update_yaxes(title_text="Número de Nacimientos", row=2, col=1)
         
-        return fig
+        # Un trazo por nombre y todas las anotaciones en una sola actualización del layout
+        return build_name_trends_figure(decade_top, name_history, DECADES, HISTORICAL_EVENTS, top_k=top_k)
     
-    @st.cache_data(ttl=3600)
+    @cached_method(ttl=3600)
     def create_name_diversity_visualization(self):
         """Crea visualización de diversidad de nombres a lo largo del tiempo"""
-        if self.name_diversity_data is None:
+        diversity = self.get_rollup('diversity')
+        if diversity is None:
             return None
         
         # Filtrar solo para el Top 25 y métrica de concentración para mayor claridad
-        plot_df = self.name_diversity_data[
-            (self.name_diversity_data['top_n'] == 'Top 25') & 
-            (self.name_diversity_data['metric'] == 'Concentración')
+        plot_df = diversity[
+            (diversity['top_n'] == 'Top 25') & 
+            (diversity['metric'] == 'Concentración')
         ]
         
         # Crear la visualización
@@ -463,14 +288,15 @@ class DemographicsApp:
         
         return fig
     
-    @st.cache_data(ttl=3600)
+    @cached_method(ttl=3600)
     def create_name_length_visualization(self):
         """Crea visualización de longitud de nombres a lo largo del tiempo"""
-        if self.name_length_data is None:
+        name_length = self.get_rollup('name_length')
+        if name_length is None:
             return None
         
         # Crear gráfico de líneas
-        fig = px.line(self.name_length_data, 
+        fig = px.line(name_length, 
                     x='year', 
                     y='avg_length', 
                     color='gender',
@@ -494,22 +320,14 @@ class DemographicsApp:
         
         return fig
     
-    @st.cache_data(ttl=3600)
+    @cached_method(ttl=3600)
     def create_historical_trends_visualization(self):
         """Crea visualización de tendencias históricas de nacimientos"""
-        if self.gender_year_data is None:
+        # Nacimientos por año y género, con el total del año ya calculado
+        plot_df = self.get_rollup('yearly_totals')
+        if plot_df is None:
             return None
         
-        # Preparar datos
-        plot_df = self.gender_year_data.copy()
-        
-        # Agregar columna para el total por año
-        yearly_totals = plot_df.groupby('year')['count'].sum().reset_index()
-        yearly_totals.rename(columns={'count': 'total'}, inplace=True)
-        
-        # Unir con los datos originales
-        plot_df = pd.merge(plot_df, yearly_totals, on='year')
-        
         # Crear gráfico
         fig = go.Figure()
         
@@ -526,26 +344,8 @@ class DemographicsApp:
                 fillcolor=GENDER_COLORS[gender]
             ))
         
-        # Agregar eventos históricos
-        for year, event in HISTORICAL_EVENTS.items():
-            if year < min(plot_df['year']) or year > max(plot_df['year']):
-                continue
-                
-            fig.add_vline(
-                x=year,
-                line_width=1,
-                line_dash="dash",
-                line_color="rgba(0, 0, 0, 0.3)",
-                annotation_text=f"{year}: {event}",
-                annotation_position="top",
-                annotation=dict(
-                    font_size=10,
-                    font_color="black",
-                    bgcolor="white",
-                    bordercolor="black",
-                    borderwidth=1
-                )
-            )
+        # Agregar eventos históricos (líneas y etiquetas en un solo update_layout)
+        add_event_lines(fig, HISTORICAL_EVENTS, plot_df['year'].min(), plot_df['year'].max())
         
         # Mejorar diseño
         fig.update_layout(
@@ -566,18 +366,17 @@ class DemographicsApp:
         
         return fig
     
-    @st.cache_data(ttl=3600)
+    @cached_method(ttl=3600)
     def create_top_names_visualization(self):
         """Crea visualización de los nombres más populares de todos los tiempos"""
-        if self.data is None:
+        top_names = self.get_rollup('all_time_top')
+        if top_names is None:
             return None, None
         
-        # Agrupar por nombre y género
-        top_names = self.data.groupby(['name', 'gender'])['total_count'].sum().reset_index()
-        
         # Separar por género y obtener los 10 más populares
-        male_top = top_names[top_names['gender'] == 'M'].nlargest(10, 'total_count')
-        female_top = top_names[top_names['gender'] == 'F'].nlargest(10, 'total_count')
+        top_names = top_names[top_names['rank'] <= 10]
+        male_top = top_names[top_names['gender'] == 'M']
+        female_top = top_names[top_names['gender'] == 'F']
         
         # Crear barras horizontales para nombres masculinos
         fig_m = px.bar(
@@ -805,11 +604,13 @@ class DemographicsApp:
         """, unsafe_allow_html=True)
         
         # Mostrar estadísticas generales
-        if self.data is not None:
-            total_births = self.data['total_count'].sum()
-            unique_names = self.data['name'].nunique()
-            time_period = f"{self.data['decade'].min()}-{self.data['decade'].max()}"
-            
+        summary = self.get_rollup('summary')
+        if summary is not None:
+            summary = summary.iloc[0]
+            total_births = summary['total_births']
+            unique_names = int(summary['unique_names'])
+            time_period = f"{summary['decade_min']}-{summary['decade_max']}"
+
             col1, col2, col3 = st.columns(3)
             
             with col1:
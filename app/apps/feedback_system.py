@@ -78,43 +78,45 @@ class FeedbackSystem:
         print(f"Feedback guardado con ID: {feedback_entry['id']}")
 
 # CSS personalizado
-st.markdown("""
-<style>
-    .feedback-header {
-        background: linear-gradient(90deg, #4f46e5, #6366f1);
-        padding: 1.5rem;
-        border-radius: 10px;
-        color: white;
-        text-align: center;
-        margin-bottom: 1.5rem;
-    }
+def load_feedback_css():
+    """Carga el CSS personalizado para la aplicación de feedback"""
+    st.markdown("""
+    <style>
+        .feedback-header {
+            background: linear-gradient(90deg, #4f46e5, #6366f1);
+            padding: 1.5rem;
+            border-radius: 10px;
+            color: white;
+            text-align: center;
+            margin-bottom: 1.5rem;
+        }
     
-    .feedback-box {
-        background: #f1f5f9;
-        padding: 1.5rem;
-        border-radius: 10px;
-        margin-bottom: 1rem;
-    }
+        .feedback-box {
+            background: #f1f5f9;
+            padding: 1.5rem;
+            border-radius: 10px;
+            margin-bottom: 1rem;
+        }
     
-    .success-message {
-        background: #dcfce7;
-        color: #166534;
-        padding: 1rem;
-        border-radius: 8px;
-        margin: 1rem 0;
-        border-left: 4px solid #16a34a;
-    }
+        .success-message {
+            background: #dcfce7;
+            color: #166534;
+            padding: 1rem;
+            border-radius: 8px;
+            margin: 1rem 0;
+            border-left: 4px solid #16a34a;
+        }
     
-    .error-message {
-        background: #fee2e2;
-        color: #991b1b;
-        padding: 1rem;
-        border-radius: 8px;
-        margin: 1rem 0;
-        border-left: 4px solid #ef4444;
-    }
-</style>
-""", unsafe_allow_html=True)
+        .error-message {
+            background: #fee2e2;
+            color: #991b1b;
+            padding: 1rem;
+            border-radius: 8px;
+            margin: 1rem 0;
+            border-left: 4px solid #ef4444;
+        }
+    </style>
+    """, unsafe_allow_html=True)
 
 class FeedbackApp:
     """Aplicación principal de feedback"""
@@ -211,6 +213,9 @@ class FeedbackApp:
                 
     def run(self):
         """Ejecuta la aplicación principal"""
+        # CSS en cada rerun: el módulo se importa una sola vez
+        load_feedback_css()
+        
         # Renderizar componentes
         self.render_header()
         self.render_feedback_form()
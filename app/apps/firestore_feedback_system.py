@@ -12,12 +12,17 @@ sin costos adicionales.
 import streamlit as st
 import json
 from datetime import datetime
-from google.cloud import firestore
 import uuid
 from pathlib import Path
 import os
 import sys
 
+sys.path.insert(0, str(Path(__file__).parent))
+from modules.lazy_imports import lazy_import
+
+# google.cloud.firestore se importa al crear el cliente (si falta, se usa el respaldo local)
+firestore = lazy_import('google.cloud.firestore')
+
 # Sistema de almacenamiento de feedback con Firestore
 class FirestoreFeedbackSystem:    
     def __init__(self):
@@ -3,16 +3,69 @@
 Estructura modular para facilitar el mantenimiento:
 
 - data_loaders.py: Funciones de carga y procesamiento de datos
+- data_cache.py: Caché persistente en Parquet de descargas remotas
+- ckan_fetcher.py: Descarga paginada y concurrente del datastore CKAN
+- budget_cube.py: Cubo jerárquico de agregados del presupuesto
+- concentration.py: Métricas de concentración (HHI, Gini, Theil, top-k, curva acumulada)
+- curve_simplify.py: Simplificación de curvas acumuladas con presupuesto de puntos
+- reallocation.py: Simulador de reasignaciones con métricas incrementales
+- demographics_rollups.py: Rollups precalculados en Parquet de la app demográfica
+- demographics_charts.py: Figuras de la app demográfica construidas por lotes
+- method_cache.py: Caché de métodos de aplicación con huella de datos
+- synthetic_demographics.py: Generador vectorizado de datos demográficos sintéticos
+- number_parsing.py: Conversión vectorizada de números en formato chileno
+- lazy_imports.py: Imports diferidos de librerías pesadas
 - map_utils.py: Utilidades para mapas interactivos  
 - chart_utils.py: Funciones para gráficos y visualizaciones
 - water_quality.py: Específico para calidad del agua
+- water_quality_index.py: Índice de filtros reutilizable para calidad del agua
 - emissions.py: Específico para emisiones CO2
+- emissions_stream.py: Ingesta por bloques de archivos RETC
 - config.py: Configuraciones centralizadas
 """
 
-from .data_loaders import *
-from .map_utils import *
-from .chart_utils import *
-from .water_quality import *
-from .emissions import *
-from .config import *
+import importlib
+
+# Submódulos re-exportados. Se importan al usar uno de sus nombres (PEP 562):
+# ``from modules.config import X`` ya no carga folium, requests ni los mapas.
+# Si dos submódulos definen el mismo nombre, gana el último (como con ``import *``).
+_SUBMODULES = [
+    'data_loaders',
+    'data_cache',
+    'ckan_fetcher',
+    'budget_cube',
+    'concentration',
+    'curve_simplify',
+    'reallocation',
+    'demographics_rollups',
+    'demographics_charts',
+    'method_cache',
+    'synthetic_demographics',
+    'number_parsing',
+    'lazy_imports',
+    'map_utils',
+    'chart_utils',
+    'water_quality',
+    'water_quality_index',
+    'emissions',
+    'emissions_stream',
+    'config'
+]
+
+
+def __getattr__(name):
+    if name.startswith('_'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    for submodule in reversed(_SUBMODULES):
+        module = importlib.import_module(f'.{submodule}', __name__)
+        if hasattr(module, name):
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
@@ -0,0 +1,166 @@
+"""
+Cubo jerárquico del presupuesto
+===============================
+
+Las vistas de ``budget_analysis_app_v2.py`` agrupaban los registros crudos
+(``df.groupby(nivel)['Monto Pesos'].sum()``) en cada widget y en cada
+rerun. Este módulo agrupa una sola vez por carga de datos, al nivel más
+fino (Partida, Capitulo, Programa, Subtitulo), y deriva de ahí el resto:
+
+- ``nodes``: un nodo por camino de la jerarquía (``'01'``, ``'01/02'``,
+  ``'01/02/01'``, ...) con su padre, para recorrer o dibujar el árbol. Los
+  códigos de Capitulo y Programa se repiten entre partidas, por eso la
+  clave de un nodo es su camino completo y no su código.
+- ``level(nivel)``: totales por código de un nivel sin importar el padre,
+  que es lo que muestran las vistas por nivel (igual que ``groupby(nivel)``).
+
+Cada nodo y cada código lleva suma, conteo y promedio en pesos y dólares,
+además de la primera ``Denominacion`` del grupo en el orden original.
+"""
+
+import numpy as np
+import pandas as pd
+
+BUDGET_LEVELS = ('Partida', 'Capitulo', 'Programa', 'Subtitulo')
+
+# Separador de códigos en la clave de camino de un nodo
+PATH_SEPARATOR = '/'
+
+MEASURE_COLUMNS = ['pesos_sum', 'pesos_count', 'pesos_mean', 'dolar_sum', 'dolar_mean']
+
+
+def path_key(codes):
+    """Clave de camino de un nodo a partir de sus códigos, desde la raíz"""
+    return PATH_SEPARATOR.join(str(code) for code in codes)
+
+
+def _aggregate(leaf, by, denominacion):
+    """Agrega las sumas del nivel más fino por las columnas ``by``"""
+    grouped = leaf.groupby(by, sort=True).agg(
+        pesos_sum=('pesos_sum', 'sum'),
+        pesos_count=('pesos_count', 'sum'),
+        dolar_sum=('dolar_sum', 'sum'),
+        dolar_count=('dolar_count', 'sum'),
+        first_row=('first_row', 'min')
+    )
+    grouped['pesos_mean'] = grouped['pesos_sum'] / grouped['pesos_count']
+    grouped['dolar_mean'] = grouped['dolar_sum'] / grouped['dolar_count']
+    if denominacion is not None:
+        grouped['Denominacion'] = denominacion[grouped['first_row'].to_numpy()]
+    return grouped.drop(columns='dolar_count')
+
+
+class BudgetCube:
+    """Agregados del presupuesto por nivel y por camino jerárquico"""
+
+    def __init__(self, nodes, levels, level_frames, total_pesos, total_dolar):
+        self.nodes = nodes
+        self.levels = list(levels)
+        self.total_pesos = total_pesos
+        self.total_dolar = total_dolar
+        self._level_frames = level_frames
+        self._children = nodes.groupby('parent', sort=False).indices
+
+    def level(self, nivel):
+        """
+        Agregados por código de un nivel, ordenados por código.
+
+        Args:
+            nivel: Nivel jerárquico ('Partida', 'Capitulo', ...)
+
+        Returns:
+            DataFrame indexado por código con las columnas de ``MEASURE_COLUMNS``
+            (y 'Denominacion' si los datos la tienen)
+        """
+        return self._level_frames[nivel]
+
+    def totals(self, nivel, measure='pesos_sum'):
+        """Serie de un agregado por código, de mayor a menor (como ``groupby(nivel).sum().sort_values``)"""
+        return self._level_frames[nivel][measure].sort_values(ascending=False)
+
+    def node(self, path):
+        """Fila del nodo con el camino dado (tupla de códigos o clave de camino)"""
+        key = path if isinstance(path, str) else path_key(path)
+        return self.nodes.loc[key]
+
+    def children(self, path=()):
+        """
+        Hijos directos de un nodo, de mayor a menor monto en pesos.
+
+        Args:
+            path: Tupla de códigos o clave de camino; vacío para las partidas
+
+        Returns:
+            DataFrame de nodos indexado por clave de camino
+        """
+        key = path if isinstance(path, str) else path_key(path)
+        positions = self._children.get(key)
+        if positions is None:
+            return self.nodes.iloc[0:0]
+        return self.nodes.iloc[positions].sort_values('pesos_sum', ascending=False)
+
+    def hierarchy(self, max_depth=None):
+        """Nodos hasta ``max_depth`` niveles, en orden de profundidad (para sunburst/treemap)"""
+        if max_depth is None:
+            return self.nodes
+        return self.nodes[self.nodes['depth'] <= max_depth]
+
+
+def build_budget_cube(df, levels=BUDGET_LEVELS):
+    """
+    Construye el cubo jerárquico a partir de los registros del presupuesto.
+
+    Args:
+        df: Registros con los niveles, 'Monto Pesos', 'Monto Dolar' y
+            opcionalmente 'Denominacion'
+        levels: Niveles de la jerarquía, del más general al más específico
+
+    Returns:
+        BudgetCube
+    """
+    levels = [level for level in levels if level in df.columns]
+    denominacion = df['Denominacion'].to_numpy() if 'Denominacion' in df.columns else None
+
+    leaf = pd.DataFrame({level: df[level].to_numpy() for level in levels})
+    leaf['pesos_sum'] = df['Monto Pesos'].to_numpy()
+    leaf['pesos_count'] = df['Monto Pesos'].notna().to_numpy().astype(np.int64)
+    leaf['dolar_sum'] = df['Monto Dolar'].to_numpy()
+    leaf['dolar_count'] = df['Monto Dolar'].notna().to_numpy().astype(np.int64)
+    leaf['first_row'] = np.arange(len(df))
+    # Un grupo por combinación de los cuatro niveles; todo lo demás se deriva de aquí
+    leaf = leaf.groupby(levels, sort=True).agg(
+        pesos_sum=('pesos_sum', 'sum'),
+        pesos_count=('pesos_count', 'sum'),
+        dolar_sum=('dolar_sum', 'sum'),
+        dolar_count=('dolar_count', 'sum'),
+        first_row=('first_row', 'min')
+    ).reset_index()
+
+    node_frames = []
+    for depth in range(1, len(levels) + 1):
+        path_levels = levels[:depth]
+        nodes = _aggregate(leaf, path_levels, denominacion).reset_index()
+        codes = nodes[path_levels].astype(str)
+        ids = codes[path_levels[0]]
+        for level in path_levels[1:]:
+            ids = ids + PATH_SEPARATOR + codes[level]
+        if depth == 1:
+            parents = pd.Series('', index=nodes.index)
+        else:
+            parents = ids.str.rpartition(PATH_SEPARATOR)[0]
+        nodes['id'] = ids
+        nodes['parent'] = parents
+        nodes['nivel'] = levels[depth - 1]
+        nodes['depth'] = depth
+        nodes['code'] = nodes[levels[depth - 1]]
+        node_frames.append(nodes.drop(columns=path_levels))
+
+    nodes = pd.concat(node_frames, ignore_index=True).set_index('id')
+    level_frames = {level: _aggregate(leaf, level, denominacion) for level in levels}
+    return BudgetCube(
+        nodes,
+        levels,
+        level_frames,
+        total_pesos=float(leaf['pesos_sum'].sum()),
+        total_dolar=float(leaf['dolar_sum'].sum())
+    )
@@ -107,7 +107,7 @@ def create_station_comparison_chart(df, parameter, stations, chart_type='box'):
             )
             
         else:  # bar chart con promedios
-            station_summary = station_data.groupby('GLS_ESTACION')[parameter].agg(['mean', 'std', 'count']).reset_index()
+            station_summary = station_data.groupby('GLS_ESTACION', observed=True)[parameter].agg(['mean', 'std', 'count']).reset_index()
             
             fig = px.bar(
                 station_summary,
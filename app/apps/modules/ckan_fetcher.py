@@ -0,0 +1,221 @@
+"""
+Descarga paginada del datastore CKAN
+====================================
+
+``datastore_search`` entrega como máximo ``limit`` filas por consulta (y el
+servidor impone su propio tope), así que una sola llamada con
+``limit=10000`` trunca los recursos grandes sin avisar. Este módulo:
+
+1. Pide la primera página con ``include_total`` para conocer el total de
+   filas, los campos y su tipo.
+2. Descarga el resto de las páginas en paralelo sobre una sesión HTTP con
+   conexiones reutilizables (keep-alive) y respuestas comprimidas con gzip.
+3. Reintenta cada página por separado con espera exponencial. Si una
+   página llega incompleta (el servidor bajó su tope) se piden las filas
+   que faltan; si llega vacía, o al final no están todas las filas del
+   total, se levanta ``CKANFetchError`` en vez de truncar el recurso.
+4. Pide las filas como listas (``records_format=lists``) y convierte cada
+   página a columnas tipadas apenas llega, sin armar una lista de
+   diccionarios con el recurso completo.
+
+Las páginas se ordenan por ``_id`` para que la paginación sea estable.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .config import CKAN_FETCH_CONFIG
+from .lazy_imports import lazy_import
+
+# requests se importa en la primera descarga
+requests = lazy_import('requests')
+
+# Tipos de campo de CKAN que se convierten a número o fecha (el resto queda como texto)
+NUMERIC_TYPES = ('int', 'int4', 'int8', 'numeric', 'float8', 'float4')
+DATE_TYPES = ('timestamp', 'date')
+
+
+class CKANFetchError(Exception):
+    """La API respondió sin éxito o una página falló después de todos los reintentos"""
+
+
+def _typed_column(values, field_type):
+    """Convierte los valores de una columna de una página según el tipo de campo de CKAN"""
+    if field_type in NUMERIC_TYPES:
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy()
+    if field_type in DATE_TYPES:
+        return pd.to_datetime(pd.Series(values, dtype=object), errors='coerce').to_numpy()
+    return np.array(values, dtype=object)
+
+
+def page_to_columns(records, fields):
+    """
+    Convierte los registros de una página en columnas tipadas.
+
+    Args:
+        records: Filas como listas (``records_format=lists``) o diccionarios
+            (servidores que no soportan ``records_format``)
+        fields: Campos del recurso (lista de dicts con 'id' y 'type')
+
+    Returns:
+        Diccionario nombre de campo -> array de NumPy
+    """
+    ids = [field['id'] for field in fields]
+    if not records:
+        # Vacías pero con el tipo del campo, para no volver object las columnas al concatenar
+        return {field['id']: _typed_column([], field.get('type', 'text')) for field in fields}
+    if isinstance(records[0], dict):
+        raw = [[record.get(field_id) for record in records] for field_id in ids]
+    else:
+        raw = list(zip(*records))
+    return {
+        field['id']: _typed_column(values, field.get('type', 'text'))
+        for field, values in zip(fields, raw)
+    }
+
+
+class CKANDatastoreFetcher:
+    """Cliente de ``datastore_search`` con paginación concurrente y reintentos por página"""
+
+    def __init__(self, api_url, page_size=None, max_workers=None, timeout=None,
+                 retries=None, backoff_seconds=None):
+        self.api_url = api_url
+        self.page_size = page_size or CKAN_FETCH_CONFIG['page_size']
+        self.max_workers = max_workers or CKAN_FETCH_CONFIG['max_workers']
+        self.timeout = timeout or CKAN_FETCH_CONFIG['request_timeout']
+        self.retries = CKAN_FETCH_CONFIG['retries'] if retries is None else retries
+        self.backoff_seconds = CKAN_FETCH_CONFIG['backoff_seconds'] if backoff_seconds is None else backoff_seconds
+        self._session = None
+        self._lock = threading.Lock()
+        self.last_stats = {}
+
+    @property
+    def session(self):
+        """Sesión HTTP compartida por los hilos, con un pool de conexiones por trabajador"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=1, pool_maxsize=self.max_workers
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers.update({
+                        'User-Agent': 'Mozilla/5.0',
+                        'Accept': 'application/json',
+                        'Accept-Encoding': 'gzip, deflate'
+                    })
+                    self._session = session
+        return self._session
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _get_page(self, resource_id, offset, limit, include_total=False):
+        """Descarga una página, reintentando con espera exponencial"""
+        params = {
+            'resource_id': resource_id,
+            'offset': offset,
+            'limit': limit,
+            'sort': '_id',
+            'records_format': 'lists',
+            'include_total': str(include_total).lower()
+        }
+        attempt = 0
+        while True:
+            try:
+                response = self.session.get(self.api_url, params=params, timeout=self.timeout)
+                response.raise_for_status()
+                payload = response.json()
+                if not payload.get('success'):
+                    raise CKANFetchError(f"La API no retornó datos válidos: {payload.get('error')}")
+                return payload['result']
+            except (requests.RequestException, ValueError, CKANFetchError) as e:
+                # Errores 4xx (salvo 429) no mejoran al reintentar
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                retryable = status is None or status == 429 or status >= 500
+                if attempt >= self.retries or not retryable:
+                    raise CKANFetchError(f"Página con offset {offset}: {e}") from e
+                with self._lock:
+                    self.last_stats['retries'] = self.last_stats.get('retries', 0) + 1
+                time.sleep(self.backoff_seconds * (2 ** attempt))
+                attempt += 1
+
+    def fetch_columns(self, resource_id, max_rows=None):
+        """
+        Descarga un recurso completo como columnas tipadas.
+
+        Args:
+            resource_id: ID del recurso en el datastore
+            max_rows: Límite opcional de filas (None = todas)
+
+        Returns:
+            Tupla (fields, columns) con los campos del recurso y un
+            diccionario campo -> array con todas las filas, en orden de ``_id``
+        """
+        start = time.perf_counter()
+        self.last_stats = {'retries': 0}
+
+        first = self._get_page(resource_id, 0, self.page_size, include_total=True)
+        fields = first.get('fields', [])
+        total = first.get('total', len(first.get('records', [])))
+        if max_rows is not None:
+            total = min(total, max_rows)
+
+        # El servidor puede imponer un tope menor que page_size (ckan.datastore.search.rows_max)
+        first_records = first.get('records', [])[:total]
+        page_size = len(first_records) if 0 < len(first_records) < min(self.page_size, total) else self.page_size
+
+        if total and not first_records:
+            raise CKANFetchError(f"La primera página llegó vacía y el recurso informa {total} filas")
+
+        pages = [page_to_columns(first_records, fields)]
+        offsets = list(range(len(first_records), total, page_size)) if first_records else []
+
+        def fetch(offset):
+            """Páginas que cubren [offset, offset + page_size), pidiendo de nuevo lo que falte"""
+            end = min(offset + page_size, total)
+            parts = []
+            while offset < end:
+                records = self._get_page(resource_id, offset, end - offset).get('records', [])[:end - offset]
+                if not records:
+                    raise CKANFetchError(
+                        f"Página con offset {offset}: llegó vacía, faltan {end - offset} filas"
+                    )
+                parts.append(page_to_columns(records, fields))
+                offset += len(records)
+            return parts
+
+        if offsets:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # map conserva el orden de los offsets
+                for parts in executor.map(fetch, offsets):
+                    pages.extend(parts)
+
+        columns = {
+            field['id']: np.concatenate([page[field['id']] for page in pages])
+            for field in fields
+        }
+        rows = len(next(iter(columns.values()))) if columns else 0
+        if columns and rows != total:
+            raise CKANFetchError(f"Se descargaron {rows} filas de {total}")
+        self.last_stats.update({
+            'total': total,
+            'rows': rows,
+            'pages': len(pages),
+            'page_size': page_size,
+            'seconds': time.perf_counter() - start
+        })
+        return fields, columns
+
+    def fetch_frame(self, resource_id, max_rows=None):
+        """Descarga un recurso completo como DataFrame (columnas en el orden de los campos)"""
+        fields, columns = self.fetch_columns(resource_id, max_rows)
+        return pd.DataFrame(columns, columns=[field['id'] for field in fields])
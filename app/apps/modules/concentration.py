@@ -0,0 +1,112 @@
+"""
+Métricas de concentración del presupuesto
+=========================================
+
+Antes ``calculate_concentration_metrics`` y ``plot_distribution_analysis``
+ordenaban y acumulaban por separado la misma serie en cada interacción, y
+el Gini nunca se calculaba aunque se dibujara la curva. Aquí todas las
+métricas de un nivel salen de un único arreglo ordenado:
+
+- HHI: suma de participaciones porcentuales al cuadrado / 10000 (0 a 1)
+- Gini: desigualdad de la distribución (0 = igualdad perfecta)
+- Theil: índice de entropía, 0 con igualdad perfecta y ``ln(n)`` si todo
+  se concentra en una entidad
+- Participación del top 3 y del top 10, en porcentaje
+- Curva acumulada tal como la dibuja la app: entidades de mayor a menor
+  monto en x (0 a 100) y porcentaje acumulado del presupuesto en y
+
+Las definiciones de HHI y top-k son las de la versión original de
+``calculate_concentration_metrics``, con las mismas operaciones en el mismo
+orden, así que para los mismos totales por entidad los valores coinciden
+exactamente. La app cachea el resultado con ``get_concentration()`` y
+``calculate_concentration_metrics`` lo lee de ahí.
+"""
+
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ConcentrationMetrics:
+    """Métricas de concentración de un nivel y su curva acumulada"""
+    n: int
+    total: float
+    hhi: float
+    gini: float
+    theil: float
+    top_3_pct: float
+    top_10_pct: float
+    sorted_values: np.ndarray  # De mayor a menor
+    lorenz_x: np.ndarray  # Porcentaje acumulado de entidades
+    lorenz_y: np.ndarray  # Porcentaje acumulado del presupuesto
+
+    def as_tuple(self):
+        """(HHI, % top 3, % top 10), el formato de ``calculate_concentration_metrics``"""
+        return self.hhi, self.top_3_pct, self.top_10_pct
+
+
+def concentration_metrics(values) -> ConcentrationMetrics:
+    """
+    Calcula todas las métricas de concentración de un conjunto de montos.
+
+    Args:
+        values: Montos por entidad (array o Serie, en cualquier orden)
+
+    Returns:
+        ConcentrationMetrics
+    """
+    ascending = np.sort(np.asarray(values, dtype=float), kind='stable')
+    descending = ascending[::-1]
+    n = len(ascending)
+    total = descending.sum()
+    if n == 0 or total == 0:
+        empty = np.array([], dtype=float)
+        return ConcentrationMetrics(n, float(total), np.nan, np.nan, np.nan, np.nan, np.nan,
+                                    descending, empty, empty)
+
+    shares = (descending / total) * 100
+    hhi = (shares ** 2).sum() / 10000
+    top_3_pct = (descending[:3].sum() / total) * 100
+    top_10_pct = (descending[:10].sum() / total) * 100
+
+    # Gini sobre los montos de menor a mayor: 2·Σ i·x_i / (n·Σx) − (n + 1)/n
+    ranks = np.arange(1, n + 1)
+    gini = 2 * (ranks * ascending).sum() / (n * total) - (n + 1) / n
+
+    # Theil: (1/n)·Σ (x/μ)·ln(x/μ); los montos nulos o negativos aportan 0
+    ratios = ascending / (total / n)
+    positive = ratios > 0
+    theil = (ratios[positive] * np.log(ratios[positive])).sum() / n
+
+    return ConcentrationMetrics(
+        n=n,
+        total=float(total),
+        hhi=float(hhi),
+        gini=float(gini),
+        theil=float(theil),
+        top_3_pct=float(top_3_pct),
+        top_10_pct=float(top_10_pct),
+        sorted_values=descending,
+        lorenz_x=np.linspace(0, 100, n),
+        lorenz_y=descending.cumsum() / total * 100
+    )
+
+
+def compute_concentration(cube, levels=None) -> Dict[str, ConcentrationMetrics]:
+    """
+    Métricas de concentración de cada nivel de un cubo del presupuesto.
+
+    Args:
+        cube: ``BudgetCube`` (modules.budget_cube)
+        levels: Niveles a calcular (por defecto todos los del cubo)
+
+    Returns:
+        Diccionario nivel -> ConcentrationMetrics
+    """
+    levels = cube.levels if levels is None else levels
+    return {
+        nivel: concentration_metrics(cube.level(nivel)['pesos_sum'].to_numpy())
+        for nivel in levels
+    }
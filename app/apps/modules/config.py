@@ -3,16 +3,62 @@ Configuraciones centralizadas para el portafolio de Data Science
 ================================================================
 """
 
+import os
+from pathlib import Path
+
 # URLs de datos
 DATA_SOURCES = {
     'water_quality': "https://datos.gob.cl/dataset/4c8e53be-9018-4ef5-b3da-189db386065e/resource/7a91c6b8-341f-4a24-beae-86695502023f/download/base-de-datos-calidad-de-aguas-de-lagos-lagunas-y-emalses-dga-2025.xlsx"
 }
 
+# Caché persistente de descargas (Parquet en disco)
+DATA_CACHE_CONFIG = {
+    'cache_dir': os.getenv('DATA_CACHE_DIR', str(Path(__file__).parent.parent.parent / "data" / "cache")),
+    'ttl_seconds': int(os.getenv('DATA_CACHE_TTL', 24 * 3600)),  # 1 día por defecto
+    'request_timeout': 30
+}
+
+# Descarga paginada del datastore CKAN de datos.gob.cl (presupuesto)
+CKAN_FETCH_CONFIG = {
+    'page_size': int(os.getenv('CKAN_PAGE_SIZE', 5000)),   # Filas por página
+    'max_workers': int(os.getenv('CKAN_MAX_WORKERS', 4)),  # Páginas descargadas en paralelo
+    'request_timeout': 30,
+    'retries': 3,          # Reintentos por página
+    'backoff_seconds': 0.5  # Espera base entre reintentos (se duplica en cada intento)
+}
+
+# Almacén SQLite de coordenadas compartido por la app y los notebooks
+COORDINATE_STORE_CONFIG = {
+    'path': os.getenv('COORDINATE_DB_PATH', str(Path(__file__).parent.parent.parent / "data" / "coordenadas.sqlite")),
+    'ttl_seconds': None,  # Sin vencimiento por defecto
+    'busy_timeout': 5.0   # Segundos de espera si otro proceso está escribiendo
+}
+
+# Rollups precalculados de la app demográfica (Parquet, se generan al construir la imagen)
+DEMOGRAPHICS_ROLLUP_CONFIG = {
+    'path': os.getenv('DEMOGRAPHICS_ROLLUP_DIR', str(Path(__file__).parent.parent.parent / "data" / "demographics_rollups")),
+    # Archivos de origen que lee scripts/build_demographics_rollups.py
+    'raw_csv': str(Path(__file__).parent.parent.parent.parent / "notebooks" / "data" / "nombres_demografia.csv"),
+    'extra_dir': str(Path(__file__).parent.parent.parent.parent / "notebooks" / "visualizaciones" / "demographics"),
+    'top_k_decade': 10,     # Nombres guardados por década y género
+    'top_k_all_time': 25    # Nombres guardados por género en el ranking histórico
+}
+
 # Configuración de mapas
 MAP_CONFIG = {
     'chile_center': [-35.6751, -71.5430],  # Centro de Chile continental
     'chile_zoom': 6,
-    'default_zoom': 8
+    'default_zoom': 8,
+    # Límites válidos para coordenadas de Chile continental e insular
+    'chile_bounds': {'lat': (-56, -17), 'lon': (-76, -66)},
+    # Caché LRU de mapas renderizados (compartido entre reruns y sesiones)
+    'artifact_cache_entries': int(os.getenv('MAP_CACHE_ENTRIES', 16)),
+    'artifact_cache_mb': int(os.getenv('MAP_CACHE_MB', 64))
+}
+
+# Curvas acumuladas (Lorenz, Pareto): puntos máximos que se envían al navegador
+CURVE_CONFIG = {
+    'max_points': int(os.getenv('CURVE_MAX_POINTS', 400))
 }
 
 # Colores para visualizaciones
@@ -0,0 +1,232 @@
+"""
+Almacén compartido de coordenadas en SQLite
+===========================================
+
+Cache de coordenadas de estaciones compartido por la app (``geo_utils``) y
+por el geocodificador de los notebooks (``GeocodificadorChile``). Reemplaza
+los archivos JSON que se cargaban y reescribían completos:
+
+- Búsqueda indexada por nombre normalizado (mayúsculas, sin tildes ni
+  espacios repetidos)
+- Modo WAL: varios lectores concurrentes (sesiones de Streamlit, procesos
+  de geocodificación) mientras un escritor agrega entradas
+- Columnas de procedencia (``fuente``) y vencimiento (``expira``)
+- Migración desde los caches JSON existentes con ``import_json``
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+from .config import COORDINATE_STORE_CONFIG
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS coordenadas (
+    clave TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    lat REAL,
+    lon REAL,
+    encontrado INTEGER NOT NULL,
+    fuente TEXT,
+    datos TEXT,
+    actualizado REAL NOT NULL,
+    expira REAL
+);
+CREATE INDEX IF NOT EXISTS idx_coordenadas_expira ON coordenadas (expira);
+"""
+
+# Límite de parámetros por consulta en versiones antiguas de SQLite
+_MAX_PARAMS = 500
+
+
+def normalize_station_name(name):
+    """Clave de búsqueda: mayúsculas, sin tildes y con espacios simples"""
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.upper().split())
+
+
+class CoordinateStore:
+    """Cache persistente de coordenadas en SQLite (una conexión por hilo)"""
+
+    def __init__(self, path=None, ttl_seconds=None):
+        """
+        Args:
+            path: Archivo SQLite (por defecto COORDINATE_STORE_CONFIG['path'])
+            ttl_seconds: Vigencia por defecto de las entradas nuevas (None = sin vencimiento)
+        """
+        self.path = Path(path or COORDINATE_STORE_CONFIG['path'])
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else COORDINATE_STORE_CONFIG['ttl_seconds']
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=COORDINATE_STORE_CONFIG['busy_timeout'])
+            conn.row_factory = sqlite3.Row
+            # WAL: los lectores no bloquean al escritor ni entre sí
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_record(row):
+        return {
+            'nombre': row['nombre'],
+            'lat': row['lat'],
+            'lon': row['lon'],
+            'found': bool(row['encontrado']),
+            'source': row['fuente'],
+            'data': json.loads(row['datos']) if row['datos'] else None,
+            'updated': row['actualizado']
+        }
+
+    def get(self, name):
+        """Entrada vigente de una estación o None"""
+        return self.get_many([name]).get(name)
+
+    def get_many(self, names):
+        """
+        Entradas vigentes de varias estaciones.
+
+        Returns:
+            Diccionario nombre (tal como se pidió) -> registro, sólo con las encontradas
+        """
+        keys = {}
+        for name in names:
+            keys.setdefault(normalize_station_name(name), []).append(name)
+
+        now = time.time()
+        result = {}
+        conn = self._connection()
+        key_list = list(keys)
+        for start in range(0, len(key_list), _MAX_PARAMS):
+            chunk = key_list[start:start + _MAX_PARAMS]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT * FROM coordenadas WHERE clave IN ({placeholders}) "
+                "AND (expira IS NULL OR expira > ?)",
+                (*chunk, now)
+            ).fetchall()
+            for row in rows:
+                record = self._to_record(row)
+                for name in keys[row['clave']]:
+                    result[name] = record
+        return result
+
+    def put(self, name, lat=None, lon=None, found=True, source=None, data=None, ttl_seconds=None):
+        """Guarda o reemplaza la entrada de una estación"""
+        self.put_many([{
+            'name': name, 'lat': lat, 'lon': lon, 'found': found,
+            'source': source, 'data': data, 'ttl_seconds': ttl_seconds
+        }])
+
+    def put_many(self, records):
+        """
+        Guarda varias entradas en una sola transacción.
+
+        Args:
+            records: Iterable de diccionarios con 'name' y opcionalmente 'lat',
+                'lon', 'found', 'source', 'data' y 'ttl_seconds'
+        """
+        now = time.time()
+        rows = []
+        for record in records:
+            ttl = record.get('ttl_seconds', None)
+            ttl = self.ttl_seconds if ttl is None else ttl
+            data = record.get('data')
+            rows.append((
+                normalize_station_name(record['name']),
+                record['name'],
+                record.get('lat'),
+                record.get('lon'),
+                int(bool(record.get('found', True))),
+                record.get('source'),
+                json.dumps(data, ensure_ascii=False) if data is not None else None,
+                now,
+                now + ttl if ttl else None
+            ))
+        if not rows:
+            return 0
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO coordenadas "
+                "(clave, nombre, lat, lon, encontrado, fuente, datos, actualizado, expira) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def delete(self, name):
+        """Elimina la entrada de una estación"""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM coordenadas WHERE clave = ?", (normalize_station_name(name),))
+
+    def purge_expired(self):
+        """Elimina las entradas vencidas y retorna cuántas se borraron"""
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM coordenadas WHERE expira IS NOT NULL AND expira <= ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def count(self):
+        """Número de entradas almacenadas"""
+        return self._connection().execute("SELECT COUNT(*) FROM coordenadas").fetchone()[0]
+
+    def import_json(self, json_path, source='json', overwrite=False):
+        """
+        Migra un cache JSON existente al almacén.
+
+        Acepta los dos formatos del proyecto: ``{"estación": {"lat", "lon"}}``
+        (geo_utils) y ``{"estación": {"latitud", "longitud", "geocodificado", ...}}``
+        (GeocodificadorChile).
+
+        Args:
+            json_path: Archivo JSON a importar
+            source: Procedencia registrada para las entradas importadas
+            overwrite: Reemplazar entradas que ya existen en el almacén
+
+        Returns:
+            Número de entradas importadas
+        """
+        with open(json_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+
+        existing = set() if overwrite else set(self.get_many(entries.keys()))
+        records = []
+        for name, value in entries.items():
+            if name in existing or not isinstance(value, dict):
+                continue
+            if 'lat' in value:
+                records.append({'name': name, 'lat': value['lat'], 'lon': value['lon'],
+                                'found': True, 'source': source})
+            else:
+                found = bool(value.get('geocodificado', value.get('latitud') is not None))
+                method = value.get('metodo')
+                records.append({
+                    'name': name,
+                    'lat': value.get('latitud'),
+                    'lon': value.get('longitud'),
+                    'found': found,
+                    'source': f"{source}:{method}" if method else source,
+                    'data': value
+                })
+        return self.put_many(records)
+
+    def close(self):
+        """Cierra la conexión del hilo actual"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
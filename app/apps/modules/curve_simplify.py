@@ -0,0 +1,143 @@
+"""
+Simplificación de curvas con presupuesto de puntos
+==================================================
+
+Las curvas acumuladas (Lorenz, Pareto) tienen un punto por entidad: con
+miles de programas o subtítulos la figura pesa megabytes y el navegador se
+vuelve lento, aunque la curva se vea igual con unos cientos de puntos.
+
+``simplify_curve`` reduce una curva a ``max_points`` puntos con
+Largest-Triangle-Three-Buckets (LTTB): divide los puntos interiores en
+buckets y en cada uno conserva el que forma el triángulo de mayor área con
+el punto elegido anterior y el promedio del bucket siguiente. Los buckets
+tienen igual longitud de arco (en coordenadas normalizadas) y no igual
+número de puntos: en una curva de Lorenz muy desigual casi todo el
+presupuesto se concentra en las primeras entidades, y con buckets por
+índice ese tramo quedaba representado por uno o dos puntos. Además:
+
+- El primer y el último punto se conservan siempre, con su valor exacto.
+- Se conserva el "codo" de la curva (el punto más lejano de la cuerda entre
+  los extremos); en una curva acumulada contra la diagonal de igualdad es
+  la mayor brecha, el índice de Hoover.
+- ``keep`` fuerza otros índices (por ejemplo, el top 3 y el top 10).
+
+Los puntos que se conservan son puntos originales, no promedios, así que
+el hover siempre muestra valores reales.
+"""
+
+import numpy as np
+
+from .config import CURVE_CONFIG
+
+
+def knee_index(x, y):
+    """Índice del punto más lejano de la cuerda entre el primer y el último punto"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) < 3:
+        return 0
+    dx, dy = x[-1] - x[0], y[-1] - y[0]
+    # Distancia perpendicular sin normalizar (el denominador es constante)
+    distance = np.abs(dy * (x - x[0]) - dx * (y - y[0]))
+    return int(np.argmax(distance))
+
+
+def _bucket_edges(x, y, n_buckets):
+    """Bordes de ``n_buckets`` buckets no vacíos de igual longitud de arco entre el punto 1 y el n - 1"""
+    n = len(x)
+    x_range = (x[-1] - x[0]) or 1.0
+    y_range = (y.max() - y.min()) or 1.0
+    arc = np.concatenate(([0.0], np.cumsum(np.hypot(np.diff(x) / x_range, np.diff(y) / y_range))))
+    edges = np.searchsorted(arc, np.linspace(arc[1], arc[-1], n_buckets + 1))
+    edges[0], edges[-1] = 1, n - 1
+    # Bordes estrictamente crecientes: edges[i] - i no decreciente y dentro del rango
+    offsets = np.arange(n_buckets + 1)
+    shifted = np.clip(np.maximum.accumulate(edges - offsets), 1, n - 1 - n_buckets)
+    return shifted + offsets
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Índices de los puntos que conserva Largest-Triangle-Three-Buckets.
+
+    Args:
+        x: Coordenadas x, ordenadas
+        y: Coordenadas y
+        n_out: Número de puntos a conservar (incluye ambos extremos)
+
+    Returns:
+        Array de índices ordenado, con 0 y len(x) - 1
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1]) if n > 1 else np.arange(n)
+
+    # n_out - 2 buckets entre el primer y el último punto
+    edges = _bucket_edges(x, y, n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    selected = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(np.argmax(area))
+        indices[bucket + 1] = selected
+    return indices
+
+
+def simplify_indices(x, y, max_points=None, keep=()):
+    """
+    Índices de una versión de la curva con a lo sumo ``max_points`` puntos.
+
+    Los índices forzados (extremos, codo y ``keep``) se conservan siempre:
+    si son más que ``max_points``, el presupuesto sube a su cantidad y el
+    resultado son exactamente esos índices.
+
+    Args:
+        x: Coordenadas x, ordenadas
+        y: Coordenadas y
+        max_points: Presupuesto de puntos (por defecto ``CURVE_CONFIG['max_points']``)
+        keep: Índices que deben conservarse además de los extremos y el codo
+
+    Returns:
+        Array de índices ordenado
+    """
+    n = len(x)
+    max_points = max_points or CURVE_CONFIG['max_points']
+    if n <= max_points:
+        return np.arange(n)
+
+    forced = {0, n - 1, knee_index(x, y)}
+    forced.update(int(i) for i in keep if 0 <= i < n)
+    max_points = max(max_points, len(forced))
+    # Los índices forzados descuentan del presupuesto de LTTB (los extremos ya los incluye);
+    # con el presupuesto justo LTTB aporta sólo los extremos
+    n_lttb = max_points - (len(forced) - 2)
+    indices = np.union1d(lttb_indices(x, y, n_lttb), np.fromiter(forced, dtype=np.int64))
+    return indices
+
+
+def simplify_curve(x, y, max_points=None, keep=()):
+    """
+    Versión de la curva con a lo sumo ``max_points`` puntos (ver ``simplify_indices``).
+
+    Returns:
+        Tupla (x, y) con los puntos conservados
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    indices = simplify_indices(x, y, max_points, keep)
+    return x[indices], y[indices]
@@ -0,0 +1,203 @@
+"""
+Caché persistente de descargas en formato Parquet
+=================================================
+
+Guarda en disco los DataFrames descargados desde fuentes remotas para que
+un arranque en caliente lea columnas tipadas en milisegundos en lugar de
+volver a descargar y parsear el archivo original (p. ej. el Excel de la DGA).
+
+Cada entrada se identifica por la URL y guarda junto al Parquet un archivo
+de metadatos con el ``ETag`` y ``Last-Modified`` entregados por el servidor.
+Mientras la entrada esté dentro del TTL se lee directamente; al vencer se
+revalida con un GET condicional (``If-None-Match`` / ``If-Modified-Since``)
+y sólo se descarga de nuevo si el servidor informa cambios.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .config import DATA_CACHE_CONFIG
+from .lazy_imports import lazy_import
+
+# requests se importa en la primera descarga
+requests = lazy_import('requests')
+
+# Contadores de uso del caché (por proceso)
+CACHE_STATS = {
+    'hits': 0,          # Lectura directa dentro del TTL
+    'revalidated': 0,   # TTL vencido pero el servidor respondió 304
+    'misses': 0,        # Descarga y parseo completos
+    'stale': 0          # Falla de red, se sirvió la copia local vencida
+}
+
+
+def get_cache_stats():
+    """Retorna una copia de los contadores de hit/miss del caché"""
+    return dict(CACHE_STATS)
+
+
+def reset_cache_stats():
+    """Reinicia los contadores del caché"""
+    for key in CACHE_STATS:
+        CACHE_STATS[key] = 0
+
+
+def dataframe_fingerprint(df, sample_rows=1000):
+    """
+    Huella barata de un DataFrame para usar como clave de caché.
+    
+    Combina forma, columnas, tipos y el hash de una muestra fija de filas,
+    evitando recorrer el DataFrame completo en cada rerun. Con
+    ``sample_rows=None`` se hashean todas las filas.
+    """
+    if df is None:
+        return None
+    step = 1 if sample_rows is None else max(1, len(df) // sample_rows)
+    sample = df.iloc[::step]
+    hasher = hashlib.sha1()
+    hasher.update(repr((df.shape, [str(c) for c in df.columns], [str(t) for t in df.dtypes])).encode('utf-8'))
+    try:
+        hasher.update(pd.util.hash_pandas_object(sample, index=True).to_numpy().tobytes())
+    except TypeError:
+        # Columnas con objetos no hasheables: usar su representación en texto
+        hasher.update(pd.util.hash_pandas_object(sample.astype(str), index=True).to_numpy().tobytes())
+    return hasher.hexdigest()
+
+
+def _normalize_for_parquet(df):
+    """Convierte columnas object con tipos mezclados a texto para que Parquet las acepte"""
+    for col in df.columns:
+        if df[col].dtype == object:
+            inferred = pd.api.types.infer_dtype(df[col], skipna=True)
+            if inferred not in ('string', 'empty'):
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    df.columns = [str(col) for col in df.columns]
+    return df
+
+
+class ParquetDataCache:
+    """Caché en disco de DataFrames descargados, con revalidación HTTP condicional"""
+
+    def __init__(self, cache_dir=None, ttl_seconds=None, timeout=None):
+        self.cache_dir = Path(cache_dir or DATA_CACHE_CONFIG['cache_dir'])
+        self.ttl_seconds = DATA_CACHE_CONFIG['ttl_seconds'] if ttl_seconds is None else ttl_seconds
+        self.timeout = timeout or DATA_CACHE_CONFIG['request_timeout']
+
+    def _paths(self, url):
+        """Rutas del Parquet y de los metadatos para una URL"""
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"{key}.parquet", self.cache_dir / f"{key}.json"
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta_path, meta):
+        tmp_path = meta_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    def _store(self, url, df, response):
+        """Escribe el DataFrame y sus metadatos de forma atómica"""
+        data_path, meta_path = self._paths(url)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = data_path.with_suffix('.parquet.tmp')
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, data_path)
+
+        self._write_meta(meta_path, {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+            'rows': len(df)
+        })
+
+    def is_fresh(self, url):
+        """Indica si existe una entrada vigente (dentro del TTL) para la URL"""
+        data_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path)
+        return (
+            meta is not None and data_path.exists()
+            and time.time() - meta.get('fetched_at', 0) < self.ttl_seconds
+        )
+
+    def get_frame(self, url, parser, force_refresh=False):
+        """
+        Obtiene el DataFrame asociado a una URL usando el caché cuando es posible.
+
+        Args:
+            url: URL del recurso remoto
+            parser: Función que recibe los bytes descargados y retorna un DataFrame
+            force_refresh: Ignora el TTL y revalida contra el servidor
+
+        Returns:
+            Tupla (DataFrame, estado) donde estado es 'hit', 'revalidated',
+            'miss' o 'stale'
+        """
+        data_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path) if data_path.exists() else None
+
+        # 1. Entrada vigente: lectura directa del Parquet
+        if meta and not force_refresh and time.time() - meta.get('fetched_at', 0) < self.ttl_seconds:
+            CACHE_STATS['hits'] += 1
+            return pd.read_parquet(data_path), 'hit'
+
+        # 2. Entrada vencida o inexistente: GET condicional
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            response = requests.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and meta:
+                meta['fetched_at'] = time.time()
+                self._write_meta(meta_path, meta)
+                CACHE_STATS['revalidated'] += 1
+                return pd.read_parquet(data_path), 'revalidated'
+            response.raise_for_status()
+        except requests.RequestException:
+            # Sin conexión: preferir una copia vencida antes que fallar
+            if meta:
+                CACHE_STATS['stale'] += 1
+                return pd.read_parquet(data_path), 'stale'
+            raise
+
+        # 3. Contenido nuevo: parsear y persistir
+        df = _normalize_for_parquet(parser(response.content))
+        CACHE_STATS['misses'] += 1
+        try:
+            self._store(url, df, response)
+        except Exception:
+            # Sin disco escribible o sin pyarrow: se sigue funcionando sin caché
+            pass
+        return df, 'miss'
+
+    def clear(self, url=None):
+        """Elimina la entrada de una URL o todo el caché"""
+        if url is not None:
+            targets = self._paths(url)
+        else:
+            targets = list(self.cache_dir.glob('*.parquet')) + list(self.cache_dir.glob('*.json'))
+        for path in targets:
+            try:
+                Path(path).unlink()
+            except FileNotFoundError:
+                pass
+
+
+# Instancia global
+data_cache = ParquetDataCache()
@@ -8,51 +8,59 @@ import streamlit as st
 import numpy as np
 from datetime import datetime
 from io import BytesIO, StringIO
-import requests
 from pathlib import Path
 
+from .number_parsing import parse_chilean_columns, parse_chilean_numbers
+
+def parse_water_quality_content(content):
+    """Parsea el archivo descargado de la DGA (Excel, con CSV como respaldo)"""
+    try:
+        # Intentar como Excel primero
+        return pd.read_excel(
+            BytesIO(content),
+            sheet_name=0,
+            header=0,
+            na_values=['', 'N/A', 'NA', 'null', 'NULL']
+        )
+    except Exception:
+        # Intentar diferentes configuraciones de CSV
+        text = content.decode('utf-8', errors='ignore')
+        for separator in [',', ';', '\t']:
+            try:
+                df = pd.read_csv(
+                    StringIO(text),
+                    sep=separator,
+                    encoding='utf-8',
+                    on_bad_lines='skip',
+                    low_memory=False,
+                    dtype=str,
+                    quoting=1,
+                    skipinitialspace=True
+                )
+                if len(df.columns) >= 5:
+                    return df
+            except Exception:
+                continue
+    raise ValueError("Formato de archivo no reconocido (ni Excel ni CSV)")
+
 def load_water_quality_data():
-    """Carga datos de calidad del agua desde fuente oficial o demo"""
+    """Carga datos de calidad del agua desde fuente oficial (con caché en disco) o demo"""
     from .config import DATA_SOURCES
+    from .data_cache import data_cache
     from .water_quality import create_demo_water_data
+    from .water_quality_config import WATER_QUALITY_DTYPE_SCHEMA
     
     try:
         # Intentar cargar datos oficiales
-        st.info("🔄 Cargando datos oficiales de la DGA...")
         url = DATA_SOURCES['water_quality']
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        if not data_cache.is_fresh(url):
+            st.info("🔄 Cargando datos oficiales de la DGA...")
+        df, cache_status = data_cache.get_frame(url, parse_water_quality_content)
         
-        try:
-            # Intentar como Excel primero
-            df = pd.read_excel(
-                BytesIO(response.content),
-                sheet_name=0,
-                header=0,
-                na_values=['', 'N/A', 'NA', 'null', 'NULL']
-            )
+        if cache_status == 'miss':
             st.success(f"✅ Datos oficiales cargados: {df.shape[0]} filas, {df.shape[1]} columnas")
-            
-        except Exception:
-            # Intentar diferentes configuraciones de CSV
-            content = response.content.decode('utf-8', errors='ignore')
-            for separator in [',', ';', '\t']:
-                try:
-                    df = pd.read_csv(
-                        StringIO(content),
-                        sep=separator,
-                        encoding='utf-8',
-                        on_bad_lines='skip',
-                        low_memory=False,
-                        dtype=str,
-                        quoting=1,
-                        skipinitialspace=True
-                    )
-                    if len(df.columns) >= 5:
-                        st.info(f"📊 Datos cargados como CSV con separador '{separator}'")
-                        break
-                except Exception:
-                    continue
+        elif cache_status == 'stale':
+            st.warning("⚠️ Sin conexión con la DGA, usando la última copia local de los datos")
         
         # Procesamiento básico
         df = process_water_data(df)
@@ -62,16 +70,72 @@ def load_water_quality_data():
         st.warning(f"⚠️ Error al cargar datos oficiales: {str(e)}")
         st.info("🔄 Cargando datos de demostración...")
         
-        df = create_demo_water_data()
+        df = apply_dtype_schema(create_demo_water_data(), WATER_QUALITY_DTYPE_SCHEMA)
         return df, False
 
+def memory_usage_mb(df):
+    """Memoria real ocupada por un DataFrame, en MB"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+def apply_dtype_schema(df, schema):
+    """
+    Convierte las columnas de un DataFrame a los tipos compactos de un esquema.
+    
+    Args:
+        df: DataFrame a convertir (se modifica y retorna)
+        schema: Diccionario con listas de columnas por tipo ('category',
+            'float32', 'int16', 'int8') y la opción 'downcast_numeric' para
+            reducir el resto de columnas numéricas
+    
+    Returns:
+        DataFrame con los tipos convertidos
+    """
+    
+    if df is None or len(df) == 0:
+        return df
+    
+    declared = set()
+    
+    for col in schema.get('category', []):
+        if col in df.columns:
+            declared.add(col)
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+    
+    for col in schema.get('float32', []):
+        if col in df.columns:
+            declared.add(col)
+            if pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = df[col].astype('float32')
+            else:
+                # Texto con formato chileno (coma decimal, punto de miles)
+                df[col] = parse_chilean_numbers(df[col]).astype(np.float32)
+    
+    for dtype in ('int16', 'int8'):
+        for col in schema.get(dtype, []):
+            if col in df.columns:
+                declared.add(col)
+                values = pd.to_numeric(df[col], errors='coerce')
+                # Tipo entero nullable si hay valores faltantes
+                df[col] = values.astype(dtype.capitalize() if values.isna().any() else dtype)
+    
+    if schema.get('downcast_numeric', False):
+        for col in df.select_dtypes(include=['float64']).columns.difference(declared):
+            df[col] = df[col].astype('float32')
+        for col in df.select_dtypes(include=['int64', 'int32']).columns.difference(declared):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    return df
+
 def process_water_data(df):
     """Procesa y limpia los datos de calidad del agua"""
+    from .water_quality_config import WATER_QUALITY_DTYPE_SCHEMA
     
     if df is None or len(df) == 0:
         return df
     
     st.info(f"📋 Procesando datos: {len(df)} filas, {len(df.columns)} columnas")
+    memory_before = memory_usage_mb(df)
     
     # Limpiar nombres de columnas
     df.columns = df.columns.astype(str).str.strip()
@@ -87,7 +151,9 @@ def process_water_data(df):
         if col in df.columns:
             try:
                 df[col] = pd.to_datetime(df[col], errors='coerce')
-                df['FEC_MEDICION'] = df[col]  # Normalizar nombre
+                if col != 'FEC_MEDICION':
+                    # Normalizar nombre sin duplicar la columna
+                    df = df.rename(columns={col: 'FEC_MEDICION'})
                 date_col = col
                 break
             except Exception:
@@ -101,6 +167,11 @@ def process_water_data(df):
     else:
         st.warning("⚠️ No se encontraron columnas de fecha válidas")
     
+    # Tipos compactos (categorías, float32, enteros pequeños)
+    df = apply_dtype_schema(df, WATER_QUALITY_DTYPE_SCHEMA)
+    memory_after = memory_usage_mb(df)
+    st.info(f"💾 Memoria de datos: {memory_before:.1f} MB → {memory_after:.1f} MB")
+    
     return df
 
 def load_emissions_data(csv_path):
@@ -126,6 +197,29 @@ def load_emissions_data(csv_path):
         st.error(f"❌ Error al cargar datos RETC: {str(e)}")
         return None
 
+def load_emissions_aggregates(csv_path, chunksize=None, engine='pandas'):
+    """
+    Carga datos RETC en modo streaming: agrega por bloques sin mantener el CSV completo en memoria.
+    
+    Returns:
+        Estructura de datos de emisiones (igual a process_real_emissions_data) o None si falla
+    """
+    from .emissions_stream import stream_emissions_data, DEFAULT_CHUNKSIZE
+    
+    try:
+        data, stats = stream_emissions_data(csv_path, chunksize=chunksize or DEFAULT_CHUNKSIZE, engine=engine)
+        
+        rss = f", RSS máx. {stats['peak_rss_mb']:.0f} MB" if stats['peak_rss_mb'] else ""
+        st.success(
+            f"✅ Datos RETC procesados: {stats['rows']:,} registros en {stats['chunks']} bloques "
+            f"({stats['rows_per_sec']:,.0f} filas/s{rss})"
+        )
+        return data
+        
+    except Exception as e:
+        st.error(f"❌ Error al procesar datos RETC: {str(e)}")
+        return None
+
 def diagnose_excel_structure(file_path):
     """Diagnostica la estructura de un archivo Excel"""
     
@@ -157,16 +251,17 @@ def diagnose_excel_structure(file_path):
 def convert_numeric_columns(df, columns):
     """Convierte columnas a numéricas manejando formato chileno (comas decimales)"""
     
-    for col in columns:
-        if col in df.columns:
-            try:
-                # Convertir a string y reemplazar comas por puntos
-                df[col] = pd.to_numeric(
-                    df[col].astype(str).str.replace(',', '.', regex=False),
-                    errors='coerce'
-                ).fillna(0)
-                st.info(f"✅ Columna '{col}' convertida a numérica")
-            except Exception as e:
-                st.warning(f"⚠️ Error convirtiendo '{col}': {str(e)}")
+    present = [col for col in columns if col in df.columns]
+    if not present:
+        return df
+    
+    try:
+        # Todas las columnas en una sola llamada; valores no numéricos quedan en 0
+        converted = parse_chilean_columns(df, present, fill_value=0)
+        for col in present:
+            df[col] = converted[col]
+        st.info(f"✅ Columnas convertidas a numéricas: {', '.join(present)}")
+    except Exception as e:
+        st.warning(f"⚠️ Error convirtiendo columnas numéricas: {str(e)}")
     
     return df
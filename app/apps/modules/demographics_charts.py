@@ -0,0 +1,174 @@
+"""
+Figuras de la app demográfica
+=============================
+
+Constructores de las figuras con más trazos de ``demographics_app_new.py``.
+En lugar de agregar trazos, anotaciones y líneas de a uno (cada
+``add_trace``/``add_annotation``/``add_vline`` valida y copia el layout
+completo), arman las listas primero y las entregan a Plotly en una sola
+llamada:
+
+- ``build_name_trends_figure``: un trazo por nombre (con toda su serie por
+  década) para los nombres del top-k de cada década y género, más las
+  anotaciones de eventos históricos en ambos subgráficos
+- ``add_event_lines``: líneas verticales punteadas con su etiqueta para los
+  eventos históricos dentro de un rango de años
+"""
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+GENDER_ORDER = ['M', 'F']
+
+EVENT_ANNOTATION_STYLE = dict(
+    showarrow=True,
+    arrowhead=2,
+    ax=0,
+    ay=-40,
+    bgcolor="rgba(255, 255, 255, 0.8)",
+    bordercolor="#c7c7c7",
+    borderwidth=1,
+    font=dict(size=10)
+)
+
+
+def _axis_ref(axis, row):
+    """Referencia de eje de Plotly para la fila de un subgráfico ('x', 'x2', ...)"""
+    return axis if row == 1 else f"{axis}{row}"
+
+
+def build_name_trends_figure(decade_top, name_history, decades, events, top_k=5):
+    """
+    Tendencias de los nombres más populares por década, un subgráfico por género.
+
+    Args:
+        decade_top: Rollup con decade, gender, rank, name y total_count
+        name_history: Rollup con decade, name, gender y total_count
+        decades: Décadas del eje x
+        events: Diccionario año -> evento histórico
+        top_k: Nombres por década y género
+
+    Returns:
+        Figura de Plotly
+    """
+    fig = make_subplots(
+        rows=2, cols=1,
+        subplot_titles=('Nombres Masculinos más Populares por Década',
+                       'Nombres Femeninos más Populares por Década'),
+        vertical_spacing=0.15,
+        shared_xaxes=True,
+        x_title="Década"
+    )
+
+    top = decade_top[decade_top['rank'] <= top_k]
+    last_decade = top['decade'].max()
+    legend_names = set(map(tuple, top.loc[top['decade'] == last_decade, ['gender', 'name']].to_numpy()))
+
+    # Serie completa de cada (género, nombre): posiciones dentro de name_history
+    history = name_history.sort_values('decade', kind='mergesort')
+    positions = history.groupby(['gender', 'name'], sort=False).indices
+    history_decades = history['decade'].to_numpy()
+    history_counts = history['total_count'].to_numpy()
+
+    traces, rows = [], []
+    for gender_idx, gender in enumerate(GENDER_ORDER):
+        # Nombres del top de alguna década, en orden de primera aparición (década, rango)
+        tracked = top.loc[top['gender'] == gender, 'name'].drop_duplicates()
+        for name in tracked:
+            idx = positions.get((gender, name))
+            if idx is None:
+                continue
+            traces.append(go.Scatter(
+                x=history_decades[idx],
+                y=history_counts[idx],
+                mode='lines+markers',
+                name=name,
+                line=dict(width=2),
+                marker=dict(size=6),
+                showlegend=(gender, name) in legend_names,  # Sólo los nombres del top de la última década
+                legendgroup=name
+            ))
+            rows.append(gender_idx + 1)
+    if traces:
+        fig.add_traces(traces, rows=rows, cols=[1] * len(traces))
+
+    # Eventos históricos en la década más cercana, en ambos subgráficos
+    annotations = [
+        dict(
+            x=(year // 10) * 10,
+            y=0.9,  # Posición relativa al eje y
+            text=f"{year}: {event}",
+            xref=_axis_ref('x', row),
+            yref=_axis_ref('y', row),
+            **EVENT_ANNOTATION_STYLE
+        )
+        for row in (1, 2)
+        for year, event in events.items()
+        if (year // 10) * 10 in decades
+    ]
+
+    axis_x = dict(title=dict(text="Década"), tickmode='array', tickvals=list(decades))
+    axis_y = dict(title=dict(text="Número de Nacimientos"))
+    fig.update_layout(
+        annotations=list(fig.layout.annotations) + annotations,
+        height=800,
+        title_text="Tendencias de Nombres Populares con Contexto Histórico (1910-2013)",
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.2,
+            xanchor="center",
+            x=0.5
+        ),
+        template="plotly_white",
+        hovermode="closest",
+        xaxis=axis_x,
+        xaxis2=axis_x,
+        yaxis=axis_y,
+        yaxis2=axis_y
+    )
+    return fig
+
+
+def add_event_lines(fig, events, x_min, x_max):
+    """
+    Agrega una línea vertical con etiqueta por cada evento entre ``x_min`` y ``x_max``.
+
+    Equivale a llamar ``fig.add_vline`` por evento, pero con un solo ``update_layout``.
+
+    Args:
+        fig: Figura de Plotly (un solo eje x)
+        events: Diccionario año -> evento histórico
+        x_min: Primer año del eje
+        x_max: Último año del eje
+
+    Returns:
+        La misma figura
+    """
+    years = [year for year in events if x_min <= year <= x_max]
+    shapes = [
+        dict(
+            type='line', x0=year, x1=year, xref='x', y0=0, y1=1, yref='y domain',
+            line=dict(color="rgba(0, 0, 0, 0.3)", dash="dash", width=1)
+        )
+        for year in years
+    ]
+    annotations = [
+        dict(
+            text=f"{year}: {events[year]}",
+            x=year, xref='x', xanchor='center',
+            y=1, yref='y domain', yanchor='bottom',
+            showarrow=False,
+            font=dict(size=10, color="black"),
+            bgcolor="white",
+            bordercolor="black",
+            borderwidth=1
+        )
+        for year in years
+    ]
+    fig.update_layout(
+        shapes=list(fig.layout.shapes) + shapes,
+        annotations=list(fig.layout.annotations) + annotations
+    )
+    return fig
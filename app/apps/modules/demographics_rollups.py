@@ -0,0 +1,251 @@
+"""
+Rollups precalculados de la app demográfica
+===========================================
+
+Las visualizaciones de ``demographics_app_new.py`` agrupaban
+``nombres_demografia.csv`` (``groupby(['decade','name','gender'])`` y
+``groupby(['name','gender'])``) cada vez que se invalidaba su caché. Este
+módulo materializa esas agregaciones una sola vez, al construir la imagen
+(``scripts/build_demographics_rollups.py``), en un directorio de archivos
+Parquet pequeños. La app lee sólo el rollup que necesita cada pestaña y
+nunca abre el CSV original.
+
+Rollups generados:
+
+- ``summary``: totales de la cabecera (nacimientos, nombres únicos, período)
+- ``decade_top``: los ``top_k_decade`` nombres por década y género, con su rango
+- ``name_history``: serie por década de cada nombre que aparece en ``decade_top``
+- ``all_time_top``: los ``top_k_all_time`` nombres por género de todo el período
+- ``yearly_totals``: nacimientos por año y género, con el total del año
+- ``diversity``: concentración de nombres por década
+- ``name_length``: longitud promedio de nombres por año
+
+Los tres últimos sólo existen si su CSV de origen está disponible.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .config import DEMOGRAPHICS_ROLLUP_CONFIG
+
+# Versión del formato; cambiarla obliga a reconstruir el almacén
+ROLLUP_VERSION = 1
+
+MANIFEST_FILE = 'manifest.json'
+
+# CSV adicionales (en ``extra_dir``) y el argumento de build_demographics_rollups que alimentan
+EXTRA_SOURCES = {
+    'gender_year': 'gender_year_counts.csv',
+    'diversity': 'name_diversity.csv',
+    'name_length': 'name_length.csv'
+}
+
+
+def read_demographics_sources(raw_csv=None, extra_dir=None):
+    """
+    Lee los CSV de origen de los rollups.
+
+    Args:
+        raw_csv: Ruta de nombres_demografia.csv (por defecto la de la configuración)
+        extra_dir: Directorio de los CSV adicionales
+
+    Returns:
+        Diccionario con 'data', 'gender_year', 'diversity' y 'name_length'
+        (None para los archivos que no existen)
+    """
+    raw_csv = Path(raw_csv or DEMOGRAPHICS_ROLLUP_CONFIG['raw_csv'])
+    extra_dir = Path(extra_dir or DEMOGRAPHICS_ROLLUP_CONFIG['extra_dir'])
+
+    sources = {'data': None}
+    if raw_csv.exists():
+        data = pd.read_csv(raw_csv)
+        data['decade'] = data['decade'].astype(int)
+        sources['data'] = data
+    for key, file_name in EXTRA_SOURCES.items():
+        path = extra_dir / file_name
+        sources[key] = pd.read_csv(path) if path.exists() else None
+    return sources
+
+
+def _ranked_top(df, group_cols, top_k):
+    """Primeras ``top_k`` filas por grupo según total_count, con su rango (1 = más popular)"""
+    # Orden estable: a igual total se conserva el orden alfabético del groupby
+    ordered = df.sort_values('total_count', ascending=False, kind='mergesort')
+    ordered['rank'] = ordered.groupby(group_cols, sort=False).cumcount() + 1
+    top = ordered[ordered['rank'] <= top_k]
+    return top.sort_values(group_cols + ['rank']).reset_index(drop=True)
+
+
+def build_demographics_rollups(data, gender_year=None, diversity=None, name_length=None,
+                               top_k_decade=None, top_k_all_time=None):
+    """
+    Calcula los rollups de la app demográfica.
+
+    Args:
+        data: DataFrame con decade, name, gender y total_count
+        gender_year: DataFrame con year, gender y count (opcional)
+        diversity: DataFrame de concentración de nombres (opcional)
+        name_length: DataFrame con year, gender y avg_length (opcional)
+        top_k_decade: Nombres por década y género (por defecto el de la configuración)
+        top_k_all_time: Nombres por género en el ranking histórico
+
+    Returns:
+        Diccionario nombre del rollup -> DataFrame
+    """
+    top_k_decade = top_k_decade or DEMOGRAPHICS_ROLLUP_CONFIG['top_k_decade']
+    top_k_all_time = top_k_all_time or DEMOGRAPHICS_ROLLUP_CONFIG['top_k_all_time']
+
+    by_decade = data.groupby(['decade', 'name', 'gender'])['total_count'].sum().reset_index()
+    by_decade['decade'] = by_decade['decade'].astype(int)
+
+    decade_top = _ranked_top(by_decade, ['decade', 'gender'], top_k_decade)
+    decade_top = decade_top[['decade', 'gender', 'rank', 'name', 'total_count']]
+
+    # Historia completa (todas las décadas) de los nombres que alguna vez estuvieron en el top
+    tracked = decade_top[['name', 'gender']].drop_duplicates()
+    name_history = by_decade.merge(tracked, on=['name', 'gender'])
+    name_history = name_history.sort_values(['gender', 'name', 'decade']).reset_index(drop=True)
+
+    all_time = data.groupby(['name', 'gender'])['total_count'].sum().reset_index()
+    all_time_top = _ranked_top(all_time, ['gender'], top_k_all_time)
+    all_time_top = all_time_top[['gender', 'rank', 'name', 'total_count']]
+
+    rollups = {
+        'summary': pd.DataFrame([{
+            'total_births': int(data['total_count'].sum()),
+            'unique_names': int(data['name'].nunique()),
+            'decade_min': int(data['decade'].min()),
+            'decade_max': int(data['decade'].max())
+        }]),
+        'decade_top': decade_top,
+        'name_history': name_history,
+        'all_time_top': all_time_top
+    }
+
+    if gender_year is not None:
+        yearly = gender_year.groupby(['year', 'gender'])['count'].sum().reset_index()
+        yearly['total'] = yearly.groupby('year')['count'].transform('sum')
+        rollups['yearly_totals'] = yearly
+    if diversity is not None:
+        rollups['diversity'] = diversity.reset_index(drop=True)
+    if name_length is not None:
+        rollups['name_length'] = name_length.reset_index(drop=True)
+
+    return rollups
+
+
+class DemographicsRollupStore:
+    """Directorio de rollups en Parquet con un manifiesto; cada rollup se lee una vez por proceso"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or DEMOGRAPHICS_ROLLUP_CONFIG['path'])
+        self._manifest = None
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    @property
+    def manifest(self):
+        """Contenido de manifest.json, o None si el almacén no existe o es de otra versión"""
+        if self._manifest is None:
+            try:
+                with open(self.path / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                return None
+            if manifest.get('version') != ROLLUP_VERSION:
+                return None
+            self._manifest = manifest
+        return self._manifest
+
+    @property
+    def available(self):
+        """True si existe un almacén construido y compatible"""
+        return self.manifest is not None
+
+    @property
+    def fingerprint(self):
+        """Huella de la construcción actual (cambia al reconstruir el almacén)"""
+        manifest = self.manifest
+        if manifest is None:
+            return None
+        return hashlib.sha1(json.dumps(manifest, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def names(self):
+        """Rollups disponibles en el almacén"""
+        manifest = self.manifest
+        return list(manifest['rollups']) if manifest else []
+
+    def load(self, name):
+        """
+        Lee un rollup (sólo la primera vez; luego se sirve desde memoria).
+
+        Args:
+            name: Nombre del rollup (p. ej. 'decade_top')
+
+        Returns:
+            DataFrame, o None si el rollup no está en el almacén
+        """
+        frame = self._frames.get(name)
+        if frame is None:
+            if name not in self.names():
+                return None
+            with self._lock:
+                frame = self._frames.get(name)
+                if frame is None:
+                    frame = pd.read_parquet(self.path / f"{name}.parquet")
+                    self._frames[name] = frame
+        return frame
+
+    def write(self, rollups, sources=None):
+        """
+        Escribe los rollups y el manifiesto, reemplazando el almacén anterior.
+
+        El manifiesto se escribe al final, de modo que un lector nunca ve un
+        almacén a medio construir.
+
+        Args:
+            rollups: Diccionario nombre -> DataFrame (de build_demographics_rollups)
+            sources: Descripción de los archivos de origen, se guarda en el manifiesto
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        entries = {}
+        for name, frame in rollups.items():
+            data_path = self.path / f"{name}.parquet"
+            tmp_path = data_path.with_suffix('.parquet.tmp')
+            frame.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, data_path)
+            entries[name] = {
+                'rows': len(frame),
+                'columns': [str(col) for col in frame.columns],
+                'bytes': data_path.stat().st_size
+            }
+
+        # Rollups de una construcción anterior que ya no se generan
+        for stale in self.path.glob('*.parquet'):
+            if stale.stem not in entries:
+                stale.unlink()
+
+        manifest_path = self.path / MANIFEST_FILE
+        tmp_path = manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': ROLLUP_VERSION,
+                'built_at': time.time(),
+                'sources': sources or {},
+                'rollups': entries
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+        with self._lock:
+            self._manifest = None
+            self._frames.clear()
+
+
+# Instancia global
+demographics_rollups = DemographicsRollupStore()
@@ -7,7 +7,11 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 from .config import CHILE_REGIONS
-from .emissions_config import CO2_EMISSION_SECTORS, POLLUTANT_TYPES, EMISSION_SCALES
+from .number_parsing import parse_chilean_numbers
+from .emissions_config import (
+    CO2_EMISSION_SECTORS, POLLUTANT_TYPES, EMISSION_SCALES,
+    EMISSION_DIMENSIONS, EMISSION_CROSSTABS
+)
 
 def create_demo_emissions_data():
     """Crea datos de demostración para emisiones CO2 basados en análisis real"""
@@ -122,9 +126,156 @@ def create_demo_emissions_data():
         'raw_data': raw_data_df
     }
 
-def process_real_emissions_data(raw_data):
-    """Procesa los datos reales del RETC para crear estructura similar a demo_data"""
-    
+def resolve_emission_dimensions(columns, dimensions=None):
+    """
+    Determina la columna de agrupación de cada dimensión configurada.
+
+    Args:
+        columns: Columnas disponibles en los datos
+        dimensions: Configuración de dimensiones (por defecto EMISSION_DIMENSIONS)
+
+    Returns:
+        Diccionario nombre de dimensión -> columna presente en los datos
+
+    Raises:
+        ValueError: si falta la columna de una dimensión requerida
+    """
+    dimensions = EMISSION_DIMENSIONS if dimensions is None else dimensions
+    available = set(columns)
+    resolved = {}
+    for name, spec in dimensions.items():
+        column = next((col for col in spec['columns'] if col in available), None)
+        if column is not None:
+            resolved[name] = column
+        elif spec.get('required'):
+            raise ValueError(f"No se encontró ninguna columna para la dimensión '{name}': {spec['columns']}")
+    return resolved
+
+
+def aggregate_emission_dimensions(df, values, dimension_columns, crosstabs=None, mask=None):
+    """
+    Calcula sumas y conteos de todas las dimensiones en un único recorrido.
+
+    Cada columna de dimensión se factoriza una sola vez a códigos enteros y las
+    sumas/conteos se obtienen con ``np.bincount``, sin copiar el DataFrame ni
+    ejecutar un ``groupby`` por dimensión. Las tablas cruzadas combinan los
+    códigos de dos dimensiones en un único código.
+
+    Args:
+        df: DataFrame con las columnas de dimensión
+        values: Arreglo de cantidades alineado con ``df``
+        dimension_columns: Diccionario nombre de dimensión -> columna
+        crosstabs: Diccionario nombre -> (dimensión filas, dimensión columnas)
+        mask: Máscara booleana de filas a considerar (opcional)
+
+    Returns:
+        Tupla (totales, cruces). ``totales`` mapea cada dimensión a un DataFrame
+        indexado por categoría con columnas 'sum' y 'count'; ``cruces`` mapea
+        cada tabla cruzada a un DataFrame de sumas.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if mask is not None:
+        values = values[mask]
+
+    codes = {}
+    totals = {}
+    for name, column in dimension_columns.items():
+        column_codes, uniques = pd.factorize(df[column])
+        if mask is not None:
+            column_codes = column_codes[mask]
+        # Los valores faltantes (código -1) se agrupan aparte y se descartan
+        n_groups = len(uniques) + 1
+        column_codes = np.where(column_codes < 0, len(uniques), column_codes)
+        sums = np.bincount(column_codes, weights=values, minlength=n_groups)[:-1]
+        counts = np.bincount(column_codes, minlength=n_groups)[:-1]
+        present = counts > 0
+        totals[name] = pd.DataFrame(
+            {'sum': sums[present], 'count': counts[present]},
+            index=pd.Index(np.asarray(uniques)[present], name=column)
+        )
+        codes[name] = (column_codes, uniques)
+
+    cross = {}
+    for name, (row_dim, col_dim) in (crosstabs or {}).items():
+        if row_dim not in codes or col_dim not in codes:
+            continue
+        row_codes, row_uniques = codes[row_dim]
+        col_codes, col_uniques = codes[col_dim]
+        n_cols = len(col_uniques) + 1
+        combined = row_codes * n_cols + col_codes
+        sums = np.bincount(combined, weights=values, minlength=(len(row_uniques) + 1) * n_cols)
+        table = pd.DataFrame(
+            sums.reshape(len(row_uniques) + 1, n_cols)[:-1, :-1],
+            index=pd.Index(np.asarray(row_uniques), name=dimension_columns[row_dim]),
+            columns=pd.Index(np.asarray(col_uniques), name=dimension_columns[col_dim])
+        )
+        # Descartar filas y columnas sin emisiones
+        cross[name] = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+    return totals, cross
+
+
+def build_emission_rollups(totals, crosstabs=None, dimensions=None):
+    """
+    Convierte sumas y conteos por dimensión en las tablas que consume CO2EmissionsApp.
+
+    Args:
+        totals: Diccionario dimensión -> DataFrame con columnas 'sum' y 'count'
+        crosstabs: Diccionario de tablas cruzadas de sumas (opcional)
+        dimensions: Configuración de dimensiones (por defecto EMISSION_DIMENSIONS)
+
+    Returns:
+        Diccionario con una tabla por dimensión ('regions', 'sectors', ...),
+        'raw_data' con los totales por región para el mapa y 'crosstabs'
+    """
+    dimensions = EMISSION_DIMENSIONS if dimensions is None else dimensions
+    result = {}
+    for name, spec in dimensions.items():
+        dimension_totals = totals.get(name)
+        if dimension_totals is None:
+            result[name] = pd.DataFrame()
+            continue
+
+        metrics = {
+            'sum': dimension_totals['sum'],
+            'count': dimension_totals['count'].astype('int64'),
+            'mean': dimension_totals['sum'] / dimension_totals['count']
+        }
+        table = pd.DataFrame({column: metrics[metric] for column, metric in spec['metrics'].items()}).round(2)
+        table = table.rename_axis(spec['key']).reset_index()
+        table = table.sort_values('emisiones_totales_ton', ascending=False)
+        if spec.get('top_k'):
+            table = table.head(spec['top_k'])
+        result[name] = table.reset_index(drop=True)
+
+    # El mapa agrega por región: basta con los totales regionales
+    regions = totals.get('regions')
+    if regions is not None:
+        map_data = regions[['sum']].rename(columns={'sum': 'emisiones_co2_ton'})
+        result['raw_data'] = map_data.rename_axis('region').reset_index()
+    else:
+        result['raw_data'] = pd.DataFrame(columns=['region', 'emisiones_co2_ton'])
+
+    result['crosstabs'] = {name: table.round(2) for name, table in (crosstabs or {}).items()}
+    return result
+
+
+def process_real_emissions_data(raw_data, dimensions=None, crosstabs=None):
+    """
+    Procesa los datos reales del RETC para crear estructura similar a demo_data.
+
+    Args:
+        raw_data: DataFrame del RETC
+        dimensions: Configuración de dimensiones (por defecto EMISSION_DIMENSIONS)
+        crosstabs: Tablas cruzadas a calcular (por defecto EMISSION_CROSSTABS)
+
+    Returns:
+        Diccionario de tablas por dimensión (ver ``build_emission_rollups``) o
+        None si los datos no son válidos
+    """
+    dimensions = EMISSION_DIMENSIONS if dimensions is None else dimensions
+    crosstabs = EMISSION_CROSSTABS if crosstabs is None else crosstabs
+
     try:
         # Limpiar nombres de columnas
         raw_data.columns = raw_data.columns.str.strip()
@@ -134,76 +285,20 @@ def process_real_emissions_data(raw_data):
             st.error("❌ Columna 'cantidad_toneladas' no encontrada en los datos")
             return None
         
-        # Convertir cantidad_toneladas a numérico (manejar comas como separador decimal)
-        raw_data['cantidad_toneladas_num'] = pd.to_numeric(
-            raw_data['cantidad_toneladas'].astype(str).str.replace(',', '.', regex=False),
-            errors='coerce'
-        ).fillna(0)
-        
-        # Filtrar solo registros con datos válidos
-        valid_data = raw_data[raw_data['cantidad_toneladas_num'] > 0].copy()
+        # Convertir cantidad_toneladas a numérico (formato chileno: coma decimal)
+        quantities = parse_chilean_numbers(raw_data['cantidad_toneladas'], fill_value=0)
         
-        if len(valid_data) == 0:
+        # Considerar solo registros con datos válidos (sin copiar el DataFrame)
+        valid = quantities > 0
+        if not valid.any():
             st.warning("⚠️ No se encontraron datos válidos de emisiones.")
             return None
         
-        # Procesar datos por región
-        regions_data = valid_data.groupby('region').agg({
-            'cantidad_toneladas_num': ['sum', 'count', 'mean']
-        }).round(2)
-        
-        regions_data.columns = ['emisiones_totales_ton', 'numero_fuentes', 'promedio_por_fuente']
-        regions_data = regions_data.reset_index()
-        regions_data = regions_data.sort_values('emisiones_totales_ton', ascending=False)
-        
-        # Procesar datos por sector económico
-        sector_col = 'ciiu4' if 'ciiu4' in valid_data.columns else 'razon_social'
-        sectors_data = valid_data.groupby(sector_col).agg({
-            'cantidad_toneladas_num': ['sum', 'count']
-        }).round(2)
-        
-        sectors_data.columns = ['emisiones_totales_ton', 'numero_empresas']
-        sectors_data = sectors_data.reset_index()
-        sectors_data = sectors_data.rename(columns={sector_col: 'sector'})
-        sectors_data = sectors_data.sort_values('emisiones_totales_ton', ascending=False).head(10)
-        
-        # Procesar datos por tipo de fuente
-        source_col = 'tipo_fuente' if 'tipo_fuente' in valid_data.columns else 'fuente_emisora_general'
-        if source_col in valid_data.columns:
-            sources_data = valid_data.groupby(source_col).agg({
-                'cantidad_toneladas_num': ['sum', 'mean']
-            }).round(2)
-            
-            sources_data.columns = ['emisiones_totales_ton', 'promedio_por_fuente']
-            sources_data = sources_data.reset_index()
-            sources_data = sources_data.rename(columns={source_col: 'tipo_fuente'})
-            sources_data = sources_data.sort_values('emisiones_totales_ton', ascending=False).head(10)
-        else:
-            sources_data = pd.DataFrame()  # Vacío si no hay columna
-        
-        # Procesar datos por contaminante
-        if 'contaminante' in valid_data.columns:
-            contaminants_data = valid_data.groupby('contaminante').agg({
-                'cantidad_toneladas_num': ['sum', 'count']
-            }).round(2)
-            
-            contaminants_data.columns = ['emisiones_totales_ton', 'numero_registros']
-            contaminants_data = contaminants_data.reset_index()
-            contaminants_data = contaminants_data.sort_values('emisiones_totales_ton', ascending=False).head(10)
-        else:
-            contaminants_data = pd.DataFrame()  # Vacío si no hay columna
-        
-        # Crear datos detallados para el mapa
-        map_data = valid_data[['region', 'cantidad_toneladas_num']].copy()
-        map_data = map_data.rename(columns={'cantidad_toneladas_num': 'emisiones_co2_ton'})
-        
-        return {
-            'regions': regions_data,
-            'sectors': sectors_data,
-            'sources': sources_data,
-            'contaminants': contaminants_data,
-            'raw_data': map_data
-        }
+        dimension_columns = resolve_emission_dimensions(raw_data.columns, dimensions)
+        totals, cross = aggregate_emission_dimensions(
+            raw_data, quantities, dimension_columns, crosstabs, mask=valid
+        )
+        return build_emission_rollups(totals, cross, dimensions)
         
     except Exception as e:
         st.error(f"❌ Error procesando datos reales: {str(e)}")
@@ -37,3 +37,58 @@ EMISSION_COLORS = {
     'low': '#eab308',       # Amarillo
     'minimal': '#22c55e'    # Verde
 }
+
+# Dimensiones de agregación de los datos RETC.
+# 'columns': columnas candidatas en orden de preferencia (se usa la primera presente)
+# 'metrics': columna de salida -> 'sum' | 'count' | 'mean' sobre cantidad_toneladas
+# 'top_k': conservar sólo las k categorías con más emisiones (None = todas)
+# 'required': si falta la columna, el procesamiento falla
+EMISSION_DIMENSIONS = {
+    'regions': {
+        'columns': ['region'],
+        'key': 'region',
+        'metrics': {'emisiones_totales_ton': 'sum', 'numero_fuentes': 'count', 'promedio_por_fuente': 'mean'},
+        'top_k': None,
+        'required': True
+    },
+    'sectors': {
+        'columns': ['ciiu4', 'razon_social'],
+        'key': 'sector',
+        'metrics': {'emisiones_totales_ton': 'sum', 'numero_empresas': 'count'},
+        'top_k': 10,
+        'required': True
+    },
+    'sources': {
+        'columns': ['tipo_fuente', 'fuente_emisora_general'],
+        'key': 'tipo_fuente',
+        'metrics': {'emisiones_totales_ton': 'sum', 'promedio_por_fuente': 'mean'},
+        'top_k': 10,
+        'required': False
+    },
+    'contaminants': {
+        'columns': ['contaminante'],
+        'key': 'contaminante',
+        'metrics': {'emisiones_totales_ton': 'sum', 'numero_registros': 'count'},
+        'top_k': 10,
+        'required': False
+    },
+    'companies': {
+        'columns': ['razon_social'],
+        'key': 'razon_social',
+        'metrics': {'emisiones_totales_ton': 'sum', 'numero_registros': 'count'},
+        'top_k': 20,
+        'required': False
+    },
+    'years': {
+        'columns': ['año', 'ano', 'anio', 'periodo'],
+        'key': 'año',
+        'metrics': {'emisiones_totales_ton': 'sum', 'numero_registros': 'count'},
+        'top_k': None,
+        'required': False
+    }
+}
+
+# Tablas cruzadas (suma de emisiones) entre pares de dimensiones
+EMISSION_CROSSTABS = {
+    'region_contaminant': ('regions', 'contaminants')
+}
@@ -0,0 +1,158 @@
+"""
+Ingesta por bloques de archivos RETC de emisiones
+=================================================
+
+Lee el CSV del RETC (separado por punto y coma, con coma decimal) en bloques
+y acumula los agregados de las dimensiones de ``EMISSION_DIMENSIONS`` a
+medida que avanza, de modo que la memoria máxima queda acotada por el tamaño
+del bloque y no por el tamaño del archivo.
+
+El resultado tiene la misma estructura que ``process_real_emissions_data``.
+"""
+
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .emissions import aggregate_emission_dimensions, build_emission_rollups, resolve_emission_dimensions
+from .emissions_config import EMISSION_CROSSTABS, EMISSION_DIMENSIONS
+from .number_parsing import parse_chilean_numbers
+
+QUANTITY_COLUMN = 'cantidad_toneladas'
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def get_peak_rss_mb():
+    """Memoria residente máxima del proceso en MB (None si la plataforma no lo permite)"""
+    try:
+        import resource
+        import sys
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS reporta bytes
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _iter_pandas_chunks(csv_path, columns, chunksize):
+    yield from pd.read_csv(
+        csv_path,
+        sep=';',
+        encoding='utf-8',
+        on_bad_lines='skip',
+        usecols=columns,
+        dtype=str,
+        chunksize=chunksize
+    )
+
+
+def _iter_pyarrow_chunks(csv_path, columns, chunksize):
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    reader = pa_csv.open_csv(
+        csv_path,
+        read_options=pa_csv.ReadOptions(block_size=max(1 << 20, chunksize * 100), use_threads=False),
+        parse_options=pa_csv.ParseOptions(delimiter=';', invalid_row_handler=lambda row: 'skip'),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types={col: pa.string() for col in columns}
+        )
+    )
+    for batch in reader:
+        # Columnas como cadenas Arrow: la cantidad se convierte sin pasar por objetos Python
+        yield batch.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+class EmissionsAggregator:
+    """Acumula sumas y conteos por dimensión a partir de bloques de registros RETC"""
+
+    def __init__(self, dimensions, crosstabs=None, config=None):
+        # dimensions: nombre de la dimensión -> columna de agrupación
+        self.dimensions = dimensions
+        self.crosstabs = crosstabs or {}
+        self.config = EMISSION_DIMENSIONS if config is None else config
+        self.partials = {}
+        self.cross_partials = {}
+        self.rows = 0
+        self.valid_rows = 0
+        self.chunks = 0
+
+    @staticmethod
+    def _merge(current, partial):
+        return partial if current is None else current.add(partial, fill_value=0)
+
+    def add_chunk(self, chunk, quantities):
+        """Incorpora un bloque y sus cantidades ya convertidas a número"""
+        self.rows += len(chunk)
+        self.chunks += 1
+        valid = quantities > 0
+        self.valid_rows += int(valid.sum())
+
+        totals, cross = aggregate_emission_dimensions(
+            chunk, quantities, self.dimensions, self.crosstabs, mask=valid
+        )
+        for name, partial in totals.items():
+            self.partials[name] = self._merge(self.partials.get(name), partial)
+        for name, partial in cross.items():
+            self.cross_partials[name] = self._merge(self.cross_partials.get(name), partial)
+
+    def result(self):
+        """Construye la estructura de datos que consume CO2EmissionsApp"""
+        # En modo streaming no se conservan los registros individuales:
+        # el mapa recibe los totales por región
+        cross = {name: table.fillna(0) for name, table in self.cross_partials.items()}
+        return build_emission_rollups(self.partials, cross, self.config)
+
+
+def stream_emissions_data(csv_path, chunksize=DEFAULT_CHUNKSIZE, engine='pandas'):
+    """
+    Procesa un CSV del RETC por bloques con memoria acotada.
+
+    Args:
+        csv_path: Ruta al CSV del RETC (separador ';', coma decimal)
+        chunksize: Filas por bloque
+        engine: 'pandas' (memoria más acotada) o 'pyarrow' (más rápido, mayor
+            uso de memoria por los buffers de lectura)
+
+    Returns:
+        Tupla (datos, estadísticas). ``datos`` tiene la misma estructura que
+        ``process_real_emissions_data``; ``estadísticas`` incluye filas leídas,
+        filas válidas, bloques, segundos, filas/segundo y RSS máximo en MB.
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Archivo no encontrado: {csv_path}")
+
+    # Encabezado: nombres originales -> nombres limpios
+    header = pd.read_csv(csv_path, sep=';', encoding='utf-8', nrows=0)
+    clean_names = {col: col.strip() for col in header.columns}
+    available = set(clean_names.values())
+    if QUANTITY_COLUMN not in available:
+        raise ValueError(f"Columna '{QUANTITY_COLUMN}' no encontrada en los datos")
+
+    dimensions = resolve_emission_dimensions(available, EMISSION_DIMENSIONS)
+
+    needed = {QUANTITY_COLUMN, *dimensions.values()}
+    raw_columns = [raw for raw, clean in clean_names.items() if clean in needed]
+
+    chunk_iter = _iter_pyarrow_chunks if engine == 'pyarrow' else _iter_pandas_chunks
+
+    aggregator = EmissionsAggregator(dimensions, EMISSION_CROSSTABS)
+    start = time.perf_counter()
+    for chunk in chunk_iter(csv_path, raw_columns, chunksize):
+        chunk = chunk.rename(columns=clean_names)
+        aggregator.add_chunk(chunk, parse_chilean_numbers(chunk[QUANTITY_COLUMN], fill_value=0))
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        'engine': engine,
+        'rows': aggregator.rows,
+        'valid_rows': aggregator.valid_rows,
+        'chunks': aggregator.chunks,
+        'seconds': elapsed,
+        'rows_per_sec': aggregator.rows / elapsed if elapsed > 0 else float('inf'),
+        'peak_rss_mb': get_peak_rss_mb()
+    }
+    return aggregator.result(), stats
@@ -1,75 +1,243 @@
 """
 Utilidades para manejo de coordenadas geográficas
 """
+import hashlib
 import json
+import sqlite3
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 import numpy as np
+import pandas as pd
 import streamlit as st
+from .config import MAP_CONFIG
+from .coordinate_store import CoordinateStore
 
 # Rutas de archivos de coordenadas
 COORDS_FILE = Path(__file__).parent.parent.parent / "data" / "estaciones_coordenadas.json"
+# Cache JSON anterior: se migra al almacén SQLite la primera vez que éste está vacío
 CACHE_FILE = Path(__file__).parent.parent.parent / "data" / "cache_coordenadas_chile.json"
 
+# Variación máxima (grados) alrededor de la coordenada base de un cuerpo de agua
+JITTER_DEGREES = 0.01
+
+
+class PatternMatcher:
+    """Autómata Aho-Corasick: encuentra todos los patrones contenidos en un texto en una pasada"""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._output[node].append(index)
+
+        # Enlaces de falla por anchura
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text):
+        """Índices de los patrones que aparecen en ``text``"""
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            found.update(self._output[node])
+        return found
+
+
+def _station_jitter(station_name: str) -> np.ndarray:
+    """Variación (lat, lon) determinística para una estación, derivada de su nombre"""
+    seed = int.from_bytes(hashlib.sha1(station_name.encode('utf-8')).digest()[:8], 'little')
+    return np.random.default_rng(seed).uniform(-JITTER_DEGREES, JITTER_DEGREES, 2)
+
+
+def _open_store():
+    """Abre el almacén compartido de coordenadas (None si no es posible)"""
+    try:
+        store = CoordinateStore()
+        if CACHE_FILE.exists() and store.count() == 0:
+            store.import_json(CACHE_FILE, source='geo_utils')
+        return store
+    except (sqlite3.Error, OSError, ValueError) as e:
+        # Sin disco escribible: se sigue funcionando sólo con el cache en memoria
+        print(f"⚠️ Almacén de coordenadas no disponible: {e}")
+        return None
+
+
 class CoordenadasEstaciones:
-    def __init__(self):
+    def __init__(self, store=None):
         self.coordenadas = {}
+        # Memo en memoria del proceso; el cache persistente es el almacén SQLite
         self.cache = {}
+        self._lock = threading.Lock()
+        self.store = store if store is not None else _open_store()
         self.load_data()
-    
+        self.build_index()
+
     def load_data(self):
-        """Carga datos de coordenadas desde archivos"""
+        """Carga las coordenadas verificadas"""
         try:
-            # Cargar coordenadas verificadas
             if COORDS_FILE.exists():
                 with open(COORDS_FILE, 'r', encoding='utf-8') as f:
                     self.coordenadas = json.load(f)
-            
-            # Cargar cache
-            if CACHE_FILE.exists():
-                with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                    self.cache = json.load(f)
         except Exception as e:
             st.error(f"Error cargando datos de coordenadas: {e}")
-    
-    def save_cache(self):
-        """Guarda el cache de coordenadas"""
+
+    def build_index(self):
+        """Construye el índice exacto de estaciones y el buscador de cuerpos de agua"""
+        self._water_bodies = list(self.coordenadas.keys())
+        # Estación -> (posición del cuerpo de agua, coordenadas); gana el primer cuerpo
+        self._exact = {}
+        for position, cuerpo_agua in enumerate(self._water_bodies):
+            for station, coords in self.coordenadas[cuerpo_agua].get('estaciones', {}).items():
+                self._exact.setdefault(station, (position, coords))
+        self._matcher = PatternMatcher(self._water_bodies)
+
+    def _lookup_with_source(self, station_name: str):
+        """Coordenadas desde los datos verificados y su procedencia"""
+        exact = self._exact.get(station_name)
+        matches = self._matcher.find_all(station_name.upper())
+        body = min(matches) if matches else None
+
+        # Se respeta el orden de los cuerpos de agua: el primero que coincide
+        # (por estación exacta o por nombre contenido) determina el resultado
+        if exact is not None and (body is None or exact[0] <= body):
+            return exact[1], 'verificadas'
+        if body is not None:
+            base_coords = self.coordenadas[self._water_bodies[body]]['base']
+            # Añadir variación para evitar superposición (fija para cada estación)
+            d_lat, d_lon = _station_jitter(station_name)
+            return {
+                "lat": base_coords["lat"] + float(d_lat),
+                "lon": base_coords["lon"] + float(d_lon)
+            }, 'cuerpo_agua'
+        return None, None
+
+    def lookup(self, station_name: str) -> Optional[Dict]:
+        """Busca coordenadas en los datos verificados, sin usar ni modificar el cache"""
+        return self._lookup_with_source(station_name)[0]
+
+    def _from_store(self, station_names):
+        """Coordenadas encontradas en el almacén compartido"""
+        if self.store is None or not station_names:
+            return {}
         try:
-            CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-            with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            st.error(f"Error guardando cache: {e}")
-    
+            records = self.store.get_many(station_names)
+        except sqlite3.Error as e:
+            print(f"⚠️ Error leyendo almacén de coordenadas: {e}")
+            return {}
+        # Las entradas sin coordenadas (geocodificación fallida) se vuelven a buscar
+        return {
+            name: {'lat': record['lat'], 'lon': record['lon']}
+            for name, record in records.items()
+            if record['found'] and record['lat'] is not None
+        }
+
+    def _to_store(self, entries):
+        """Guarda entradas nuevas (nombre, coordenadas, procedencia) en una transacción"""
+        if self.store is None or not entries:
+            return
+        try:
+            self.store.put_many([
+                {'name': name, 'lat': coords['lat'], 'lon': coords['lon'], 'found': True, 'source': source}
+                for name, coords, source in entries
+            ])
+        except sqlite3.Error as e:
+            print(f"⚠️ Error guardando en almacén de coordenadas: {e}")
+
     def get_coordinates(self, station_name: str) -> Optional[Dict]:
         """Obtiene coordenadas para una estación"""
-        # 1. Verificar cache
-        if station_name in self.cache:
-            return self.cache[station_name]
-        
+        # 1. Verificar cache (memoria y almacén compartido)
+        cached = self.cache.get(station_name)
+        if cached is not None:
+            return cached
+        coords = self._from_store([station_name]).get(station_name)
+
         # 2. Buscar en coordenadas verificadas
-        coords = None
-        for cuerpo_agua, data in self.coordenadas.items():
-            if station_name in data['estaciones']:
-                coords = data['estaciones'][station_name]
-                break
-            # Si no encuentra exacto, buscar por nombre del cuerpo de agua
-            elif cuerpo_agua in station_name.upper():
-                base_coords = data['base']
-                # Añadir variación para evitar superposición
-                coords = {
-                    "lat": base_coords["lat"] + np.random.uniform(-0.01, 0.01),
-                    "lon": base_coords["lon"] + np.random.uniform(-0.01, 0.01)
-                }
-                break
-        
-        # Si encontró coordenadas, guardar en cache
+        if coords is None:
+            coords, source = self._lookup_with_source(station_name)
+            if coords:
+                self._to_store([(station_name, coords, source)])
+
         if coords:
-            self.cache[station_name] = coords
-            self.save_cache()
-        
+            with self._lock:
+                self.cache[station_name] = coords
         return coords
 
+    def resolve_many(self, stations: Iterable[str], bounds: Optional[Dict] = None) -> pd.DataFrame:
+        """
+        Resuelve las coordenadas de varias estaciones en una sola llamada.
+
+        Args:
+            stations: Nombres de estaciones (se conserva el orden)
+            bounds: Límites válidos {'lat': (min, max), 'lon': (min, max)};
+                por defecto los de Chile en MAP_CONFIG
+
+        Returns:
+            DataFrame indexado por estación con columnas 'lat', 'lon' (NaN si no
+            se encontró), 'found' y 'in_bounds'
+        """
+        stations = list(stations)
+        bounds = bounds or MAP_CONFIG['chile_bounds']
+        lat = np.full(len(stations), np.nan)
+        lon = np.full(len(stations), np.nan)
+
+        # Memoria del proceso, luego almacén compartido (una consulta), luego datos verificados
+        missing = [station for station in dict.fromkeys(stations) if station not in self.cache]
+        stored = self._from_store(missing)
+        new_entries = []
+        for station in missing:
+            coords = stored.get(station)
+            if coords is None:
+                coords, source = self._lookup_with_source(station)
+                if coords:
+                    new_entries.append((station, coords, source))
+            if coords:
+                with self._lock:
+                    self.cache[station] = coords
+
+        # Una sola transacción para todas las entradas nuevas
+        self._to_store(new_entries)
+
+        for position, station in enumerate(stations):
+            coords = self.cache.get(station)
+            if coords:
+                lat[position] = coords['lat']
+                lon[position] = coords['lon']
+
+        found = ~np.isnan(lat)
+        in_bounds = (
+            found
+            & (lat >= bounds['lat'][0]) & (lat <= bounds['lat'][1])
+            & (lon >= bounds['lon'][0]) & (lon <= bounds['lon'][1])
+        )
+        return pd.DataFrame(
+            {'lat': lat, 'lon': lon, 'found': found, 'in_bounds': in_bounds},
+            index=pd.Index(stations, name='GLS_ESTACION')
+        )
+
 # Instancia global
 coordenadas_manager = CoordenadasEstaciones()
 
@@ -79,3 +247,10 @@ def get_station_coordinates(station_name: str) -> Optional[Dict]:
     if coords:
         st.success(f"✅ Coordenadas encontradas para: {station_name}")
     return coords
+
+def resolve_station_coordinates(stations: Iterable[str]) -> pd.DataFrame:
+    """Obtiene coordenadas para varias estaciones con un único mensaje de resumen"""
+    resolved = coordenadas_manager.resolve_many(stations)
+    if len(resolved):
+        st.success(f"✅ Coordenadas encontradas para {int(resolved['found'].sum())} de {len(resolved)} estaciones")
+    return resolved
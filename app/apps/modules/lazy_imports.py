@@ -0,0 +1,95 @@
+"""
+Imports diferidos de librerías pesadas
+======================================
+
+folium, streamlit_folium, scipy o google.cloud.firestore tardan cientos de
+milisegundos en importarse y no todas las vistas los usan. Con
+``lazy_import`` el módulo se importa la primera vez que se accede a uno de
+sus atributos (es decir, cuando se dibuja la sección que lo necesita), no al
+importar la aplicación:
+
+    folium = lazy_import('folium')              # todavía no se importa
+    mapa = folium.Map(location=[-35, -71])      # aquí se importa
+
+    make_subplots = lazy_callable('plotly.subplots', 'make_subplots')
+
+Si la librería no está instalada, el ``ImportError`` aparece en ese primer
+uso, dentro del código que ya maneja sus errores.
+"""
+
+import importlib
+import sys
+import threading
+
+
+class LazyModule:
+    """Representante de un módulo que se importa en el primer acceso a un atributo"""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_name'])
+                    self.__dict__['_module'] = module
+        return module
+
+    @property
+    def is_loaded(self):
+        """True si el módulo ya se importó"""
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'importado' if self.is_loaded else 'diferido'
+        return f"<LazyModule '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Módulo que se importa en el primer uso.
+
+    Args:
+        name: Nombre completo del módulo (p. ej. 'plotly.express')
+
+    Returns:
+        El módulo si ya estaba importado; si no, un ``LazyModule``
+    """
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
+
+
+def lazy_callable(module_name, attr):
+    """
+    Función de un módulo que se importa al llamarla por primera vez.
+
+    Args:
+        module_name: Módulo que define la función
+        attr: Nombre de la función o clase
+
+    Returns:
+        Función con la misma firma de llamada
+    """
+    module = lazy_import(module_name)
+
+    def call(*args, **kwargs):
+        return getattr(module, attr)(*args, **kwargs)
+
+    call.__name__ = attr
+    call.__qualname__ = attr
+    call.__doc__ = f"Llama a {module_name}.{attr} (importado en el primer uso)"
+    return call
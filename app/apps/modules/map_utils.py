@@ -3,19 +3,135 @@ Utilidades para mapas interactivos
 ==================================
 """
 
-import folium
-from folium import plugins
+import inspect
+import threading
+from collections import OrderedDict
+
 import streamlit as st
 import pandas as pd
 from .config import MAP_CONFIG, CHILE_REGIONS, DEMO_STATIONS
+from .data_cache import dataframe_fingerprint
+from .water_quality_index import StationPartition
 from .emissions_config import EMISSION_COLORS
 from .emissions import classify_emission_level, get_emission_color
-from .geo_utils import get_station_coordinates
+from .geo_utils import coordenadas_manager
+from .lazy_imports import lazy_import
 
-def create_interactive_water_quality_map(df, filters):
-    """Crea un mapa interactivo mejorado para calidad del agua"""
-    
+# folium se importa al construir el primer mapa
+folium = lazy_import('folium')
+plugins = lazy_import('folium.plugins')
+
+
+class MapArtifact:
+    """Mapa Folium construido, su HTML renderizado y metadatos de la construcción"""
+
+    def __init__(self, folium_map, meta=None):
+        self.map = folium_map
+        self.meta = meta or {}
+        # st_folium reasigna los ids de los elementos al serializar: un render a la vez
+        self.lock = threading.Lock()
+        # Renderizar una sola vez: st_folium puede reutilizarlo con render=False
+        self.html = folium_map.get_root().render()
+        self.size = len(self.html.encode('utf-8'))
+
+
+class MapArtifactCache:
+    """
+    Caché LRU de mapas renderizados, acotada por número de entradas y por bytes.
+
+    La clave combina el tipo de mapa, la huella de los datos y la especificación
+    de filtros, de modo que un rerun con las mismas entradas reutiliza el mapa
+    ya construido en lugar de regenerar marcadores y popups.
+    """
+
+    def __init__(self, max_entries=None, max_mb=None):
+        self.max_entries = max_entries or MAP_CONFIG['artifact_cache_entries']
+        self.max_bytes = (max_mb or MAP_CONFIG['artifact_cache_mb']) * 1024 ** 2
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_or_build(self, key, builder):
+        """Retorna el artefacto de ``key`` o lo construye con ``builder()``"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._entries[key]
+
+        artifact = builder()
+        if artifact is None:
+            return None
+
+        with self._lock:
+            self.stats['misses'] += 1
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key).size
+            self._entries[key] = artifact
+            self._bytes += artifact.size
+            # Conservar siempre la entrada recién construida
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.stats['evictions'] += 1
+        return artifact
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def info(self):
+        """Entradas, memoria usada (MB) y contadores de la caché"""
+        return {'entries': len(self._entries), 'size_mb': self._bytes / 1024 ** 2, **self.stats}
+
+
+# Instancia global (compartida por todas las sesiones del proceso)
+map_artifact_cache = MapArtifactCache()
+
+
+def _freeze(value):
+    """Convierte listas, tuplas y diccionarios de filtros en una clave hasheable"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def map_cache_key(kind, df, spec):
+    """Clave de caché de un mapa: (tipo, huella de los datos, especificación)"""
+    return kind, dataframe_fingerprint(df), _freeze(spec)
+
+
+def render_map(artifact_or_map, **kwargs):
+    """
+    Muestra un mapa con ``st_folium`` reutilizando el render cacheado.
+
+    Acepta un ``MapArtifact`` o un ``folium.Map``. Con versiones de
+    streamlit-folium que soportan ``render=False`` se omite el render repetido.
+    """
+    from streamlit_folium import st_folium
+
+    if not isinstance(artifact_or_map, MapArtifact):
+        return st_folium(artifact_or_map, **kwargs)
+
+    if 'render' in inspect.signature(st_folium).parameters:
+        kwargs.setdefault('render', False)
+    with artifact_or_map.lock:
+        return st_folium(artifact_or_map.map, **kwargs)
+
+
+def _build_water_quality_map(df, filters, partition=None):
+    """Construye el mapa de calidad del agua (sin caché)"""
     try:
+        # Filas agrupadas por estación una sola vez
+        partition = partition if partition is not None else StationPartition(df)
+        
         # Crear mapa centrado en Chile
         m = folium.Map(
             location=MAP_CONFIG['chile_center'],
@@ -33,38 +149,25 @@ def create_interactive_water_quality_map(df, filters):
         # Control de capas
         folium.LayerControl().add_to(m)
         
-        # Validar datos de entrada
-        if not filters.get('stations'):
-            st.warning("⚠️ No hay estaciones seleccionadas")
-            return m
-            
-        if 'GLS_ESTACION' not in df.columns:
-            st.error("❌ El DataFrame no contiene la columna 'GLS_ESTACION'")
-            return m
-        
         # Crear clusters para mejor visualización
         marker_cluster = plugins.MarkerCluster(name='Estaciones').add_to(m)
         
-        # Procesar cada estación seleccionada
+        # Coordenadas de todas las estaciones seleccionadas en una sola llamada,
+        # validadas para Chile continental e insular
+        coordinates = coordenadas_manager.resolve_many(filters['stations'])
+        stations_not_found = coordinates.index[~coordinates['found'].to_numpy()].tolist()
+        stations_out_of_bounds = coordinates.index[
+            coordinates['found'].to_numpy() & ~coordinates['in_bounds'].to_numpy()
+        ].tolist()
+        
+        # Procesar cada estación ubicada
         stations_found = []
-        stations_not_found = []
+        located = coordinates[coordinates['in_bounds']]
         
-        for station in filters['stations']:
-            # Obtener coordenadas
-            coords = get_station_coordinates(station)
-            
-            if not coords:
-                stations_not_found.append(station)
-                continue
-            
-            # Validar coordenadas para Chile continental e insular
-            lat, lon = coords['lat'], coords['lon']
-            if not (-56 <= lat <= -17 and -76 <= lon <= -66):
-                continue
-                
+        for station, lat, lon in zip(located.index, located['lat'].to_numpy(), located['lon'].to_numpy()):
             # Obtener datos de la estación
-            station_data = df[df['GLS_ESTACION'] == station]
-            if len(station_data) == 0:
+            positions = partition.positions(station)
+            if len(positions) == 0:
                 continue
             
             # Crear popup con información detallada
@@ -78,9 +181,10 @@ def create_interactive_water_quality_map(df, filters):
                     </tr>
             """
             
-            latest_data = station_data.iloc[-1]
+            # Última medición de la estación (las posiciones conservan el orden original)
+            latest_data = df.iloc[positions[-1]]
             for param in filters.get('parameters', []):
-                if param in station_data.columns:
+                if param in df.columns:
                     value = latest_data.get(param)
                     if pd.notna(value):
                         param_name = param
@@ -109,26 +213,97 @@ def create_interactive_water_quality_map(df, filters):
             
             stations_found.append(station)
         
-        # Mostrar resumen solo si hay estaciones no encontradas
-        if stations_not_found:
-            total = len(stations_found) + len(stations_not_found)
-            st.info(f"ℹ️ Estaciones visualizadas: {len(stations_found)} de {total}")
-            
-            # Expandible con detalles de estaciones no encontradas
-            with st.expander("📋 Ver estaciones sin coordenadas"):
-                st.write("Las siguientes estaciones no pudieron ser ubicadas en el mapa:")
-                for station in stations_not_found:
-                    st.write(f"- {station}")
-        
-        return m
+        return MapArtifact(m, {
+            'stations_found': stations_found,
+            'stations_not_found': stations_not_found,
+            'stations_out_of_bounds': stations_out_of_bounds
+        })
         
     except Exception as e:
         st.error(f"❌ Error al crear el mapa: {str(e)}")
         return None
 
-def create_interactive_emissions_map(df, region_col='region', emissions_col='emisiones_co2_ton'):
-    """Crea un mapa interactivo de emisiones por región usando Folium"""
+
+def create_interactive_water_quality_map(df, filters, use_cache=True, return_artifact=False, partition=None):
+    """
+    Crea un mapa interactivo mejorado para calidad del agua.
+
+    Args:
+        df: DataFrame filtrado de calidad del agua
+        filters: Filtros activos ('stations' y 'parameters' definen el mapa)
+        use_cache: Reutilizar el mapa si los datos y filtros no cambiaron
+        return_artifact: Retornar el ``MapArtifact`` (mapa + HTML) en vez del mapa
+        partition: ``StationPartition`` de ``df`` ya construida (opcional)
+
+    Returns:
+        folium.Map (o MapArtifact) o None si hubo un error
+    """
+    # Validar datos de entrada
+    if not filters.get('stations') or 'GLS_ESTACION' not in df.columns:
+        m = folium.Map(location=MAP_CONFIG['chile_center'], zoom_start=MAP_CONFIG['chile_zoom'])
+        if not filters.get('stations'):
+            st.warning("⚠️ No hay estaciones seleccionadas")
+        else:
+            st.error("❌ El DataFrame no contiene la columna 'GLS_ESTACION'")
+        return MapArtifact(m) if return_artifact else m
+    
+    spec = {key: filters.get(key) for key in ('stations', 'parameters')}
+    if use_cache:
+        artifact = map_artifact_cache.get_or_build(
+            map_cache_key('water_quality', df, spec),
+            lambda: _build_water_quality_map(df, filters, partition)
+        )
+    else:
+        artifact = _build_water_quality_map(df, filters, partition)
+    if artifact is None:
+        return None
+    
+    # Un único resumen; detalle solo si hay estaciones sin ubicar
+    stations_found = artifact.meta['stations_found']
+    stations_missing = artifact.meta['stations_not_found'] + artifact.meta.get('stations_out_of_bounds', [])
+    if stations_missing:
+        total = len(filters['stations'])
+        st.info(f"ℹ️ Estaciones visualizadas: {len(stations_found)} de {total}")
+        
+        # Expandible con detalles de estaciones no encontradas
+        with st.expander("📋 Ver estaciones sin coordenadas"):
+            st.write("Las siguientes estaciones no pudieron ser ubicadas en el mapa:")
+            st.markdown("\n".join(f"- {station}" for station in stations_missing))
+    elif stations_found:
+        st.success(f"✅ Coordenadas encontradas para {len(stations_found)} estaciones")
     
+    return artifact if return_artifact else artifact.map
+
+def create_interactive_emissions_map(df, region_col='region', emissions_col='emisiones_co2_ton',
+                                     use_cache=True, return_artifact=False):
+    """
+    Crea un mapa interactivo de emisiones por región usando Folium.
+
+    Args:
+        df: DataFrame con región y emisiones
+        region_col: Columna de región
+        emissions_col: Columna de emisiones
+        use_cache: Reutilizar el mapa si los datos no cambiaron
+        return_artifact: Retornar el ``MapArtifact`` (mapa + HTML) en vez del mapa
+
+    Returns:
+        folium.Map (o MapArtifact) o None si hubo un error
+    """
+    def build():
+        return _build_emissions_map(df, region_col, emissions_col)
+
+    if use_cache:
+        spec = {'region_col': region_col, 'emissions_col': emissions_col}
+        artifact = map_artifact_cache.get_or_build(map_cache_key('emissions', df, spec), build)
+    else:
+        artifact = build()
+    if artifact is None:
+        return None
+    return artifact if return_artifact else artifact.map
+
+
+def _build_emissions_map(df, region_col, emissions_col):
+    """Construye el mapa de emisiones por región (sin caché)"""
     try:
         # Crear mapa centrado en Chile
         m = folium.Map(
@@ -260,7 +435,7 @@ def create_interactive_emissions_map(df, region_col='region', emissions_col='emi
         # Agregar medidor de coordenadas
         plugins.MousePosition().add_to(m)
         
-        return m
+        return MapArtifact(m)
         
     except Exception as e:
         st.error(f"❌ Error creando mapa de emisiones: {str(e)}")
@@ -0,0 +1,218 @@
+"""
+Caché de métodos de aplicación con huella de datos
+==================================================
+
+``@st.cache_data`` sobre un método hashea ``self`` (con todos sus
+DataFrames) en cada llamada, o falla con "Cannot hash argument 'self'".
+Este caché identifica los datos de la instancia por una huella barata
+(``dataframe_fingerprint`` sobre una muestra de filas), calculada una vez
+por instancia, y usa como clave la huella más los argumentos de la
+visualización:
+
+    class DemographicsApp:
+        def __init__(self):
+            self.data = load_demographics_data()
+            self.data_fingerprint = frames_fingerprint(self.data)
+
+        @cached_method(ttl=3600)
+        def create_top_names_visualization(self, top_n=10):
+            ...
+
+- Las entradas se comparten entre sesiones e instancias con los mismos datos
+  (el registro de aplicaciones crea una instancia nueva en cada rerun, así
+  que la huella de la instancia se recalcula en cada rerun y por eso es
+  muestreada). Para una huella exacta sin ese costo, calcularla una vez por
+  carga junto a los datos (``frames_fingerprint(df, sample_rows=None)``
+  dentro de la función ``st.cache_data`` que los descarga) y asignarla a
+  ``data_fingerprint``.
+- Si la instancia no define ``data_fingerprint`` se calcula en la primera
+  llamada a partir de sus atributos DataFrame y se guarda en la instancia.
+- Los argumentos DataFrame, Serie o ndarray entran a la clave por su huella
+  completa (todas las filas); cualquier otro argumento no hasheable levanta
+  ``TypeError``.
+- El valor se retorna sin copiar (como ``st.cache_resource``): las figuras
+  cacheadas no deben modificarse.
+- ``get_method_cache_stats()`` informa hits, misses y tiempo de cálculo por método.
+"""
+
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .data_cache import dataframe_fingerprint
+
+# Atributo de la instancia con la huella de sus datos
+FINGERPRINT_ATTR = 'data_fingerprint'
+
+# Cachés registrados por ``cached_method`` (nombre calificado -> MethodCache)
+_CACHES = {}
+
+
+def frames_fingerprint(*frames, sample_rows=1000):
+    """
+    Huella combinada de varios DataFrames (None se acepta como "sin datos").
+
+    Args:
+        *frames: DataFrames o None
+        sample_rows: Filas de la muestra de cada DataFrame (None = todas)
+
+    Returns:
+        Hash hexadecimal; cambia si cambia la forma, columnas, tipos o una
+        fila de la muestra de cualquiera de ellos
+    """
+    hasher = hashlib.sha1()
+    for frame in frames:
+        hasher.update(str(dataframe_fingerprint(frame, sample_rows=sample_rows)).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def instance_fingerprint(instance, attr=FINGERPRINT_ATTR):
+    """Huella de los datos de una instancia, calculándola la primera vez si no existe"""
+    fingerprint = getattr(instance, attr, None)
+    if fingerprint is None:
+        frames = [value for _, value in sorted(vars(instance).items())
+                  if isinstance(value, pd.DataFrame)]
+        fingerprint = frames_fingerprint(*frames)
+        setattr(instance, attr, fingerprint)
+    return fingerprint
+
+
+def _freeze(value):
+    """
+    Convierte listas, diccionarios y conjuntos en tuplas para usarlos como
+    clave, y los DataFrame, Series y ndarray en su huella
+    """
+    if isinstance(value, pd.DataFrame):
+        return 'DataFrame', dataframe_fingerprint(value, sample_rows=None)
+    if isinstance(value, pd.Series):
+        return 'Series', dataframe_fingerprint(value.to_frame(), sample_rows=None)
+    if isinstance(value, np.ndarray):
+        rows = value.reshape(value.shape[0] if value.ndim else 1, -1)
+        return 'ndarray', value.shape, dataframe_fingerprint(pd.DataFrame(rows), sample_rows=None)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(v) for v in value))
+    return value
+
+
+class MethodCache:
+    """Entradas LRU con vencimiento de un método cacheado, con sus contadores"""
+
+    def __init__(self, name, ttl=None, max_entries=128):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compute_seconds = 0.0
+
+    def get(self, key):
+        """Retorna (encontrado, valor) y actualiza los contadores"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if self.ttl is None or time.time() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value, compute_seconds=0.0):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            self.compute_seconds += compute_seconds
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+            self.compute_seconds = 0.0
+
+    def stats(self):
+        """Contadores del método"""
+        with self._lock:
+            calls = self.hits + self.misses
+            return {
+                'method': self.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / calls if calls else None,
+                'entries': len(self._entries),
+                'evictions': self.evictions,
+                'compute_seconds': self.compute_seconds
+            }
+
+
+def cached_method(ttl=None, max_entries=128, fingerprint_attr=FINGERPRINT_ATTR):
+    """
+    Decorador de caché para métodos de aplicación.
+
+    Args:
+        ttl: Segundos de vigencia de cada entrada (None = sin vencimiento)
+        max_entries: Entradas que se conservan por método (LRU)
+        fingerprint_attr: Atributo de la instancia con la huella de sus datos
+
+    Returns:
+        Decorador; el método resultante expone ``.cache`` (MethodCache)
+    """
+    def decorator(func):
+        cache = MethodCache(f"{func.__module__}.{func.__qualname__}", ttl, max_entries)
+        _CACHES[cache.name] = cache
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (instance_fingerprint(self, fingerprint_attr), _freeze(args), _freeze(kwargs))
+            try:
+                hash(key)
+            except TypeError as e:
+                raise TypeError(f"{cache.name}: argumento no hasheable para la clave de caché ({e})") from e
+
+            found, value = cache.get(key)
+            if found:
+                return value
+            start = time.perf_counter()
+            value = func(self, *args, **kwargs)
+            cache.put(key, value, time.perf_counter() - start)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def get_method_cache_stats():
+    """Contadores de todos los métodos cacheados del proceso"""
+    return [cache.stats() for cache in list(_CACHES.values())]
+
+
+def reset_method_cache_stats():
+    """Reinicia los contadores de todos los métodos cacheados"""
+    for cache in list(_CACHES.values()):
+        cache.reset_stats()
+
+
+def clear_method_caches():
+    """Elimina las entradas de todos los métodos cacheados"""
+    for cache in list(_CACHES.values()):
+        cache.clear()
@@ -0,0 +1,148 @@
+"""
+Conversión vectorizada de números en formato chileno
+====================================================
+
+Convierte columnas de texto con coma decimal y punto de miles (``1.234,56``,
+``1234,56``, ``-0,5``) a ``float64`` usando los kernels de cadenas de Arrow,
+sin crear los arreglos intermedios de objetos Python que genera
+``astype(str).str.replace(...)``.
+
+Reglas:
+
+- Con coma: los puntos son separadores de miles y la coma es el decimal.
+- Sin coma y con más de un punto (``1.234.567``): los puntos son de miles.
+- Sin coma y con un solo punto (``12.5``): el punto es decimal, como en los
+  archivos que ya vienen en formato internacional.
+- Vacíos, ``N/A``, ``NA``, ``-``, ``s/i`` y cualquier texto no numérico: NaN.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - pyarrow está en requirements.txt
+    pa = None
+    pc = None
+
+# Marcadores de dato faltante (se comparan en minúsculas y sin espacios)
+MISSING_TOKENS = ['', 'n/a', 'na', 'nan', 'none', 'null', '-', '--', 's/i', 's/d', 'nd', 'n.d.']
+
+# Variantes exactas (sin normalizar) que se reconocen en el camino rápido
+_MISSING_VARIANTS = None
+if pa is not None:
+    _MISSING_VARIANTS = pa.array(sorted(
+        {token for base in MISSING_TOKENS for token in (base, base.upper(), base.capitalize())}
+        | {'NaN'}
+    ))
+
+# Número en formato internacional, una vez normalizado
+_NUMBER_PATTERN = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+
+
+def _to_arrow_strings(values):
+    """Convierte una serie o arreglo de textos a un arreglo Arrow de tipo string"""
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return values.cast(pa.string()) if values.type != pa.string() else values
+    if isinstance(values, pd.Series):
+        values = values.array
+    try:
+        return pa.array(values, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columnas object con números y textos mezclados
+        series = pd.Series(values, dtype=object)
+        return pa.array(series.where(series.isna(), series.astype(str)), type=pa.string(), from_pandas=True)
+
+
+def _normalize_separators(strings):
+    """Quita los puntos de miles y deja el punto como separador decimal"""
+    if not pc.any(pc.match_substring(strings, '.')).as_py():
+        # Caso más común (1234,56): basta con cambiar la coma
+        return pc.replace_substring(strings, ',', '.')
+    has_comma = pc.match_substring(strings, ',')
+    many_dots = pc.greater(pc.count_substring(strings, '.'), 1)
+    without_dots = pc.replace_substring(strings, '.', '')
+    return pc.if_else(
+        has_comma,
+        pc.replace_substring(without_dots, ',', '.'),
+        pc.if_else(many_dots, without_dots, strings)
+    )
+
+
+def _parse_arrow(strings):
+    """Normaliza y convierte un arreglo Arrow de textos a float64 con nulos"""
+    # Camino rápido: textos limpios, sólo con marcadores de faltante exactos
+    missing = pc.is_in(strings, value_set=_MISSING_VARIANTS)
+    candidate = pc.if_else(missing, pa.scalar(None, pa.string()), strings)
+    try:
+        return pc.cast(_normalize_separators(candidate), pa.float64())
+    except pa.ArrowInvalid:
+        pass
+
+    # Camino completo: espacios, mayúsculas y textos no numéricos
+    strings = pc.utf8_trim_whitespace(strings)
+    missing = pc.is_in(pc.utf8_lower(strings), value_set=pa.array(MISSING_TOKENS))
+    normalized = _normalize_separators(strings)
+    valid = pc.and_(pc.invert(missing), pc.match_substring_regex(normalized, _NUMBER_PATTERN))
+    cleaned = pc.if_else(valid, normalized, pa.scalar(None, pa.string()))
+    return pc.cast(cleaned, pa.float64())
+
+
+def _parse_pandas(values):
+    """Misma conversión con operaciones de texto de pandas (sin pyarrow)"""
+    strings = pd.Series(values, dtype=object).astype(str).str.strip()
+    missing = strings.str.lower().isin(MISSING_TOKENS) | pd.isna(pd.Series(values, dtype=object))
+    has_comma = strings.str.contains(',', regex=False)
+    many_dots = strings.str.count(r'\.') > 1
+    without_dots = strings.str.replace('.', '', regex=False)
+    normalized = strings.mask(many_dots, without_dots)
+    normalized = normalized.mask(has_comma, without_dots.str.replace(',', '.', regex=False))
+    parsed = pd.to_numeric(normalized.where(~missing), errors='coerce')
+    return parsed.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def parse_chilean_numbers(values, fill_value=None):
+    """
+    Convierte valores en formato chileno a un arreglo float64.
+
+    Args:
+        values: Serie, arreglo NumPy/Arrow o lista de textos (o números)
+        fill_value: Valor para reemplazar los NaN (None los conserva)
+
+    Returns:
+        Arreglo NumPy float64 alineado con ``values``
+    """
+    if isinstance(values, pd.Series) and pd.api.types.is_numeric_dtype(values.dtype) \
+            and not pd.api.types.is_bool_dtype(values.dtype):
+        parsed = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    elif pa is not None:
+        arrow_values = _parse_arrow(_to_arrow_strings(values))
+        parsed = arrow_values.to_numpy(zero_copy_only=False) if isinstance(arrow_values, pa.Array) \
+            else arrow_values.to_numpy()
+        parsed = np.asarray(parsed, dtype=np.float64)
+    else:
+        parsed = _parse_pandas(values)
+
+    if fill_value is not None:
+        parsed = np.where(np.isnan(parsed), fill_value, parsed)
+    return parsed
+
+
+def parse_chilean_columns(df, columns, fill_value=None):
+    """
+    Convierte varias columnas de un DataFrame en una sola llamada.
+
+    Args:
+        df: DataFrame de origen (no se modifica)
+        columns: Columnas a convertir (las ausentes se ignoran)
+        fill_value: Valor para reemplazar los NaN (None los conserva)
+
+    Returns:
+        DataFrame con las columnas convertidas a float64, mismo índice que ``df``
+    """
+    present = [col for col in columns if col in df.columns]
+    return pd.DataFrame(
+        {col: parse_chilean_numbers(df[col], fill_value=fill_value) for col in present},
+        index=df.index
+    )
@@ -0,0 +1,285 @@
+"""
+Simulador de reasignaciones del presupuesto
+===========================================
+
+Modo "qué pasaría si": el usuario mueve montos entre entidades de un nivel
+(partidas, programas, ...) y ve al instante cómo cambian HHI, Gini, Theil
+y la participación del top 3 y top 10. Recalcular desde los registros en
+cada movimiento del slider es lento; aquí cada cambio de monto cuesta
+O(log n):
+
+- Los montos viven en un árbol de estadísticos de orden (treap con tamaño
+  y suma por subárbol), ordenados por (monto, entidad). Con él se obtienen
+  en O(log n) el rango de un monto, la suma de los menores y la suma de
+  los k mayores.
+- Se mantienen acumulados que se corrigen en O(1) o O(log n) por cambio:
+  total Σx, suma de cuadrados Σx² (HHI), Σ i·x₍ᵢ₎ con los montos de menor
+  a mayor (Gini) y Σ x·ln x de los montos positivos (Theil).
+
+Las definiciones son las de ``modules.concentration`` (y por lo tanto las
+de ``calculate_concentration_metrics``): HHI = Σ(participación %)² / 10000,
+top-k = % del total en las k entidades de mayor monto. Los valores
+incrementales coinciden con un recálculo completo salvo redondeo de punto
+flotante; ``recompute()`` rehace los acumulados desde cero.
+"""
+
+import math
+import random
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SimulationMetrics:
+    """Métricas de concentración de un estado del simulador"""
+    n: int
+    total: float
+    hhi: float
+    gini: float
+    theil: float
+    top_3_pct: float
+    top_10_pct: float
+
+    def as_tuple(self):
+        """(HHI, % top 3, % top 10), el formato de ``calculate_concentration_metrics``"""
+        return self.hhi, self.top_3_pct, self.top_10_pct
+
+
+class _Node:
+    __slots__ = ('key', 'value', 'priority', 'left', 'right', 'size', 'sum')
+
+    def __init__(self, key, value, priority):
+        self.key = key
+        self.value = value
+        self.priority = priority
+        self.left = None
+        self.right = None
+        self.size = 1
+        self.sum = value
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _sum(node):
+    return node.sum if node is not None else 0.0
+
+
+def _update(node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+    node.sum = node.value + _sum(node.left) + _sum(node.right)
+    return node
+
+
+class OrderStatisticTree:
+    """
+    Treap de montos con tamaño y suma por subárbol.
+
+    Las claves son tuplas (monto, id) para que los montos repetidos
+    tengan un orden estable. Todas las operaciones son O(log n) esperado.
+    """
+
+    def __init__(self, keys=(), seed=42):
+        """
+        Args:
+            keys: Claves (monto, id) ya ordenadas de menor a mayor
+            seed: Semilla de las prioridades
+        """
+        self._random = random.Random(seed)
+        keys = list(keys)
+        self._height = max(1, len(keys)).bit_length()
+        self.root = self._build(keys, 0, len(keys), 0)
+
+    def _build(self, keys, lo, hi, depth):
+        """Árbol balanceado desde claves ordenadas en O(n)"""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        # Prioridad aleatoria dentro de la franja de su profundidad: cada padre
+        # queda sobre sus hijos sin tener que rotar
+        priority = (self._height - depth + self._random.random()) / (self._height + 1)
+        node = _Node(keys[mid], keys[mid][0], priority)
+        node.left = self._build(keys, lo, mid, depth + 1)
+        node.right = self._build(keys, mid + 1, hi, depth + 1)
+        return _update(node)
+
+    def __len__(self):
+        return _size(self.root)
+
+    @property
+    def total(self):
+        return _sum(self.root)
+
+    def _split(self, node, key):
+        """Divide en (claves < key, claves >= key)"""
+        if node is None:
+            return None, None
+        if node.key < key:
+            left, right = self._split(node.right, key)
+            node.right = left
+            return _update(node), right
+        left, right = self._split(node.left, key)
+        node.left = right
+        return left, _update(node)
+
+    def _merge(self, left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            left.right = self._merge(left.right, right)
+            return _update(left)
+        right.left = self._merge(left, right.left)
+        return _update(right)
+
+    def insert(self, key):
+        left, right = self._split(self.root, key)
+        node = _Node(key, key[0], self._random.random())
+        self.root = self._merge(self._merge(left, node), right)
+
+    def remove(self, key):
+        left, rest = self._split(self.root, key)
+        _, right = self._split(rest, (key[0], key[1] + 0.5))
+        self.root = self._merge(left, right)
+
+    def rank_and_sum_below(self, key):
+        """(cantidad, suma) de las claves menores que ``key``"""
+        count, total = 0, 0.0
+        node = self.root
+        while node is not None:
+            if node.key < key:
+                count += _size(node.left) + 1
+                total += _sum(node.left) + node.value
+                node = node.right
+            else:
+                node = node.left
+        return count, total
+
+    def sum_largest(self, k):
+        """Suma de los ``k`` montos mayores"""
+        k = min(k, len(self))
+        total = 0.0
+        node = self.root
+        while node is not None and k > 0:
+            right_size = _size(node.right)
+            if k <= right_size:
+                node = node.right
+            else:
+                total += _sum(node.right) + node.value
+                k -= right_size + 1
+                node = node.left
+        return total
+
+
+class ReallocationSimulator:
+    """Montos por entidad con métricas de concentración actualizadas en O(log n) por cambio"""
+
+    def __init__(self, values, labels=None):
+        """
+        Args:
+            values: Montos por entidad
+            labels: Etiquetas de las entidades (por defecto 0..n-1)
+        """
+        values = np.asarray(values, dtype=float)
+        self.labels = list(range(len(values))) if labels is None else list(labels)
+        self._position = {label: i for i, label in enumerate(self.labels)}
+        self.base_values = values.copy()
+        self.values = values.copy()
+        self.history = []
+        self.recompute()
+
+    def recompute(self):
+        """Reconstruye el árbol y los acumulados desde los montos actuales (O(n log n))"""
+        order = np.argsort(self.values, kind='stable')
+        ascending = self.values[order]
+        self.tree = OrderStatisticTree(zip(ascending.tolist(), order.tolist()))
+        self.sum_squares = float((ascending ** 2).sum())
+        self.rank_weighted = float((np.arange(1, len(ascending) + 1) * ascending).sum())
+        positive = ascending[ascending > 0]
+        self.sum_positive = float(positive.sum())
+        self.sum_xlogx = float((positive * np.log(positive)).sum())
+
+    def _remove(self, i, value):
+        count, below = self.tree.rank_and_sum_below((value, i))
+        above = self.tree.total - below - value
+        # El monto sale del rango count + 1 y los mayores bajan un puesto
+        self.rank_weighted -= (count + 1) * value + above
+        self.tree.remove((value, i))
+        self.sum_squares -= value * value
+        if value > 0:
+            self.sum_positive -= value
+            self.sum_xlogx -= value * math.log(value)
+
+    def _insert(self, i, value):
+        count, below = self.tree.rank_and_sum_below((value, i))
+        above = self.tree.total - below
+        # El monto entra en el rango count + 1 y los mayores suben un puesto
+        self.rank_weighted += (count + 1) * value + above
+        self.tree.insert((value, i))
+        self.sum_squares += value * value
+        if value > 0:
+            self.sum_positive += value
+            self.sum_xlogx += value * math.log(value)
+
+    def set_value(self, label, value):
+        """Cambia el monto de una entidad (O(log n))"""
+        i = self._position[label]
+        old = float(self.values[i])
+        self._remove(i, old)
+        self._insert(i, float(value))
+        self.values[i] = value
+        self.history.append((i, old))
+
+    def transfer(self, source, target, amount):
+        """Mueve ``amount`` desde la entidad ``source`` a ``target``"""
+        if source == target or amount == 0:
+            return
+        self.set_value(source, self.values[self._position[source]] - amount)
+        self.set_value(target, self.values[self._position[target]] + amount)
+
+    def value(self, label):
+        return float(self.values[self._position[label]])
+
+    def undo(self, steps=1):
+        """Deshace los últimos ``steps`` cambios de monto (una transferencia son dos)"""
+        for _ in range(min(steps, len(self.history))):
+            i, old = self.history.pop()
+            self._remove(i, float(self.values[i]))
+            self._insert(i, old)
+            self.values[i] = old
+
+    def reset(self):
+        """Vuelve a los montos originales"""
+        self.values = self.base_values.copy()
+        self.history = []
+        self.recompute()
+
+    def metrics(self):
+        """
+        Métricas de concentración del estado actual, con las definiciones de
+        ``modules.concentration.concentration_metrics``.
+
+        Returns:
+            SimulationMetrics
+        """
+        n = len(self.tree)
+        total = self.tree.total
+        if n == 0 or total == 0:
+            return SimulationMetrics(n, total, np.nan, np.nan, np.nan, np.nan, np.nan)
+        # Σ(100·x/S)² / 10000 = Σx² / S²
+        hhi = self.sum_squares / (total * total)
+        gini = 2 * self.rank_weighted / (n * total) - (n + 1) / n
+        # (1/n)·Σ (x/μ)·ln(x/μ) sobre los montos positivos, con μ = S/n
+        theil = (self.sum_xlogx - math.log(total / n) * self.sum_positive) / total
+        return SimulationMetrics(
+            n=n,
+            total=total,
+            hhi=hhi,
+            gini=gini,
+            theil=theil,
+            top_3_pct=(self.tree.sum_largest(3) / total) * 100,
+            top_10_pct=(self.tree.sum_largest(10) / total) * 100
+        )
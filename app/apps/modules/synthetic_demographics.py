@@ -0,0 +1,188 @@
+"""
+Datos demográficos sintéticos
+=============================
+
+Generador vectorizado de los datos de demostración de la app demográfica,
+que se usan cuando no existe ``nombres_demografia.csv``. Cada tabla se arma
+como producto cartesiano (década × nombre, año × género) con broadcasting
+de NumPy y una sola extracción del generador aleatorio por columna, en vez
+de un registro por iteración.
+
+Los esquemas son los mismos que producía ``DemographicsApp.generate_synthetic_data``:
+
+- ``data``: decade, name, gender ('M'/'F'), total_count
+- ``gender_year``: year, gender ('M'/'F'), count
+- ``diversity``: decade, gender ('Masculino'/'Femenino'), top_n, metric, percentage
+- ``name_length``: year, gender ('Masculino'/'Femenino'), avg_length
+
+Con ``names_per_gender`` mayor que la lista de nombres populares se agregan
+nombres sintéticos (``Name000123``), para pruebas de carga con el tamaño
+del conjunto completo (1910-2013 × todos los nombres).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Nombres populares por género (los primeros de cada lista sintética)
+POPULAR_NAMES = {
+    'M': [
+        'James', 'John', 'Robert', 'Michael', 'William', 'David', 'Joseph', 'Charles',
+        'Thomas', 'Christopher', 'Daniel', 'Matthew', 'Anthony', 'Donald', 'Mark'
+    ],
+    'F': [
+        'Mary', 'Patricia', 'Jennifer', 'Linda', 'Elizabeth', 'Barbara', 'Susan', 'Jessica',
+        'Sarah', 'Karen', 'Nancy', 'Margaret', 'Lisa', 'Betty', 'Dorothy'
+    ]
+}
+
+GENDER_LABELS = {'M': 'Masculino', 'F': 'Femenino'}
+
+SYNTHETIC_DECADES = np.arange(1910, 2020, 10)
+SYNTHETIC_YEARS = np.arange(1910, 2014)
+
+
+def _names_for_gender(gender, count):
+    """Nombres populares del género, completados con nombres sintéticos hasta ``count``"""
+    popular = POPULAR_NAMES[gender]
+    if count <= len(popular):
+        return np.array(popular[:count], dtype=object)
+    extra = pd.Index(np.arange(count - len(popular))).astype(str).str.zfill(6)
+    return np.concatenate([np.array(popular, dtype=object), (f'Name{gender}' + extra).to_numpy()])
+
+
+def generate_name_counts(names_per_gender=None, decades=SYNTHETIC_DECADES, rng=None):
+    """
+    Nacimientos por década y nombre.
+
+    Cada par (década, nombre) recibe un conteo base y una década pico al azar;
+    el conteo crece cerca del pico: ``base * (0.5 + 1 - min(|década - pico|, 50) / 50)``.
+
+    Args:
+        names_per_gender: Nombres por género (por defecto los 15 populares)
+        decades: Décadas a generar
+        rng: Generador de NumPy (por defecto uno nuevo sin semilla)
+
+    Returns:
+        DataFrame con decade, name, gender y total_count, ordenado por década
+        y luego nombres masculinos y femeninos
+    """
+    rng = rng or np.random.default_rng()
+    decades = np.asarray(decades)
+    names_per_gender = names_per_gender or len(POPULAR_NAMES['M'])
+
+    names = np.concatenate([_names_for_gender(g, names_per_gender) for g in ('M', 'F')])
+    genders = np.repeat(np.array(['M', 'F'], dtype=object), names_per_gender)
+    shape = (len(decades), len(names))
+
+    # Una extracción por columna para toda la matriz década × nombre
+    base_count = rng.integers(1000, 20000, size=shape)
+    peak_decade = decades[rng.integers(0, len(decades), size=shape)]
+    time_factor = 1 - np.minimum(np.abs(decades[:, None] - peak_decade), 50) / 50
+    total_count = (base_count * (0.5 + time_factor)).astype(np.int64)
+
+    return pd.DataFrame({
+        'decade': np.repeat(decades, len(names)),
+        'name': np.tile(names, len(decades)),
+        'gender': np.tile(genders, len(decades)),
+        'total_count': total_count.ravel()
+    })
+
+
+def generate_gender_year_counts(years=SYNTHETIC_YEARS, rng=None):
+    """
+    Nacimientos por año y género, con el aumento del Baby Boom (1946-1964).
+
+    Returns:
+        DataFrame con year, gender y count (una fila M y una F por año)
+    """
+    rng = rng or np.random.default_rng()
+    years = np.asarray(years)
+
+    # Columnas M y F de cada año
+    counts = np.trunc(rng.normal([100000, 95000], 10000, size=(len(years), 2)))
+
+    # Baby Boom: sube hasta 1954 y baja hasta 1964
+    boost = np.where(years < 1955, (years - 1946) / 2, (1964 - years) / 2)
+    boost_factor = np.where((years >= 1946) & (years <= 1964), 1.0 + boost / 10.0, 1.0)
+    counts = np.trunc(counts * boost_factor[:, None]).astype(np.int64)
+
+    return pd.DataFrame({
+        'year': np.repeat(years, 2),
+        'gender': np.tile(np.array(['M', 'F'], dtype=object), len(years)),
+        'count': counts.ravel()
+    })
+
+
+def generate_name_diversity(decades=SYNTHETIC_DECADES):
+    """
+    Concentración de nombres (% de bebés con los nombres del Top 25 / Top 50).
+
+    La concentración disminuye con el tiempo y es menor para nombres femeninos.
+
+    Returns:
+        DataFrame con decade, gender, top_n, metric y percentage
+    """
+    decades = np.asarray(decades)
+    gender_factor = np.array([1.0, 0.9])  # Masculino, Femenino
+
+    base_concentration = 80 - (decades - 1910) / 10
+    top_25 = np.maximum(5, base_concentration[:, None] * gender_factor)
+    top_50 = np.maximum(15, np.minimum(top_25 + 15, 95))
+
+    # Orden: década, género, Top 25 / Top 50
+    percentage = np.stack([top_25, top_50], axis=2)
+    labels = np.array([GENDER_LABELS['M'], GENDER_LABELS['F']], dtype=object)
+
+    return pd.DataFrame({
+        'decade': np.repeat(decades, 4),
+        'gender': np.tile(np.repeat(labels, 2), len(decades)),
+        'top_n': np.tile(np.array(['Top 25', 'Top 50'], dtype=object), 2 * len(decades)),
+        'metric': 'Concentración',
+        'percentage': percentage.ravel()
+    })
+
+
+def generate_name_length(years=SYNTHETIC_YEARS, rng=None):
+    """
+    Longitud promedio de nombres por año: crece con el tiempo y es mayor en nombres femeninos.
+
+    Returns:
+        DataFrame con year, gender y avg_length (2 decimales)
+    """
+    rng = rng or np.random.default_rng()
+    years = np.asarray(years)
+
+    trend_factor = (years - 1910) / 100
+    gender_factor = np.array([0.0, 0.8])  # Masculino, Femenino
+    avg_length = 5.5 + trend_factor[:, None] + gender_factor + rng.normal(0, 0.2, size=(len(years), 2))
+
+    labels = np.array([GENDER_LABELS['M'], GENDER_LABELS['F']], dtype=object)
+    return pd.DataFrame({
+        'year': np.repeat(years, 2),
+        'gender': np.tile(labels, len(years)),
+        'avg_length': np.round(avg_length, 2).ravel()
+    })
+
+
+def generate_synthetic_demographics(names_per_gender=None, decades=SYNTHETIC_DECADES,
+                                    years=SYNTHETIC_YEARS, seed=42):
+    """
+    Genera todas las tablas sintéticas de la app demográfica.
+
+    Args:
+        names_per_gender: Nombres por género (por defecto los 15 populares)
+        decades: Décadas de la tabla de nombres
+        years: Años de las tablas anuales
+        seed: Semilla del generador aleatorio (None = distinta en cada llamada)
+
+    Returns:
+        Diccionario con 'data', 'gender_year', 'diversity' y 'name_length'
+        (los mismos argumentos que ``build_demographics_rollups``)
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        'data': generate_name_counts(names_per_gender, decades, rng),
+        'gender_year': generate_gender_year_counts(years, rng),
+        'diversity': generate_name_diversity(decades),
+        'name_length': generate_name_length(years, rng)
+    }
@@ -9,78 +9,76 @@ import streamlit as st
 from datetime import datetime
 from .config import DEMO_STATIONS
 from .water_quality_config import WATER_QUALITY_PARAMETERS, QUALITY_CLASSIFICATION
+from .water_quality_index import StationPartition
 
-def create_demo_water_data():
-    """Crea datos de demostración realistas para calidad del agua"""
+def create_demo_water_data(n_records=5000, seed=42):
+    """
+    Crea datos de demostración realistas para calidad del agua.
     
-    np.random.seed(42)
-    n_records = 5000
+    Genera cada columna con una sola extracción vectorizada del generador,
+    manteniendo la estacionalidad (hemisferio sur) y las correlaciones
+    temperatura-oxígeno y turbiedad-sólidos.
+    
+    Args:
+        n_records: Número de registros a generar
+        seed: Semilla del generador aleatorio
+    
+    Returns:
+        DataFrame con el mismo esquema que los datos procesados de la DGA
+    """
+    
+    rng = np.random.default_rng(seed)
     
     # Crear fechas realistas
     start_date = datetime(2020, 1, 1)
     end_date = datetime(2024, 12, 31)
     dates = pd.date_range(start_date, end_date, periods=n_records)
+    months = dates.month.to_numpy()
     
     # Estaciones de demostración
-    stations = list(DEMO_STATIONS.keys())
+    stations = np.array(list(DEMO_STATIONS.keys()))
     
-    # Generar datos realistas con patrones estacionales
-    data = []
+    # Efectos estacionales (Chile hemisferio sur)
+    seasonal_factor = np.sin(2 * np.pi * (months - 1) / 12)
     
-    for i, date in enumerate(dates):
-        station = np.random.choice(stations)
-        
-        # Efectos estacionales (Chile hemisferio sur)
-        month = date.month
-        seasonal_factor = np.sin(2 * np.pi * (month - 1) / 12)
-        
-        # Temperatura con estacionalidad
-        base_temp = 15
-        temp = base_temp + 8 * seasonal_factor + np.random.normal(0, 3)
-        temp = np.clip(temp, 5, 35)
-        
-        # pH relativamente estable
-        ph = np.random.normal(7.2, 0.6)
-        ph = np.clip(ph, 6.0, 9.0)
-        
-        # Conductividad con variabilidad
-        conductivity = np.random.lognormal(5.5, 0.7)
-        conductivity = np.clip(conductivity, 50, 2000)
-        
-        # Oxígeno disuelto (inversamente relacionado con temperatura)
-        oxygen_base = 95 - (temp - 15) * 2
-        oxygen = oxygen_base + np.random.normal(0, 10)
-        oxygen = np.clip(oxygen, 30, 120)
-        
-        # Turbiedad con eventos ocasionales altos
-        if np.random.random() < 0.05:  # 5% de eventos de alta turbiedad
-            turbidity = np.random.lognormal(3, 1)
-        else:
-            turbidity = np.random.lognormal(0.5, 0.8)
-        turbidity = np.clip(turbidity, 0.1, 100)
-        
-        # Sólidos suspendidos correlacionados con turbiedad
-        solids = turbidity * np.random.uniform(0.8, 2.0) + np.random.normal(5, 2)
-        solids = np.clip(solids, 1, 200)
-        
-        record = {
-            'COD_ESTACION': np.random.randint(1000000, 9999999),
-            'GLS_ESTACION': station,
-            'FEC_MEDICION': date,
-            'año': date.year,
-            'mes': date.month,
-            'mes_nombre': date.strftime('%B'),
-            'Temperatura Temperatura muestra °C': round(temp, 1),
-            'Ph a 25°C': round(ph, 2),
-            'Conductividad Específica (µS/cm a 25°C)': round(conductivity, 0),
-            'Oxigeno Disuelto (% Saturacion)': round(oxygen, 1),
-            'Turbiedad (NTU)': round(turbidity, 2),
-            'Solidos Suspendidos Totales ': round(solids, 1)
-        }
-        
-        data.append(record)
+    # Temperatura con estacionalidad
+    temp = np.clip(15 + 8 * seasonal_factor + rng.normal(0, 3, n_records), 5, 35)
+    
+    # pH relativamente estable
+    ph = np.clip(rng.normal(7.2, 0.6, n_records), 6.0, 9.0)
+    
+    # Conductividad con variabilidad
+    conductivity = np.clip(rng.lognormal(5.5, 0.7, n_records), 50, 2000)
+    
+    # Oxígeno disuelto (inversamente relacionado con temperatura)
+    oxygen = np.clip(95 - (temp - 15) * 2 + rng.normal(0, 10, n_records), 30, 120)
     
-    df = pd.DataFrame(data)
+    # Turbiedad con eventos ocasionales altos (5% de eventos de alta turbiedad)
+    high_turbidity = rng.random(n_records) < 0.05
+    turbidity = rng.lognormal(
+        np.where(high_turbidity, 3.0, 0.5),
+        np.where(high_turbidity, 1.0, 0.8)
+    )
+    turbidity = np.clip(turbidity, 0.1, 100)
+    
+    # Sólidos suspendidos correlacionados con turbiedad
+    solids = turbidity * rng.uniform(0.8, 2.0, n_records) + rng.normal(5, 2, n_records)
+    solids = np.clip(solids, 1, 200)
+    
+    df = pd.DataFrame({
+        'COD_ESTACION': rng.integers(1000000, 9999999, n_records),
+        'GLS_ESTACION': stations[rng.integers(0, len(stations), n_records)],
+        'FEC_MEDICION': dates,
+        'año': dates.year.to_numpy(),
+        'mes': months,
+        'mes_nombre': dates.month_name().to_numpy(),
+        'Temperatura Temperatura muestra °C': np.round(temp, 1),
+        'Ph a 25°C': np.round(ph, 2),
+        'Conductividad Específica (µS/cm a 25°C)': np.round(conductivity, 0),
+        'Oxigeno Disuelto (% Saturacion)': np.round(oxygen, 1),
+        'Turbiedad (NTU)': np.round(turbidity, 2),
+        'Solidos Suspendidos Totales ': np.round(solids, 1)
+    })
     return df
 
 def calculate_water_quality_index(df, parameters):
@@ -121,76 +119,297 @@ def calculate_water_quality_index(df, parameters):
     
     return df
 
+def _segmented_searchsorted(sorted_values, starts, counts, threshold, side='left'):
+    """
+    Búsqueda binaria simultánea en varios segmentos ordenados de un mismo arreglo.
+    
+    Retorna, para cada segmento, cuántos valores son menores (side='left') o
+    menores o iguales (side='right') que el umbral.
+    """
+    lo = np.zeros_like(counts)
+    hi = counts.copy()
+    last = len(sorted_values) - 1
+    while True:
+        active = lo < hi
+        if not active.any():
+            return lo
+        mid = (lo + hi) // 2
+        values = sorted_values[np.minimum(starts + mid, last)]
+        go_right = values < threshold if side == 'left' else values <= threshold
+        lo = np.where(active & go_right, mid + 1, lo)
+        hi = np.where(active & ~go_right, mid, hi)
+
+def _count_in_ranges(sorted_values, starts, counts, ranges):
+    """Cuenta por segmento los valores dentro de una lista de intervalos cerrados disjuntos"""
+    total = np.zeros_like(counts)
+    for min_val, max_val in ranges:
+        total += (
+            _segmented_searchsorted(sorted_values, starts, counts, max_val, side='right')
+            - _segmented_searchsorted(sorted_values, starts, counts, min_val, side='left')
+        )
+    return total
+
+def _exclusive_band_overlaps(classification):
+    """
+    Para cada nivel de calidad, intervalos ya cubiertos por niveles anteriores.
+    
+    Permite clasificar cada medición en el primer nivel que la contiene
+    (p. ej. 'Buena' sin contar lo que ya es 'Excelente').
+    """
+    overlaps = {}
+    covered = []
+    for level, (min_val, max_val) in classification.items():
+        overlaps[level] = [
+            (max(min_val, c_min), min(max_val, c_max))
+            for c_min, c_max in covered
+            if max(min_val, c_min) <= min(max_val, c_max)
+        ]
+        # Mantener la cobertura como intervalos disjuntos ordenados
+        merged = []
+        for c_min, c_max in sorted(covered + [(min_val, max_val)]):
+            if merged and c_min <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], c_max))
+            else:
+                merged.append((c_min, c_max))
+        covered = merged
+    return overlaps
+
+def compute_water_quality_statistics(df, parameters, group_by=None, exclusive_bands=False):
+    """
+    Calcula en una sola pasada las estadísticas de todos los parámetros.
+    
+    Cada parámetro se ordena una única vez (por grupo); momentos, cuantiles,
+    porcentaje en rango óptimo y porcentajes por nivel de QUALITY_CLASSIFICATION
+    se obtienen del arreglo ordenado mediante búsquedas binarias, sin volver
+    a filtrar la serie por cada nivel.
+    
+    Args:
+        df: DataFrame con los datos de calidad del agua
+        parameters: Lista de columnas de parámetros a resumir
+        group_by: Columna o lista de columnas para agrupar (p. ej. 'GLS_ESTACION', 'año')
+        exclusive_bands: Si es True, cada medición se asigna sólo al primer nivel
+            de calidad que la contiene
+    
+    Returns:
+        DataFrame ordenado con una fila por (grupo, parámetro) con datos
+    """
+    
+    if df is None or df.empty:
+        return pd.DataFrame()
+    
+    parameters = [param for param in parameters if param in df.columns]
+    if isinstance(group_by, str):
+        group_by = [group_by]
+    group_by = [col for col in (group_by or []) if col in df.columns]
+    
+    if not parameters:
+        return pd.DataFrame()
+    
+    # Códigos enteros de grupo (un único grupo si no se agrupa)
+    if group_by:
+        grouper = df.groupby(group_by, sort=True, observed=True)
+        codes = grouper.ngroup().to_numpy()
+        group_keys = grouper.size().index
+        valid_rows = codes >= 0
+    else:
+        codes = np.zeros(len(df), dtype=np.int64)
+        group_keys = None
+        valid_rows = np.ones(len(df), dtype=bool)
+    n_groups = int(codes.max()) + 1 if valid_rows.any() else 0
+    
+    values_matrix = df[parameters].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    codes = codes[valid_rows]
+    values_matrix = values_matrix[valid_rows]
+    
+    group_sizes = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(group_sizes)[:-1])).astype(np.int64)
+    
+    # Un único ordenamiento de todas las columnas (los NaN quedan al final);
+    # con grupos, un ordenamiento estable por código deja cada grupo contiguo
+    if group_by:
+        value_order = np.argsort(values_matrix, axis=0)
+    else:
+        sorted_matrix = np.sort(values_matrix, axis=0)
+    
+    results = []
+    for j, param in enumerate(parameters):
+        column = values_matrix[:, j]
+        
+        if group_by:
+            order = value_order[:, j]
+            order = order[np.argsort(codes[order], kind='stable')]
+            sorted_values = column[order]
+        else:
+            sorted_values = sorted_matrix[:, j]
+        not_nan = ~np.isnan(column)
+        counts = np.bincount(codes, weights=not_nan, minlength=n_groups).astype(np.int64)
+        has_data = counts > 0
+        if not has_data.any():
+            continue
+        
+        safe_counts = np.maximum(counts, 1)
+        filled = np.where(not_nan, column, 0.0)
+        sums = np.bincount(codes, weights=filled, minlength=n_groups)
+        means = sums / safe_counts
+        squared_dev = np.where(not_nan, (column - means[codes]) ** 2, 0.0)
+        variances = np.bincount(codes, weights=squared_dev, minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stds = np.sqrt(variances / (counts - 1))
+        stds[counts < 2] = np.nan
+        
+        def quantile(q):
+            # Interpolación lineal (igual que pandas.Series.quantile)
+            position = (safe_counts - 1) * q
+            lower = np.floor(position).astype(np.int64)
+            upper = np.minimum(lower + 1, safe_counts - 1)
+            low_val = sorted_values[starts + lower]
+            high_val = sorted_values[starts + upper]
+            return low_val + (high_val - low_val) * (position - lower)
+        
+        param_info = WATER_QUALITY_PARAMETERS.get(param, {})
+        optimal_range = param_info.get('optimal_range', (0, 100))
+        
+        param_stats = {
+            'parameter': param,
+            'name': param_info.get('name', param),
+            'unit': param_info.get('unit', ''),
+            'count': counts,
+            'mean': means,
+            'std': stds,
+            'median': quantile(0.5),
+            'min': sorted_values[starts],
+            'max': sorted_values[starts + safe_counts - 1],
+            'q25': quantile(0.25),
+            'q75': quantile(0.75),
+            'percent_optimal': _count_in_ranges(sorted_values, starts, counts, [optimal_range]) / safe_counts * 100
+        }
+        
+        # Clasificación por calidad
+        if param in QUALITY_CLASSIFICATION:
+            classification = QUALITY_CLASSIFICATION[param]
+            overlaps = _exclusive_band_overlaps(classification) if exclusive_bands else {}
+            for quality_level, band in classification.items():
+                in_band = _count_in_ranges(sorted_values, starts, counts, [band])
+                if overlaps.get(quality_level):
+                    in_band = in_band - _count_in_ranges(sorted_values, starts, counts, overlaps[quality_level])
+                param_stats[f'percent_{quality_level.lower()}'] = in_band / safe_counts * 100
+        
+        param_frame = pd.DataFrame(param_stats)
+        if group_keys is not None:
+            param_frame = pd.concat([group_keys.to_frame(index=False), param_frame], axis=1)
+        results.append(param_frame[has_data])
+    
+    if not results:
+        return pd.DataFrame()
+    return pd.concat(results, ignore_index=True)
+
 def get_water_quality_summary_statistics(df, parameters):
     """Calcula estadísticas resumidas para parámetros de calidad del agua"""
     
+    summary = compute_water_quality_statistics(df, parameters)
     stats = {}
     
-    for param in parameters:
-        if param in df.columns:
-            param_data = df[param].dropna()
-            
-            if len(param_data) > 0:
-                param_info = WATER_QUALITY_PARAMETERS.get(param, {})
-                optimal_range = param_info.get('optimal_range', (0, 100))
-                  # Estadísticas básicas
-                stats[param] = {
-                    'count': len(param_data),
-                    'mean': param_data.mean(),
-                    'std': param_data.std(),
-                    'median': param_data.median(),
-                    'min': param_data.min(),
-                    'max': param_data.max(),
-                    'unit': param_info.get('unit', ''),
-                    'name': param_info.get('name', param),
-                    'min': param_data.min(),
-                    'max': param_data.max(),
-                    'median': param_data.median(),
-                    'q25': param_data.quantile(0.25),
-                    'q75': param_data.quantile(0.75)
-                }
-                
-                # Porcentaje en rango óptimo
-                in_optimal = param_data[(param_data >= optimal_range[0]) & 
-                                      (param_data <= optimal_range[1])]
-                stats[param]['percent_optimal'] = (len(in_optimal) / len(param_data)) * 100
-                
-                # Clasificación por calidad
-                if param in QUALITY_CLASSIFICATION:
-                    classification = QUALITY_CLASSIFICATION[param]
-                    for quality_level, (min_val, max_val) in classification.items():
-                        in_range = param_data[(param_data >= min_val) & (param_data <= max_val)]
-                        stats[param][f'percent_{quality_level.lower()}'] = (len(in_range) / len(param_data)) * 100
+    for record in summary.to_dict('records'):
+        param = record['parameter']
+        stats[param] = {
+            key: value for key, value in record.items()
+            if key != 'parameter' and not (key.startswith('percent_') and pd.isna(value))
+        }
     
     return stats
 
-def filter_water_data(df, filters):
-    """Filtra datos de calidad del agua basado en criterios"""
+def compute_station_summary(df, parameters, stations=None, partition=None):
+    """
+    Resumen por estación (mediciones, período, promedio y desviación estándar).
+    
+    Todas las estaciones se resumen a la vez con ``np.bincount`` sobre los
+    códigos de estación, en lugar de filtrar el DataFrame por cada estación.
+    
+    Args:
+        df: DataFrame con la columna GLS_ESTACION
+        parameters: Parámetros a resumir (los ausentes se ignoran)
+        stations: Estaciones a incluir, en el orden deseado (por defecto todas)
+        partition: ``StationPartition`` de ``df`` ya construida (opcional)
+    
+    Returns:
+        DataFrame indexado por estación con columnas 'count', 'year_min',
+        'year_max' y '<parámetro>_mean' / '<parámetro>_std'; sólo incluye
+        estaciones con mediciones
+    """
+    if df is None or df.empty or 'GLS_ESTACION' not in df.columns:
+        return pd.DataFrame()
+    
+    partition = partition if partition is not None else StationPartition(df)
+    n_stations = len(partition.station_names)
+    valid = partition.codes >= 0
+    codes = partition.codes[valid]
+    counts = np.bincount(codes, minlength=n_stations)
+    
+    summary = pd.DataFrame({'count': counts}, index=partition.station_names.rename('GLS_ESTACION'))
+    
+    if 'año' in df.columns:
+        # Mínimo y máximo por tramo sobre las filas agrupadas por estación
+        years = pd.to_numeric(df['año'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        grouped_years = years[partition.order]
+        starts = partition.offsets[:-1][counts > 0]
+        year_min = np.full(n_stations, np.nan)
+        year_max = np.full(n_stations, np.nan)
+        if len(grouped_years):
+            year_min[counts > 0] = np.fmin.reduceat(grouped_years, starts)
+            year_max[counts > 0] = np.fmax.reduceat(grouped_years, starts)
+        summary['year_min'] = year_min
+        summary['year_max'] = year_max
+    
+    for param in parameters:
+        if param not in df.columns:
+            continue
+        values = df[param].to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+        present = ~np.isnan(values)
+        n = np.bincount(codes[present], minlength=n_stations)
+        sums = np.bincount(codes[present], weights=values[present], minlength=n_stations)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = sums / n
+            # Dos pasadas para estabilidad numérica (ddof=1, igual que pandas)
+            deviations = (values[present] - mean[codes[present]]) ** 2
+            std = np.sqrt(np.bincount(codes[present], weights=deviations, minlength=n_stations) / (n - 1))
+        summary[f'{param}_mean'] = mean
+        summary[f'{param}_std'] = np.where(n > 1, std, np.nan)
+    
+    summary = summary[summary['count'] > 0]
+    if stations is not None:
+        summary = summary.reindex([station for station in stations if station in summary.index])
+    return summary
+
+def filter_water_data(df, filters, index=None):
+    """
+    Filtra datos de calidad del agua basado en criterios.
+    
+    Si se entrega un WaterQualityIndex construido sobre el mismo DataFrame,
+    el filtro se resuelve con el índice (y sus resultados memorizados);
+    si no, se combinan todas las máscaras y se filtra una sola vez.
+    """
     
     if df is None or df.empty:
         return df
     
-    filtered_df = df.copy()
+    if index is not None:
+        return index.select(filters)
+    
+    mask = np.ones(len(df), dtype=bool)
     
     # Filtro por años
-    if 'year_range' in filters and 'año' in filtered_df.columns:
+    if 'year_range' in filters and 'año' in df.columns:
         min_year, max_year = filters['year_range']
-        filtered_df = filtered_df[
-            (filtered_df['año'] >= min_year) & 
-            (filtered_df['año'] <= max_year)
-        ]
+        mask &= ((df['año'] >= min_year) & (df['año'] <= max_year)).to_numpy()
     
     # Filtro por estaciones
-    if 'stations' in filters and filters['stations'] and 'GLS_ESTACION' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['GLS_ESTACION'].isin(filters['stations'])]
+    if 'stations' in filters and filters['stations'] and 'GLS_ESTACION' in df.columns:
+        mask &= df['GLS_ESTACION'].isin(filters['stations']).to_numpy()
     
     # Filtro por rango de valores para parámetros específicos
     if 'parameter_ranges' in filters:
         for param, (min_val, max_val) in filters['parameter_ranges'].items():
-            if param in filtered_df.columns:
-                filtered_df = filtered_df[
-                    (filtered_df[param] >= min_val) & 
-                    (filtered_df[param] <= max_val)
-                ]
+            if param in df.columns:
+                mask &= ((df[param] >= min_val) & (df[param] <= max_val)).to_numpy()
     
-    return filtered_df
+    return df[mask]
@@ -70,3 +70,17 @@ QUALITY_CLASSIFICATION = {
         'Deficiente': (1200, 10000)
     }
 }
+
+# Esquema compacto de tipos para los DataFrames de calidad del agua.
+# Se aplica al cargar los datos (process_water_data) y en CloudConfig.optimize_dataframe;
+# las columnas ausentes se ignoran.
+WATER_QUALITY_DTYPE_SCHEMA = {
+    'category': [
+        'GLS_ESTACION', 'GLS_REGION', 'NOM_REGION', 'REGION', 'Region',
+        'GLS_CUENCA', 'GLS_SUBCUENCA', 'mes_nombre'
+    ],
+    'float32': list(WATER_QUALITY_PARAMETERS.keys()),
+    'int16': ['año'],
+    'int8': ['mes'],
+    'downcast_numeric': True  # Resto de columnas numéricas: float32 / entero mínimo
+}
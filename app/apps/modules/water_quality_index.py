@@ -0,0 +1,217 @@
+"""
+Índice de filtros para datos de calidad del agua
+================================================
+
+Precalcula estructuras ordenadas sobre el DataFrame de calidad del agua para
+resolver una especificación de filtros (años, estaciones y rangos de
+parámetros) a un arreglo de posiciones de fila sin copiar el DataFrame.
+
+Cada dimensión se resuelve por separado y se memoriza, de modo que al
+cambiar un solo control de la barra lateral sólo se recalcula esa dimensión.
+
+``StationPartition`` agrupa las filas por estación una sola vez para que el
+mapa y el análisis espacial obtengan los datos de cada estación por posición,
+sin recorrer el DataFrame completo por cada estación.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .data_cache import dataframe_fingerprint
+
+
+class StationPartition:
+    """Vista de un DataFrame particionada por estación (filas agrupadas una sola vez)"""
+
+    def __init__(self, df, column='GLS_ESTACION'):
+        self.df = df
+        self.column = column
+        self.station_names = pd.Index([])
+        self.codes = np.full(len(df), -1, dtype=np.int64)
+        self.order = np.array([], dtype=np.int64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        if column in df.columns:
+            codes, uniques = pd.factorize(df[column], sort=True)
+            self.station_names = pd.Index(np.asarray(uniques))
+            self.codes = codes
+            valid = np.flatnonzero(codes >= 0)
+            # Orden estable: dentro de cada estación se conserva el orden original
+            self.order = valid[np.argsort(codes[valid], kind='stable')]
+            counts = np.bincount(codes[valid], minlength=len(self.station_names))
+            self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def __contains__(self, station):
+        return self.station_names.get_indexer([station])[0] >= 0
+
+    def station_code(self, station):
+        """Código entero de una estación (-1 si no existe)"""
+        return self.station_names.get_indexer([station])[0]
+
+    def positions(self, station):
+        """Posiciones de fila de una estación, en el orden original"""
+        code = self.station_code(station)
+        if code < 0:
+            return np.array([], dtype=np.int64)
+        return self.order[self.offsets[code]:self.offsets[code + 1]]
+
+    def frame(self, station):
+        """Filas de una estación como DataFrame"""
+        return self.df.iloc[self.positions(station)]
+
+    def groups(self, stations=None):
+        """Diccionario estación -> posiciones de fila"""
+        stations = self.station_names if stations is None else stations
+        return {station: self.positions(station) for station in stations}
+
+    def counts(self):
+        """Número de filas por estación"""
+        return pd.Series(np.diff(self.offsets), index=self.station_names)
+
+
+class WaterQualityIndex:
+    """Índice reutilizable para filtrar datos de calidad del agua por posición"""
+
+    def __init__(self, df, cache_size=8, fingerprint=None):
+        self.df = df
+        self.n_rows = len(df)
+        self.cache_size = cache_size
+        self.fingerprint = fingerprint or dataframe_fingerprint(df)
+
+        # Estaciones: filas agrupadas por estación
+        self.stations = StationPartition(df)
+        self.station_names = self.stations.station_names
+
+        # Años: posiciones ordenadas por año
+        self._year_order = None
+        if 'año' in df.columns:
+            years = pd.to_numeric(df['año'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            self._year_order = np.argsort(years, kind='stable')
+            self._year_sorted = years[self._year_order]
+
+        # Parámetros: arreglos ordenados construidos bajo demanda
+        self._param_orders = {}
+
+        self._dimension_cache = OrderedDict()
+        self._spec_cache = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'dimension_hits': 0, 'dimension_misses': 0}
+
+    # ------------------------------------------------------------------
+    # Posiciones por dimensión
+    # ------------------------------------------------------------------
+    def station_positions(self, station):
+        """Posiciones (ordenadas) de las filas de una estación"""
+        return self.stations.positions(station)
+
+    def station_groups(self, stations=None):
+        """Diccionario estación -> posiciones de fila, calculado desde el índice"""
+        return self.stations.groups(stations)
+
+    def _year_positions(self, year_range):
+        min_year, max_year = year_range
+        lo = np.searchsorted(self._year_sorted, min_year, side='left')
+        hi = np.searchsorted(self._year_sorted, max_year, side='right')
+        return self._year_order[lo:hi]
+
+    def _stations_positions(self, stations):
+        positions = [self.station_positions(station) for station in stations]
+        return np.concatenate(positions) if positions else np.array([], dtype=np.int64)
+
+    def _param_positions(self, param, value_range):
+        if param not in self._param_orders:
+            values = pd.to_numeric(self.df[param], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            order = np.argsort(values, kind='stable')  # Los NaN quedan al final
+            self._param_orders[param] = (order, values[order])
+        order, sorted_values = self._param_orders[param]
+        min_val, max_val = value_range
+        lo = np.searchsorted(sorted_values, min_val, side='left')
+        hi = np.searchsorted(sorted_values, max_val, side='right')
+        return order[lo:hi]
+
+    def _dimension_mask(self, key, compute):
+        """Máscara booleana memorizada para una dimensión del filtro"""
+        if key in self._dimension_cache:
+            self._dimension_cache.move_to_end(key)
+            self.stats['dimension_hits'] += 1
+            return self._dimension_cache[key]
+
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[compute()] = True
+        self.stats['dimension_misses'] += 1
+        self._dimension_cache[key] = mask
+        # Cada especificación usa hasta varias dimensiones: guardar más máscaras que specs
+        while len(self._dimension_cache) > self.cache_size * 4:
+            self._dimension_cache.popitem(last=False)
+        return mask
+
+    # ------------------------------------------------------------------
+    # Resolución de filtros
+    # ------------------------------------------------------------------
+    def _spec_key(self, filters):
+        """Clave normalizada e inmutable de una especificación de filtros"""
+        year_range = filters.get('year_range')
+        stations = filters.get('stations') or ()
+        ranges = filters.get('parameter_ranges') or {}
+        return (
+            tuple(year_range) if year_range is not None else None,
+            tuple(sorted(set(stations))),
+            tuple(sorted((param, tuple(bounds)) for param, bounds in ranges.items()))
+        )
+
+    def resolve(self, filters):
+        """
+        Resuelve una especificación de filtros a posiciones de fila.
+
+        Acepta las mismas claves que ``filter_water_data``: 'year_range',
+        'stations' y 'parameter_ranges'. Las claves no reconocidas se ignoran.
+
+        Returns:
+            Arreglo ordenado de posiciones de fila que cumplen todos los filtros
+        """
+        key = self._spec_key(filters)
+        if key in self._spec_cache:
+            self._spec_cache.move_to_end(key)
+            self.stats['hits'] += 1
+            return self._spec_cache[key]
+
+        self.stats['misses'] += 1
+        year_range, stations, parameter_ranges = key
+        masks = []
+
+        if year_range is not None and self._year_order is not None:
+            masks.append(self._dimension_mask(
+                ('year_range', year_range), lambda: self._year_positions(year_range)
+            ))
+
+        if stations and len(self.station_names) > 0:
+            masks.append(self._dimension_mask(
+                ('stations', stations), lambda: self._stations_positions(stations)
+            ))
+
+        for param, bounds in parameter_ranges:
+            if param in self.df.columns:
+                masks.append(self._dimension_mask(
+                    ('parameter', param, bounds),
+                    lambda param=param, bounds=bounds: self._param_positions(param, bounds)
+                ))
+
+        if masks:
+            combined = masks[0].copy()
+            for mask in masks[1:]:
+                combined &= mask
+            positions = np.flatnonzero(combined)
+        else:
+            positions = np.arange(self.n_rows)
+
+        self._spec_cache[key] = positions
+        while len(self._spec_cache) > self.cache_size:
+            self._spec_cache.popitem(last=False)
+        return positions
+
+    def select(self, filters):
+        """Retorna el subconjunto del DataFrame que cumple los filtros"""
+        positions = self.resolve(filters)
+        if len(positions) == self.n_rows:
+            return self.df
+        return self.df.iloc[positions]
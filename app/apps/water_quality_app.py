@@ -3,9 +3,6 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import folium
-from streamlit_folium import st_folium
 from datetime import datetime
 import os
 import sys
@@ -18,125 +15,134 @@ sys.path.insert(0, str(Path(__file__).parent))
 from modules.config import COLORS, MAP_CONFIG, DEMO_STATIONS
 from modules.water_quality_config import WATER_QUALITY_PARAMETERS, QUALITY_CLASSIFICATION
 from modules.data_loaders import load_water_quality_data
-from modules.water_quality import calculate_water_quality_index, get_water_quality_summary_statistics
+from modules.water_quality import (
+    calculate_water_quality_index, get_water_quality_summary_statistics, compute_water_quality_statistics,
+    compute_station_summary
+)
 from modules.chart_utils import create_temporal_chart, create_station_comparison_chart
-from modules.map_utils import create_interactive_water_quality_map
+from modules.map_utils import create_interactive_water_quality_map, render_map
+from modules.data_cache import dataframe_fingerprint
+from modules.water_quality_index import WaterQualityIndex, StationPartition
 
 # CSS personalizado optimizado
-st.markdown("""
-<style>
-    /* CORRECCIÓN DE ESPACIADO PRINCIPAL */
-    .main-header {
-        background: linear-gradient(90deg, #0891b2, #06b6d4);
-        padding: 1.5rem;
-        border-radius: 10px;
-        color: white;
-        text-align: center;
-        margin-bottom: 1.5rem;
-    }
+def load_custom_css():
+    """Carga el CSS personalizado de la aplicación de calidad del agua"""
+    st.markdown("""
+    <style>
+        /* CORRECCIÓN DE ESPACIADO PRINCIPAL */
+        .main-header {
+            background: linear-gradient(90deg, #0891b2, #06b6d4);
+            padding: 1.5rem;
+            border-radius: 10px;
+            color: white;
+            text-align: center;
+            margin-bottom: 1.5rem;
+        }
     
-    /* CONTENEDOR DE MAPA OPTIMIZADO */
-    .map-container {
-        margin: 1rem 0;
-        padding: 0;
-        border-radius: 8px;
-        overflow: hidden;
-    }
+        /* CONTENEDOR DE MAPA OPTIMIZADO */
+        .map-container {
+            margin: 1rem 0;
+            padding: 0;
+            border-radius: 8px;
+            overflow: hidden;
+        }
     
-    /* ELIMINAR ESPACIOS EXCESIVOS DESPUÉS DEL MAPA */
-    .streamlit-expanderHeader {
-        margin-top: 0.5rem !important;
-    }
+        /* ELIMINAR ESPACIOS EXCESIVOS DESPUÉS DEL MAPA */
+        .streamlit-expanderHeader {
+            margin-top: 0.5rem !important;
+        }
     
-    /* MÉTRICAS COMPACTAS */
-    .metric-card {
-        background: #f8fafc;
-        padding: 0.8rem;
-        border-radius: 8px;
-        border-left: 4px solid #0891b2;
-        margin: 0.3rem 0;
-    }
+        /* MÉTRICAS COMPACTAS */
+        .metric-card {
+            background: #f8fafc;
+            padding: 0.8rem;
+            border-radius: 8px;
+            border-left: 4px solid #0891b2;
+            margin: 0.3rem 0;
+        }
     
-    /* INFO BOXES SIN ESPACIOS EXCESIVOS */
-    .info-box {
-        background: #eff6ff;
-        padding: 0.8rem;
-        border-radius: 8px;
-        border: 1px solid #dbeafe;
-        margin: 0.5rem 0;
-    }
+        /* INFO BOXES SIN ESPACIOS EXCESIVOS */
+        .info-box {
+            background: #eff6ff;
+            padding: 0.8rem;
+            border-radius: 8px;
+            border: 1px solid #dbeafe;
+            margin: 0.5rem 0;
+        }
     
-    .warning-box {
-        background: #fef3c7;
-        padding: 0.8rem;
-        border-radius: 8px;
-        border: 1px solid #fbbf24;
-        margin: 0.5rem 0;
-    }
+        .warning-box {
+            background: #fef3c7;
+            padding: 0.8rem;
+            border-radius: 8px;
+            border: 1px solid #fbbf24;
+            margin: 0.5rem 0;
+        }
     
-    /* CONTENEDOR DE COLUMNAS SIN ESPACIOS */
-    .row-widget.stHorizontal > div {
-        padding-left: 0.5rem;
-        padding-right: 0.5rem;
-    }
+        /* CONTENEDOR DE COLUMNAS SIN ESPACIOS */
+        .row-widget.stHorizontal > div {
+            padding-left: 0.5rem;
+            padding-right: 0.5rem;
+        }
     
-    /* GRÁFICOS PLOTLY COMPACTOS */
-    .js-plotly-plot {
-        margin: 0.5rem 0 !important;
-    }
+        /* GRÁFICOS PLOTLY COMPACTOS */
+        .js-plotly-plot {
+            margin: 0.5rem 0 !important;
+        }
     
-    /* DATAFRAMES COMPACTOS */
-    .dataframe {
-        margin: 0.5rem 0;
-    }
+        /* DATAFRAMES COMPACTOS */
+        .dataframe {
+            margin: 0.5rem 0;
+        }
     
-    /* SIDEBAR OPTIMIZADA */
-    .sidebar .sidebar-content {
-        background: #f1f5f9;
-        padding-top: 1rem;
-    }
+        /* SIDEBAR OPTIMIZADA */
+        .sidebar .sidebar-content {
+            background: #f1f5f9;
+            padding-top: 1rem;
+        }
     
-    /* BOTONES Y CONTROLES COMPACTOS */
-    .stSelectbox, .stMultiSelect, .stSlider {
-        margin-bottom: 0.5rem;
-    }
+        /* BOTONES Y CONTROLES COMPACTOS */
+        .stSelectbox, .stMultiSelect, .stSlider {
+            margin-bottom: 0.5rem;
+        }
     
-    /* SEPARADORES MINIMALISTAS */
-    hr {
-        margin: 1rem 0;
-        border: none;
-        border-top: 1px solid #e2e8f0;
-    }
+        /* SEPARADORES MINIMALISTAS */
+        hr {
+            margin: 1rem 0;
+            border: none;
+            border-top: 1px solid #e2e8f0;
+        }
     
-    /* FOLIUM MAP SIN MÁRGENES EXTRA */
-    iframe[src*="folium"] {
-        margin: 0 !important;
-        padding: 0 !important;
-    }
+        /* FOLIUM MAP SIN MÁRGENES EXTRA */
+        iframe[src*="folium"] {
+            margin: 0 !important;
+            padding: 0 !important;
+        }
     
-    /* CONTENEDOR PRINCIPAL COMPACTO */
-    .main .block-container {
-        padding-top: 2rem;
-        padding-bottom: 1rem;
-    }
+        /* CONTENEDOR PRINCIPAL COMPACTO */
+        .main .block-container {
+            padding-top: 2rem;
+            padding-bottom: 1rem;
+        }
     
-    /* TÍTULOS CON ESPACIADO CONTROLADO */
-    h1, h2, h3 {
-        margin-top: 1rem;
-        margin-bottom: 0.5rem;
-    }
+        /* TÍTULOS CON ESPACIADO CONTROLADO */
+        h1, h2, h3 {
+            margin-top: 1rem;
+            margin-bottom: 0.5rem;
+        }
     
-    /* ELIMINACIÓN DE ESPACIAMENTO INNECESARIO ENTRE SECCIONES */
-    .element-container {
-        margin-bottom: 0.5rem !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+        /* ELIMINACIÓN DE ESPACIAMENTO INNECESARIO ENTRE SECCIONES */
+        .element-container {
+            margin-bottom: 0.5rem !important;
+        }
+    </style>
+    """, unsafe_allow_html=True)
 
 class WaterQualityApp:
     def __init__(self):
         self.data = None
         self.filtered_data = None
+        self.filter_index = None
+        self.station_partition = None
         self.is_official_data = False
         
     def load_data(self):
@@ -218,25 +224,33 @@ class WaterQualityApp:
             'parameters': selected_parameters
         }
         
+    def get_filter_index(self):
+        """Obtiene el índice de filtros, reutilizándolo entre reruns si los datos no cambiaron"""
+        fingerprint = dataframe_fingerprint(self.data)
+        index = st.session_state.get('water_quality_index')
+        if index is None or index.fingerprint != fingerprint:
+            index = WaterQualityIndex(self.data, fingerprint=fingerprint)
+            st.session_state['water_quality_index'] = index
+        return index
+        
     def apply_filters(self, filters):
         """Aplica los filtros seleccionados a los datos"""
         if self.data is None:
             return
             
-        filtered = self.data.copy()
+        # Sólo filtros temporales y de estaciones; los parámetros seleccionados no filtran filas
+        self.filter_index = self.get_filter_index()
+        self.filtered_data = self.filter_index.select({
+            'year_range': filters['year_range'],
+            'stations': filters['stations']
+        })
+        self.station_partition = None
         
-        # Filtro temporal
-        if 'año' in filtered.columns:
-            filtered = filtered[
-                (filtered['año'] >= filters['year_range'][0]) & 
-                (filtered['año'] <= filters['year_range'][1])
-            ]
-            
-        # Filtro de estaciones
-        if filters['stations'] and 'GLS_ESTACION' in filtered.columns:
-            filtered = filtered[filtered['GLS_ESTACION'].isin(filters['stations'])]
-            
-        self.filtered_data = filtered
+    def get_station_partition(self):
+        """Partición por estación de los datos filtrados, construida una vez por rerun"""
+        if self.station_partition is None and self.filtered_data is not None:
+            self.station_partition = StationPartition(self.filtered_data)
+        return self.station_partition
         
     def render_overview_metrics(self):
         """Renderiza métricas generales del sistema"""
@@ -418,38 +432,45 @@ class WaterQualityApp:
         st.subheader("🗺️ Análisis Espacial por Estaciones")
         
         if 'GLS_ESTACION' in self.filtered_data.columns and filters['stations']:
-            # Análisis por estación
-            station_summary = []
+            # Análisis por estación: todas las estaciones en una sola pasada
+            station_stats = compute_station_summary(
+                self.filtered_data,
+                filters['parameters'],
+                stations=filters['stations'],
+                partition=self.get_station_partition()
+            )
             
-            for station in filters['stations']:
-                station_data = self.filtered_data[self.filtered_data['GLS_ESTACION'] == station]
+            station_summary = None
+            if not station_stats.empty:
+                station_summary = pd.DataFrame({
+                    'Estación': station_stats.index,
+                    'N° Mediciones': station_stats['count'].to_numpy()
+                })
+                if 'year_min' in station_stats.columns:
+                    station_summary['Período'] = [
+                        f"{start:.0f}-{end:.0f}" for start, end in zip(station_stats['year_min'], station_stats['year_max'])
+                    ]
                 
-                if len(station_data) > 0:
-                    summary = {
-                        'Estación': station,
-                        'N° Mediciones': len(station_data),
-                        'Período': f"{station_data['año'].min()}-{station_data['año'].max()}"
-                    }
+                # Agregar estadísticas de parámetros seleccionados
+                for param in filters['parameters']:
+                    if f'{param}_mean' not in station_stats.columns:
+                        continue
+                    param_info = WATER_QUALITY_PARAMETERS.get(param, {})
+                    param_name = param_info.get('name', param)
+                    unit = param_info.get('unit', '')
                     
-                    # Agregar estadísticas de parámetros seleccionados
-                    for param in filters['parameters']:
-                        if param in station_data.columns:
-                            param_info = WATER_QUALITY_PARAMETERS.get(param, {})
-                            param_name = param_info.get('name', param)
-                            unit = param_info.get('unit', '')
-                            
-                            mean_val = station_data[param].mean()
-                            std_val = station_data[param].std()
-                            
-                            if not pd.isna(mean_val):
-                                summary[f'{param_name} (promedio)'] = f"{mean_val:.2f} {unit}"
-                                summary[f'{param_name} (desv. est.)'] = f"{std_val:.2f} {unit}"
-                    
-                    station_summary.append(summary)
-            
-            if station_summary:
-                summary_df = pd.DataFrame(station_summary)
-                st.dataframe(summary_df, use_container_width=True)
+                    means = station_stats[f'{param}_mean'].to_numpy()
+                    stds = station_stats[f'{param}_std'].to_numpy()
+                    station_summary[f'{param_name} (promedio)'] = [
+                        f"{mean_val:.2f} {unit}" if not np.isnan(mean_val) else None for mean_val in means
+                    ]
+                    station_summary[f'{param_name} (desv. est.)'] = [
+                        f"{std_val:.2f} {unit}" if not np.isnan(mean_val) else None
+                        for mean_val, std_val in zip(means, stds)
+                    ]
+            
+            if station_summary is not None:
+                st.dataframe(station_summary, use_container_width=True)
                 
                 # Gráfico comparativo por estaciones
                 if filters['parameters']:
@@ -483,28 +504,21 @@ class WaterQualityApp:
         with col1:
             st.markdown("### 🎯 Indicadores de Calidad")
             
-            for param in filters['parameters']:
-                if param in QUALITY_CLASSIFICATION and param in self.filtered_data.columns:
-                    values = self.filtered_data[param].dropna()
-                    
-                    if len(values) > 0:
-                        param_info = WATER_QUALITY_PARAMETERS.get(param, {})
-                        param_name = param_info.get('name', param)
-                        ranges = QUALITY_CLASSIFICATION[param]
-                        
-                        # Calcular porcentajes por categoría
-                        excellent = sum((values >= ranges['Excelente'][0]) & (values <= ranges['Excelente'][1])) / len(values) * 100
-                        good = sum((values >= ranges['Buena'][0]) & (values <= ranges['Buena'][1]) & 
-                                 ~((values >= ranges['Excelente'][0]) & (values <= ranges['Excelente'][1]))) / len(values) * 100
-                        
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <h4>{param_name}</h4>
-                            <p>🟢 Excelente: {excellent:.1f}%</p>
-                            <p>🟡 Buena: {good:.1f}%</p>
-                            <p>📊 Mediciones: {len(values):,}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
+            # Porcentajes por nivel de todos los parámetros en una sola pasada
+            quality_params = [p for p in filters['parameters'] if p in QUALITY_CLASSIFICATION]
+            quality_stats = compute_water_quality_statistics(
+                self.filtered_data, quality_params, exclusive_bands=True
+            )
+            
+            for _, row in quality_stats.iterrows():
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h4>{row['name']}</h4>
+                    <p>🟢 Excelente: {row['percent_excelente']:.1f}%</p>
+                    <p>🟡 Buena: {row['percent_buena']:.1f}%</p>
+                    <p>📊 Mediciones: {row['count']:,}</p>
+                </div>
+                """, unsafe_allow_html=True)
                         
         with col2:
             # Gráfico de distribución de calidad
@@ -578,7 +592,11 @@ class WaterQualityApp:
                 
             # Crear y mostrar el mapa
             with st.spinner("🗺️ Generando mapa interactivo..."):
-                water_map = create_interactive_water_quality_map(self.filtered_data, filters)
+                # Reutiliza el mapa cacheado si los datos y filtros no cambiaron
+                water_map = create_interactive_water_quality_map(
+                    self.filtered_data, filters, return_artifact=True,
+                    partition=self.get_station_partition()
+                )
                 
                 if water_map:
                     # Contenedor optimizado para el mapa
@@ -588,7 +606,7 @@ class WaterQualityApp:
                     )
                     
                     # Mostrar mapa con dimensiones específicas
-                    map_data = st_folium(
+                    map_data = render_map(
                         water_map,
                         width=800,
                         height=600,
@@ -674,6 +692,9 @@ class WaterQualityApp:
             
     def run(self):
         """Ejecuta la aplicación principal"""
+        # CSS en cada rerun: el módulo se importa una sola vez
+        load_custom_css()
+        
         # Cargar datos
         if not self.load_data():
             st.info("⚠️ La aplicación está funcionando con datos de demostración")
@@ -2,7 +2,14 @@
 Configuración específica para despliegue en Cloud Run
 """
 import os
+import sys
 from datetime import timedelta
+from pathlib import Path
+
+# Directorio de apps en el path para reutilizar los módulos compartidos
+APPS_DIR = Path(__file__).parent.parent / "apps"
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
 
 # Configuración de caché
 CACHE_TTL = int(os.getenv('CACHE_TTL', 3600))  # 1 hora por defecto
@@ -33,19 +40,20 @@ class CloudConfig:
     """Clase de configuración para despliegue en la nube"""
     
     @staticmethod
-    def optimize_dataframe(df):
-        """Optimiza el uso de memoria de un DataFrame para entorno cloud"""
+    def optimize_dataframe(df, schema=None):
+        """
+        Optimiza el uso de memoria de un DataFrame para entorno cloud.
+        
+        Usa el mismo esquema de tipos que la carga de datos (por defecto
+        WATER_QUALITY_DTYPE_SCHEMA): categorías, float32 y enteros pequeños.
+        """
         if not OPTIMIZE_MEMORY:
             return df
-            
-        # Convertir tipos para optimizar memoria
-        for col in df.select_dtypes(include=['float64']).columns:
-            df[col] = df[col].astype('float32')
-            
-        for col in df.select_dtypes(include=['int64']).columns:
-            df[col] = df[col].astype('int32')
-            
-        return df
+        
+        from modules.data_loaders import apply_dtype_schema
+        from modules.water_quality_config import WATER_QUALITY_DTYPE_SCHEMA
+        
+        return apply_dtype_schema(df, schema or WATER_QUALITY_DTYPE_SCHEMA)
         
     @staticmethod
     def get_api_retry_config():
@@ -0,0 +1,159 @@
+"""
+Perfilador de imports del portafolio
+====================================
+
+Equivalente a ``python -X importtime`` pero dentro del proceso de Streamlit,
+para ver en el panel de depuración qué módulos se importan, cuánto tarda
+cada uno y en qué sección de la app ocurrió (inicio, una aplicación o una
+pestaña que importa una librería diferida).
+
+Se activa con la variable de entorno ``IMPORT_PROFILE=true``. ``main.py``
+lo instala antes de importar el resto de sus dependencias, de modo que
+también registra el arranque en frío.
+
+Para cada módulo se registra, como en ``-X importtime``:
+
+- ``self_ms``: tiempo de ejecución del propio módulo
+- ``cumulative_ms``: tiempo incluyendo los módulos que importó
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = os.getenv('IMPORT_PROFILE', 'false').lower() in ('1', 'true', 'yes')
+
+
+class _TimedLoader:
+    """Envuelve el loader de un módulo para medir ``exec_module``"""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        create_module = getattr(self._loader, 'create_module', None)
+        return create_module(spec) if create_module is not None else None
+
+    def exec_module(self, module):
+        try:
+            with self._profiler._measure(module.__name__):
+                self._loader.exec_module(module)
+        finally:
+            # El módulo queda con su loader original
+            module.__loader__ = self._loader
+            if getattr(module, '__spec__', None) is not None:
+                module.__spec__.loader = self._loader
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class ImportProfiler:
+    """Buscador de ``sys.meta_path`` que mide el tiempo de importación de cada módulo"""
+
+    def __init__(self):
+        self.records = []
+        self.started = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def installed(self):
+        return self in sys.meta_path
+
+    def install(self):
+        """Registra el perfilador al inicio de ``sys.meta_path`` (idempotente)"""
+        if not self.installed:
+            self.started = self.started or time.perf_counter()
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self.installed:
+            sys.meta_path.remove(self)
+
+    @property
+    def section_name(self):
+        """Sección activa en el hilo actual (cada sesión de Streamlit corre en su hilo)"""
+        return getattr(self._local, 'section', 'arranque')
+
+    @contextmanager
+    def section(self, name):
+        """Asocia los imports que ocurran dentro del bloque a una sección de la app"""
+        previous = self.section_name
+        self._local.section = name
+        try:
+            yield
+        finally:
+            self._local.section = previous
+
+    def find_spec(self, fullname, path=None, target=None):
+        # Delegar la búsqueda en el resto de buscadores y envolver su loader
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    @contextmanager
+    def _measure(self, name):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        # [tiempo de los módulos hijos] del import en curso
+        stack.append([0.0])
+        depth = len(stack) - 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cumulative = time.perf_counter() - start
+            children = stack.pop()[0]
+            if stack:
+                stack[-1][0] += cumulative
+            with self._lock:
+                self.records.append({
+                    'module': name,
+                    'self_ms': (cumulative - children) * 1000,
+                    'cumulative_ms': cumulative * 1000,
+                    'depth': depth,
+                    'section': self.section_name,
+                    'at_s': start - self.started
+                })
+
+    def summary(self, top=None):
+        """
+        Imports registrados, del más lento al más rápido.
+
+        Args:
+            top: Número máximo de filas (None = todas)
+
+        Returns:
+            Lista de diccionarios con module, self_ms, cumulative_ms, depth,
+            section y at_s (segundos desde la instalación)
+        """
+        with self._lock:
+            records = sorted(self.records, key=lambda r: r['cumulative_ms'], reverse=True)
+        return records[:top] if top else records
+
+    def totals_by_section(self):
+        """Tiempo total de import (ms) por sección, sumando sólo los imports de primer nivel"""
+        totals = {}
+        with self._lock:
+            for record in self.records:
+                if record['depth'] == 0:
+                    totals[record['section']] = totals.get(record['section'], 0.0) + record['cumulative_ms']
+        return totals
+
+
+# Instancia global (una por proceso)
+import_profiler = ImportProfiler()
+
+if ENABLED:
+    import_profiler.install()
@@ -8,11 +8,13 @@ Permite navegar entre diferentes aplicaciones y proyectos.
 Autor: Data Scientist
 """
 
-import streamlit as st
-import importlib.util
 import sys
+import streamlit as st
 from pathlib import Path
 
+from import_profiler import import_profiler
+from app_registry import app_registry
+
 # Configuración de la página principal
 st.set_page_config(
     page_title="Portafolio Data Science",
@@ -26,6 +28,7 @@ if 'initialized' not in st.session_state:
     st.session_state['initialized'] = True
     st.session_state['selected_app'] = "🏠 Inicio"
     st.session_state['current_app'] = None
+    st.session_state['debug_mode'] = app_registry.dev_mode
 
 # Funciones de navegación
 def show_welcome():
@@ -314,16 +317,22 @@ class DataSciencePortfolio:
             st.markdown("- [Documentación](https://github.com/Denniels/ds_portfolio/tree/main/docs)")
           # Contenido principal
         if st.session_state['selected_app'] == "🏠 Inicio":
-            self._show_home_page()
+            with import_profiler.section("inicio"):
+                self._show_home_page()
         else:
             # Buscar la aplicación seleccionada
             for app_key, app_info in self.available_apps.items():
                 if f"{app_info['icon']} {app_info['name']}" == st.session_state['selected_app']:
                     if app_info['status'] == 'Disponible':
-                        self._run_app(app_info)
+                        with import_profiler.section(app_info['file']):
+                            self._run_app(app_info)
                     else:
                         st.warning(f"La aplicación '{app_info['name']}' estará disponible próximamente.")
                     break
+        
+        # Al final, para incluir los imports de este rerun
+        if import_profiler.installed:
+            self._show_import_profile()
     
     def _show_home_page(self):
         """Muestra la página de inicio del portafolio"""
@@ -468,61 +477,51 @@ class DataSciencePortfolio:
             """)
     
     def _run_app(self, app_info):
-        """Ejecuta una aplicación específica"""
+        """Ejecuta una aplicación específica (el módulo se importa una vez por proceso)"""
         try:
-            app_path = self.apps_dir / app_info['file']
+            if app_registry.dev_mode:
+                self._show_dev_tools(app_info)
             
-            # Importar y ejecutar la aplicación
-            spec = importlib.util.spec_from_file_location("app_module", app_path)
-            app_module = importlib.util.module_from_spec(spec)
-              # Agregar el directorio de apps al path para imports relativos
-            if str(self.apps_dir) not in sys.path:
-                sys.path.insert(0, str(self.apps_dir))
-            
-            # Ejecutar la aplicación basada en la clase disponible
-            spec.loader.exec_module(app_module)
-            
-            if hasattr(app_module, 'BudgetAnalysisApp'):
-                app_instance = app_module.BudgetAnalysisApp()
-                app_instance.run()
-            elif hasattr(app_module, 'WaterQualityApp'):
-                app_instance = app_module.WaterQualityApp()
-                app_instance.run()
-            elif hasattr(app_module, 'CO2EmissionsApp'):
-                app_instance = app_module.CO2EmissionsApp()
-                app_instance.run()
-            elif hasattr(app_module, 'DemographicsApp'):
-                app_instance = app_module.DemographicsApp()
-                app_instance.run()
-            elif hasattr(app_module, 'FirestoreFeedbackApp'):
-                # Nueva versión con Firestore
-                app_instance = app_module.FirestoreFeedbackApp()
-                app_instance.run()            
-            elif hasattr(app_module, 'FeedbackApp'):
-                # Versión anterior
-                app_instance = app_module.FeedbackApp()
-                app_instance.run()
-            elif hasattr(app_module, 'ServicesDisplay'):
-                # Servicios Profesionales
-                app_instance = app_module.ServicesDisplay()
-                app_instance.run()
-            elif hasattr(app_module, 'run'):
-                app_module.run()
-            elif hasattr(app_module, 'main'):
-                app_module.main()
-            elif hasattr(app_module, 'app'):
-                # Asegurarse de que app es una función o un objeto llamable
-                if callable(app_module.app):
-                    app_module.app()
-                else:
-                    app_module.app.run()
-            else:
+            if not app_registry.run(app_info['file']):
                 st.error("No se encontró una función main(), run(), app() o clase de aplicación en el módulo.")
                 
         except Exception as e:
             st.error(f"Error al cargar la aplicación: {str(e)}")
             if st.session_state.get('debug_mode', False):
                 st.exception(e)
+    
+    def _show_import_profile(self):
+        """Tiempos de importación registrados con IMPORT_PROFILE=true"""
+        with st.sidebar.expander("⏱️ Tiempos de importación"):
+            for section, total_ms in import_profiler.totals_by_section().items():
+                st.caption(f"{section}: {total_ms:,.0f} ms")
+            st.dataframe(
+                [{k: round(v, 1) if isinstance(v, float) else v for k, v in record.items()}
+                 for record in import_profiler.summary(top=25)],
+                use_container_width=True
+            )
+    
+    def _show_dev_tools(self, app_info):
+        """Recarga en caliente y tiempos de las aplicaciones (sólo en modo desarrollo)"""
+        with st.sidebar:
+            st.markdown("---")
+            st.markdown("### 🛠️ Desarrollo")
+            loaded = app_registry.load(app_info['file'])
+            if loaded.is_stale:
+                st.warning(f"{app_info['file']} cambió desde que se importó")
+            if st.button("🔄 Recargar aplicación", use_container_width=True):
+                app_registry.reload(app_info['file'])
+            
+            stats = app_registry.stats()
+            if stats:
+                st.dataframe(stats, use_container_width=True)
+            
+            # Hits/misses de los métodos con @cached_method (el módulo ya está importado si alguna app lo usa)
+            method_cache = sys.modules.get('modules.method_cache')
+            method_stats = method_cache.get_method_cache_stats() if method_cache else []
+            if method_stats:
+                st.caption("Caché de visualizaciones")
+                st.dataframe(method_stats, use_container_width=True)
 
 def main():
     """Función principal"""
@@ -531,6 +530,7 @@ def main():
         st.session_state['initialized'] = True
         st.session_state['selected_app'] = "🏠 Inicio"
         st.session_state['current_app'] = None
+        st.session_state['debug_mode'] = app_registry.dev_mode
     
     portfolio = DataSciencePortfolio()
     portfolio.run_portfolio()
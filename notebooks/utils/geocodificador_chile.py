@@ -16,15 +16,117 @@ import numpy as np
 import requests
 import time
 import json
+import os
+import random
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Union
 import re
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
+import sys
 import folium
 import plotly.graph_objects as go
 import plotly.express as px
 
+# Almacén de coordenadas compartido con la app (app/apps/modules/coordinate_store.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "app" / "apps"))
+try:
+    from modules.coordinate_store import CoordinateStore
+except ImportError:
+    CoordinateStore = None
+
+
+class TokenBucket:
+    """
+    Limitador de tasa tipo token bucket, seguro entre hilos.
+    
+    Permite ráfagas de hasta ``capacidad`` solicitudes y un promedio de
+    ``tasa`` solicitudes por segundo.
+    """
+    
+    def __init__(self, tasa: float, capacidad: int = 1):
+        """
+        Args:
+            tasa: Solicitudes por segundo permitidas en promedio
+            capacidad: Tamaño máximo de ráfaga
+        """
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._tokens = float(capacidad)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def adquirir(self):
+        """Bloquea hasta que haya un token disponible y lo consume."""
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+                self._ultimo = ahora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.tasa
+            time.sleep(espera)
+
+
+class ErrorTransitorio(Exception):
+    """Error recuperable de un backend (timeout, servicio no disponible, límite de tasa)."""
+
+
+class NominatimBackend:
+    """Backend de geocodificación basado en Nominatim (OpenStreetMap) vía geopy."""
+    
+    def __init__(self, user_agent: str = "analisis_ambiental_chile_v1.0", timeout: int = 10):
+        from geopy.geocoders import Nominatim
+        from geopy import exc
+        
+        self.geocoder = Nominatim(user_agent=user_agent, timeout=timeout)
+        self._errores_transitorios = tuple(
+            getattr(exc, nombre) for nombre in
+            ('GeocoderTimedOut', 'GeocoderUnavailable', 'GeocoderRateLimited', 'GeocoderServiceError')
+            if hasattr(exc, nombre)
+        )
+    
+    def geocode(self, consulta: str) -> Optional[Tuple[float, float]]:
+        """
+        Geocodifica una consulta.
+        
+        Returns:
+            Tupla (latitud, longitud) o None si no hay resultados
+        
+        Raises:
+            ErrorTransitorio: si la falla es recuperable y conviene reintentar
+        """
+        try:
+            location = self.geocoder.geocode(consulta)
+        except self._errores_transitorios as e:
+            raise ErrorTransitorio(str(e)) from e
+        if location is None:
+            return None
+        return (location.latitude, location.longitude)
+
+
+class DiccionarioBackend:
+    """
+    Backend local a partir de un diccionario consulta -> (lat, lon).
+    
+    Útil para pruebas y para trabajar sin conexión: no realiza solicitudes
+    de red y puede simular latencia.
+    """
+    
+    def __init__(self, coordenadas: Dict[str, Tuple[float, float]], latencia: float = 0.0):
+        self.coordenadas = {consulta.upper(): coords for consulta, coords in coordenadas.items()}
+        self.latencia = latencia
+        self.consultas = 0
+    
+    def geocode(self, consulta: str) -> Optional[Tuple[float, float]]:
+        self.consultas += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+        return self.coordenadas.get(consulta.upper().replace(', CHILE', ''))
+
 
 class GeocodificadorChile:
     """
@@ -34,15 +136,37 @@ class GeocodificadorChile:
     validación cruzada para garantizar la precisión de las coordenadas.
     """
     
-    def __init__(self, cache_file: str = "cache_coordenadas_chile.json"):
+    def __init__(self, cache_file: str = "cache_coordenadas_chile.json",
+                 backend=None,
+                 solicitudes_por_segundo: float = 1.0,
+                 max_reintentos: int = 3,
+                 backoff_base: float = 1.0,
+                 store=None,
+                 ttl_fallidos: Optional[float] = None):
         """
         Inicializa el geocodificador con configuración optimizada para Chile.
         
         Args:
-            cache_file: Archivo para almacenar coordenadas geocodificadas
+            cache_file: Cache JSON anterior; se usa sólo si el almacén SQLite
+                compartido no está disponible y, si existe, se migra a él
+            backend: Objeto con método ``geocode(consulta) -> (lat, lon) | None``
+                (por defecto ``NominatimBackend``)
+            solicitudes_por_segundo: Tasa máxima de consultas al backend
+                (la política de uso de Nominatim exige 1 por segundo)
+            max_reintentos: Reintentos ante errores transitorios del backend
+            backoff_base: Espera inicial (s) entre reintentos; se duplica en cada intento
+            store: ``CoordinateStore`` a usar (por defecto el almacén compartido con la app)
+            ttl_fallidos: Vigencia (s) de las estaciones no geocodificadas; al vencer
+                se vuelven a consultar (None = no vencen)
         """
         self.cache_file = Path(cache_file)
-        self.cache_coordenadas = self._cargar_cache()
+        self.ttl_fallidos = ttl_fallidos
+        self._cache_lock = threading.Lock()
+        # Resultados aún no escritos en el cache persistente
+        self._pendientes = {}
+        self.store = store if store is not None else self._abrir_almacen()
+        # Con almacén, ``cache_coordenadas`` es sólo la memoria de esta sesión
+        self.cache_coordenadas = {} if self.store is not None else self._cargar_cache()
         
         # Límites geográficos de Chile (validación)
         self.limites_chile = {
@@ -50,11 +174,11 @@ class GeocodificadorChile:
             'lon_min': -76.0, 'lon_max': -66.0
         }
         
-        # Configurar geocodificador principal
-        self.geocoder = Nominatim(
-            user_agent="analisis_ambiental_chile_v1.0",
-            timeout=10
-        )
+        # Configurar geocodificador principal, limitador de tasa y reintentos
+        self.backend = backend if backend is not None else NominatimBackend()
+        self.limitador = TokenBucket(solicitudes_por_segundo)
+        self.max_reintentos = max_reintentos
+        self.backoff_base = backoff_base
         
         # Patrones para extracción de topónimos
         self.patrones_extraccion = {
@@ -68,6 +192,55 @@ class GeocodificadorChile:
         
         print("🗺️ Geocodificador de Chile inicializado correctamente")
     
+    def _abrir_almacen(self):
+        """Abrir el almacén SQLite compartido, migrando el cache JSON si existe."""
+        if CoordinateStore is None:
+            return None
+        try:
+            store = CoordinateStore()
+            if self.cache_file.exists():
+                migradas = store.import_json(self.cache_file, source='geocodificador')
+                if migradas:
+                    print(f"📦 {migradas} coordenadas migradas desde {self.cache_file}")
+            return store
+        except Exception as e:
+            print(f"⚠️ Almacén de coordenadas no disponible, se usa {self.cache_file}: {e}")
+            return None
+    
+    @staticmethod
+    def _desde_registro(nombre_estacion: str, registro: Dict) -> Dict:
+        """Convertir un registro del almacén al formato de resultado del geocodificador."""
+        if registro['data']:
+            return registro['data']
+        # Entradas escritas por la app (geo_utils) sólo traen coordenadas
+        return {
+            'nombre_estacion': nombre_estacion,
+            'latitud': registro['lat'],
+            'longitud': registro['lon'],
+            'geocodificado': registro['found'],
+            'metodo': registro['source'],
+            'toponimos_extraidos': {},
+            'timestamp': pd.Timestamp(registro['updated'], unit='s').isoformat()
+        }
+    
+    def _consultar_cache(self, estaciones: List[str]) -> Dict[str, Dict]:
+        """Resultados en cache para varias estaciones (memoria y luego una consulta al almacén)."""
+        with self._cache_lock:
+            encontrados = {e: self.cache_coordenadas[e] for e in estaciones if e in self.cache_coordenadas}
+        faltantes = [e for e in estaciones if e not in encontrados]
+        if self.store is not None and faltantes:
+            try:
+                registros = self.store.get_many(faltantes)
+            except Exception as e:
+                print(f"⚠️ Error leyendo almacén de coordenadas: {e}")
+                registros = {}
+            with self._cache_lock:
+                for estacion, registro in registros.items():
+                    resultado = self._desde_registro(estacion, registro)
+                    self.cache_coordenadas[estacion] = resultado
+                    encontrados[estacion] = resultado
+        return encontrados
+    
     def _cargar_cache(self) -> Dict:
         """Cargar cache de coordenadas desde archivo."""
         if self.cache_file.exists():
@@ -79,10 +252,38 @@ class GeocodificadorChile:
         return {}
     
     def _guardar_cache(self):
-        """Guardar cache de coordenadas a archivo."""
+        """Guardar los resultados pendientes (una transacción en el almacén o JSON atómico)."""
+        if self.store is not None:
+            with self._cache_lock:
+                pendientes, self._pendientes = self._pendientes, {}
+            try:
+                self.store.put_many([
+                    {
+                        'name': estacion,
+                        'lat': resultado['latitud'],
+                        'lon': resultado['longitud'],
+                        'found': resultado['geocodificado'],
+                        'source': f"geocodificador:{resultado['metodo']}" if resultado['metodo'] else 'geocodificador',
+                        'data': resultado,
+                        'ttl_seconds': None if resultado['geocodificado'] else self.ttl_fallidos
+                    }
+                    for estacion, resultado in pendientes.items()
+                ])
+            except Exception as e:
+                # Se reintenta en la siguiente escritura
+                with self._cache_lock:
+                    self._pendientes = {**pendientes, **self._pendientes}
+                print(f"⚠️ Error guardando cache: {e}")
+            return
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache_coordenadas, f, ensure_ascii=False, indent=2)
+            with self._cache_lock:
+                self._pendientes = {}
+                snapshot = dict(self.cache_coordenadas)
+            directorio = self.cache_file.parent
+            fd, tmp_path = tempfile.mkstemp(dir=directorio if str(directorio) else '.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_file)
         except Exception as e:
             print(f"⚠️ Error guardando cache: {e}")
     
@@ -126,7 +327,10 @@ class GeocodificadorChile:
     
     def geocodificar_con_nominatim(self, consulta: str) -> Optional[Tuple[float, float]]:
         """
-        Geocodifica usando Nominatim (OpenStreetMap).
+        Geocodifica usando el backend configurado (Nominatim por defecto).
+        
+        Respeta el limitador de tasa y reintenta con backoff exponencial
+        ante errores transitorios.
         
         Args:
             consulta: Consulta de geocodificación
@@ -134,43 +338,55 @@ class GeocodificadorChile:
         Returns:
             Tupla (latitud, longitud) o None si falla
         """
-        try:
-            # Agregar "Chile" a la consulta para mejorar precisión
-            consulta_completa = f"{consulta}, Chile"
-            location = self.geocoder.geocode(consulta_completa)
-            
-            if location:
-                lat, lon = location.latitude, location.longitude
-                if self.validar_coordenadas_chile(lat, lon):
-                    return (lat, lon)
-                else:
+        # Agregar "Chile" a la consulta para mejorar precisión
+        consulta_completa = f"{consulta}, Chile"
+        
+        for intento in range(self.max_reintentos + 1):
+            self.limitador.adquirir()
+            try:
+                coordenadas = self.backend.geocode(consulta_completa)
+                if coordenadas:
+                    lat, lon = coordenadas
+                    if self.validar_coordenadas_chile(lat, lon):
+                        return (lat, lon)
                     print(f"⚠️ Coordenadas fuera de Chile: {consulta} -> {lat}, {lon}")
-            
-        except GeocoderTimedOut:
-            print(f"⏱️ Timeout geocodificando: {consulta}")
-        except Exception as e:
-            print(f"❌ Error geocodificando {consulta}: {e}")
+                return None
+            except ErrorTransitorio as e:
+                if intento == self.max_reintentos:
+                    print(f"⏱️ Sin respuesta tras {intento + 1} intentos: {consulta} ({e})")
+                    return None
+                # Backoff exponencial con jitter para no sincronizar los hilos
+                time.sleep(self.backoff_base * (2 ** intento) * (1 + random.random() * 0.1))
+            except Exception as e:
+                print(f"❌ Error geocodificando {consulta}: {e}")
+                return None
         
         return None
     
-    def geocodificar_estacion(self, nombre_estacion: str, forzar_actualizacion: bool = False) -> Dict:
+    def geocodificar_estacion(self, nombre_estacion: str, forzar_actualizacion: bool = False,
+                              guardar: bool = True, verbose: bool = True) -> Dict:
         """
         Geocodifica una estación de monitoreo específica.
         
         Args:
             nombre_estacion: Nombre completo de la estación
             forzar_actualizacion: Si True, ignora el cache
+            guardar: Si True, escribe el cache a disco (el pipeline lo hace por lotes)
+            verbose: Si True, informa el resultado en consola
             
         Returns:
             Dict con información de geocodificación
         """
         # Verificar cache primero
-        if not forzar_actualizacion and nombre_estacion in self.cache_coordenadas:
-            resultado = self.cache_coordenadas[nombre_estacion].copy()
-            resultado['fuente'] = 'cache'
-            return resultado
+        if not forzar_actualizacion:
+            en_cache = self._consultar_cache([nombre_estacion]).get(nombre_estacion)
+            if en_cache is not None:
+                resultado = en_cache.copy()
+                resultado['fuente'] = 'cache'
+                return resultado
         
-        print(f"🔍 Geocodificando: {nombre_estacion}")
+        if verbose:
+            print(f"🔍 Geocodificando: {nombre_estacion}")
         
         # Extraer topónimos
         toponimos = self.extraer_toponimos(nombre_estacion)
@@ -214,30 +430,41 @@ class GeocodificadorChile:
             'timestamp': pd.Timestamp.now().isoformat()
         }
         
-        # Guardar en cache
-        self.cache_coordenadas[nombre_estacion] = resultado
-        self._guardar_cache()
+        # Guardar en cache (la tasa de consultas la controla el limitador)
+        with self._cache_lock:
+            self.cache_coordenadas[nombre_estacion] = resultado
+            self._pendientes[nombre_estacion] = resultado
+        if guardar:
+            self._guardar_cache()
         
-        if coordenadas:
-            print(f"✅ Geocodificado exitoso: {coordenadas}")
-        else:
-            print(f"❌ No se pudo geocodificar")
-        
-        # Pausa para ser respetuoso con la API
-        time.sleep(1)
+        if verbose:
+            if coordenadas:
+                print(f"✅ Geocodificado exitoso: {coordenadas}")
+            else:
+                print(f"❌ No se pudo geocodificar")
         
         return resultado
     
     def geocodificar_dataframe(self, df: pd.DataFrame, 
                              columna_nombre: str = 'GLS_ESTACION',
-                             mostrar_progreso: bool = True) -> pd.DataFrame:
+                             mostrar_progreso: bool = True,
+                             max_workers: int = 4,
+                             tamano_lote: int = 25) -> pd.DataFrame:
         """
         Geocodifica todas las estaciones en un DataFrame.
         
+        Las estaciones únicas que no están en el cache se procesan con un pool
+        acotado de hilos; el limitador de tasa del geocodificador mantiene el
+        ritmo de consultas al backend. El cache se escribe cada ``tamano_lote``
+        estaciones, de modo que si el proceso se interrumpe, la siguiente
+        ejecución retoma desde la última escritura.
+        
         Args:
             df: DataFrame con estaciones
             columna_nombre: Nombre de la columna con nombres de estaciones
             mostrar_progreso: Si mostrar progreso de geocodificación
+            max_workers: Hilos que consultan el backend en paralelo
+            tamano_lote: Estaciones procesadas entre escrituras del cache
             
         Returns:
             DataFrame enriquecido con coordenadas
@@ -248,21 +475,59 @@ class GeocodificadorChile:
         estaciones_unicas = df[columna_nombre].dropna().unique()
         print(f"📍 Estaciones únicas a geocodificar: {len(estaciones_unicas)}")
         
-        # Geocodificar cada estación única
+        # Las estaciones ya presentes en el cache no consultan el backend
+        en_cache = self._consultar_cache(list(estaciones_unicas))
         resultados_geocodificacion = {}
-        exitosos = 0
-        
-        for i, estacion in enumerate(estaciones_unicas, 1):
-            if mostrar_progreso and i % 10 == 0:
-                print(f"📊 Progreso: {i}/{len(estaciones_unicas)} ({i/len(estaciones_unicas)*100:.1f}%)")
-            
-            resultado = self.geocodificar_estacion(estacion)
-            resultados_geocodificacion[estacion] = resultado
-            
-            if resultado['geocodificado']:
-                exitosos += 1
-        
-        print(f"✅ Geocodificación completada: {exitosos}/{len(estaciones_unicas)} ({exitosos/len(estaciones_unicas)*100:.1f}%) exitosas")
+        pendientes = []
+        for estacion in estaciones_unicas:
+            if estacion in en_cache:
+                resultados_geocodificacion[estacion] = {**en_cache[estacion], 'fuente': 'cache'}
+            else:
+                pendientes.append(estacion)
+        if resultados_geocodificacion:
+            print(f"♻️ Reanudando: {len(resultados_geocodificacion)} estaciones ya estaban en el cache")
+        
+        inicio = time.perf_counter()
+        sin_guardar = 0
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+                futuros = {
+                    pool.submit(self.geocodificar_estacion, estacion, guardar=False, verbose=False): estacion
+                    for estacion in pendientes
+                }
+                try:
+                    for i, futuro in enumerate(as_completed(futuros), 1):
+                        estacion = futuros[futuro]
+                        resultados_geocodificacion[estacion] = futuro.result()
+                        sin_guardar += 1
+                        
+                        # Persistir el progreso por lotes
+                        if sin_guardar >= tamano_lote:
+                            self._guardar_cache()
+                            sin_guardar = 0
+                        
+                        if mostrar_progreso and (i % 10 == 0 or i == len(pendientes)):
+                            print(f"📊 Progreso: {i}/{len(pendientes)} ({i/len(pendientes)*100:.1f}%)")
+                except BaseException:
+                    # Interrupción: descartar lo que no alcanzó a empezar
+                    for futuro in futuros:
+                        futuro.cancel()
+                    raise
+        finally:
+            # También ante una interrupción (o tras un error al guardar un lote):
+            # lo ya geocodificado no se pierde
+            with self._cache_lock:
+                hay_pendientes = bool(self._pendientes)
+            if hay_pendientes:
+                self._guardar_cache()
+        
+        if pendientes:
+            duracion = time.perf_counter() - inicio
+            print(f"⏱️ {len(pendientes)} estaciones consultadas en {duracion:.1f}s")
+        
+        exitosos = sum(1 for resultado in resultados_geocodificacion.values() if resultado['geocodificado'])
+        total = max(len(estaciones_unicas), 1)
+        print(f"✅ Geocodificación completada: {exitosos}/{len(estaciones_unicas)} ({exitosos/total*100:.1f}%) exitosas")
         
         # Agregar coordenadas al DataFrame
         df_resultado = df.copy()
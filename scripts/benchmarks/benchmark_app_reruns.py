@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latencia de reruns por aplicación
+==============================================
+
+Mide, para cada aplicación del portafolio:
+
+1. Latencia de un rerun completo de ``app/main.py`` con la aplicación
+   seleccionada, usando ``streamlit.testing.v1.AppTest``. La primera
+   ejecución (importación en frío) se informa aparte de la mediana de los
+   reruns siguientes.
+2. Carga del módulo: la importación original en cada rerun
+   (``spec_from_file_location`` + ``exec_module``) frente a
+   ``app_registry.load`` (importado una vez por proceso).
+
+Uso:
+    python scripts/benchmarks/benchmark_app_reruns.py
+    python scripts/benchmarks/benchmark_app_reruns.py --reruns 20 --apps water_quality co2_emissions
+"""
+
+import argparse
+import importlib.util
+import logging
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+MAIN_FILE = ROOT / "app" / "main.py"
+APPS_DIR = ROOT / "app" / "apps"
+
+sys.path.insert(0, str(ROOT / "app"))
+sys.path.insert(0, str(APPS_DIR))
+
+# Aplicaciones medidas: clave -> (archivo, opción del selector en main.py)
+APPS = {
+    'water_quality': ("water_quality_app.py", "💧 Análisis de Calidad del Agua"),
+    'co2_emissions': ("co2_emissions_app.py", "🏭 Emisiones CO2 Chile"),
+    'demographics': ("demographics_app_new.py", "👤 Análisis Demográfico"),
+    'budget_analysis': ("budget_analysis_app_v2.py", "💰 Análisis del Presupuesto Público"),
+    'servicios': ("services_display_fixed.py", "💼 Servicios Profesionales")
+}
+
+
+def legacy_load(app_file):
+    """Importación original: se re-ejecuta el archivo completo en cada rerun"""
+    spec = importlib.util.spec_from_file_location("app_module", APPS_DIR / app_file)
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+    return app_module
+
+
+def median_seconds(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def benchmark_loading(apps, repeats):
+    """Carga del módulo por rerun: original vs registro"""
+    from app_registry import AppRegistry
+
+    registry = AppRegistry(APPS_DIR)
+    print(f"\n{'aplicación':<18} {'original (ms)':>14} {'registro (ms)':>14}")
+    for key in apps:
+        app_file = APPS[key][0]
+        legacy_load(app_file)  # Calentar dependencias compartidas (plotly, folium, modules/...)
+        legacy = median_seconds(lambda: legacy_load(app_file), repeats)
+        registry.load(app_file)
+        cached = median_seconds(lambda: registry.load(app_file), repeats)
+        print(f"{key:<18} {legacy * 1000:>14.1f} {cached * 1000:>14.3f}")
+
+
+def benchmark_reruns(apps, reruns):
+    """Latencia de reruns completos de main.py con AppTest"""
+    from streamlit.testing.v1 import AppTest
+
+    print(f"\n{'aplicación':<18} {'primera (s)':>12} {'mediana rerun (s)':>18}")
+    for key in apps:
+        at = AppTest.from_file(str(MAIN_FILE), default_timeout=300)
+        at.run()
+        at.session_state['selected_app'] = APPS[key][1]
+        start = time.perf_counter()
+        at.run()
+        first = time.perf_counter() - start
+        rerun = median_seconds(at.run, reruns)
+        print(f"{key:<18} {first:>12.3f} {rerun:>18.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de latencia de reruns por aplicación")
+    parser.add_argument("--apps", nargs="+", choices=list(APPS), default=list(APPS))
+    parser.add_argument("--reruns", type=int, default=10, help="Reruns medidos por aplicación")
+    parser.add_argument("--skip-apptest", action="store_true", help="Medir sólo la carga de módulos")
+    args = parser.parse_args()
+
+    # Streamlit fuera de `streamlit run` emite advertencias en cada llamada
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings("ignore")
+
+    # Primero los reruns, para que la primera ejecución sea una importación en frío
+    if not args.skip_apptest:
+        benchmark_reruns(args.apps, args.reruns)
+    benchmark_loading(args.apps, args.reruns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark del cubo jerárquico del presupuesto
+=============================================
+
+Compara lo que calculaba cada rerun de ``budget_analysis_app_v2.py`` (un
+``groupby(nivel)`` sobre los registros crudos por cada vista: métricas de
+concentración, distribución, evolución y tabla detallada) con las consultas
+al cubo de ``modules.budget_cube``, que se construye una vez por carga.
+
+Los registros son sintéticos, con la misma estructura que sirve
+``scripts/ckan_stub_server.py``.
+
+Uso:
+    python scripts/benchmarks/benchmark_budget_cube.py
+    python scripts/benchmarks/benchmark_budget_cube.py --rows 20000 500000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio de apps y de scripts al path para imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "app" / "apps"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ckan_stub_server import FIELDS, make_budget_records
+from modules.budget_cube import BUDGET_LEVELS, build_budget_cube
+
+
+def views_legacy(df, nivel):
+    """Agrupaciones originales de las cuatro vistas, conservadas sólo como referencia"""
+    grouped = df.groupby(nivel)['Monto Pesos'].sum().sort_values(ascending=False)  # concentración
+    df.groupby(nivel)['Monto Pesos'].sum().sort_values(ascending=False)  # distribución
+    df.groupby(nivel)['Monto Pesos'].sum().sort_values(ascending=False).head(5)  # evolución
+    detailed = df.groupby(nivel).agg({'Denominacion': 'first', 'Monto Pesos': ['sum', 'count', 'mean']})
+    return grouped, detailed
+
+
+def views_cube(cube, nivel):
+    grouped = cube.totals(nivel)
+    cube.totals(nivel)
+    cube.totals(nivel).head(5)
+    detailed = cube.level(nivel)[['Denominacion', 'pesos_sum', 'pesos_count', 'pesos_mean']]
+    return grouped, detailed
+
+
+def _timeit(func, *args, repeat=5):
+    """Mejor tiempo de varias ejecuciones"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(sizes):
+    print(f"{'filas':>10} {'nivel':<10} {'groupby (ms)':>13} {'cubo (ms)':>10} {'aceleración':>12}")
+    for rows in sizes:
+        df = pd.DataFrame(make_budget_records(rows), columns=[field['id'] for field in FIELDS])
+        build_time, cube = _timeit(build_budget_cube, df, repeat=1)
+        for nivel in BUDGET_LEVELS:
+            old_time, (old_grouped, _) = _timeit(views_legacy, df, nivel)
+            new_time, (new_grouped, _) = _timeit(views_cube, cube, nivel)
+            assert old_grouped.index.equals(new_grouped.index)
+            assert np.array_equal(old_grouped.to_numpy(), new_grouped.to_numpy())
+            print(f"{rows:>10,} {nivel:<10} {old_time * 1000:>13.2f} {new_time * 1000:>10.3f} "
+                  f"{old_time / new_time:>11.0f}x")
+        print(f"{rows:>10,} construcción del cubo: {build_time * 1000:.0f} ms, {len(cube.nodes):,} nodos")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del cubo jerárquico del presupuesto")
+    parser.add_argument("--rows", nargs="+", type=int, default=[20_000, 200_000], help="Registros sintéticos")
+    run(parser.parse_args().rows)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la descarga del presupuesto desde CKAN
+===================================================
+
+Compara la descarga original de ``fetch_budget_data_cached`` (una sola
+consulta ``urllib`` con ``limit=10000`` y una lista de diccionarios) con
+``modules.ckan_fetcher.CKANDatastoreFetcher`` (páginas concurrentes sobre
+una sesión keep-alive con gzip, columnas tipadas por página).
+
+Las descargas van contra ``scripts/ckan_stub_server.py`` con latencia por
+consulta, así que no se necesita conexión. Para la versión original se
+reporta cuántas filas del recurso quedaban fuera; la aceleración de la
+versión paginada se mide contra su propia ejecución con un hilo.
+
+Uso:
+    python scripts/benchmarks/benchmark_ckan_fetch.py
+    python scripts/benchmarks/benchmark_ckan_fetch.py --rows 20000 200000 --workers 1 4 8 --latency 0.1
+"""
+
+import argparse
+import json
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pandas as pd
+
+# Agregar el directorio de apps y de scripts al path para imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "app" / "apps"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ckan_stub_server import CKANStubServer
+from modules.ckan_fetcher import CKANDatastoreFetcher
+
+
+def fetch_budget_legacy(api_url, resource_id):
+    """Descarga original en una sola consulta, conservada sólo como referencia"""
+    url = f"{api_url}?resource_id={resource_id}&limit=10000"
+    headers = {'User-Agent': 'Mozilla/5.0', 'Accept': 'application/json'}
+    request = urllib.request.Request(url, headers=headers)
+    with urllib.request.urlopen(request) as response:
+        data = json.loads(response.read().decode('utf-8'))
+    df = pd.DataFrame(data['result']['records'])
+    df['Monto Pesos'] = pd.to_numeric(df['Monto Pesos'], errors='coerce')
+    df['Monto Dolar'] = pd.to_numeric(df['Monto Dolar'], errors='coerce')
+    return df.fillna(0)
+
+
+def fetch_budget_paginated(api_url, resource_id, workers, page_size):
+    fetcher = CKANDatastoreFetcher(api_url, page_size=page_size, max_workers=workers)
+    try:
+        return fetcher.fetch_frame(resource_id)
+    finally:
+        fetcher.close()
+
+
+def _timeit(func, *args, repeat=3):
+    """Mejor tiempo de varias ejecuciones"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(args):
+    print(f"Latencia por consulta: {args.latency * 1000:.0f} ms, página: {args.page_size:,} filas")
+    print(f"\n{'filas':>10} {'método':<22} {'filas leídas':>13} {'tiempo (s)':>11} {'filas/s':>10} {'vs 1 hilo':>10}")
+    for rows in args.rows:
+        with CKANStubServer(rows=rows, latency=args.latency) as server:
+            old_time, old_df = _timeit(fetch_budget_legacy, server.url, server.resource_id)
+            missing = rows - len(old_df)
+            note = f" ({missing:,} truncadas)" if missing else ""
+            print(f"{rows:>10,} {'urllib limit=10000':<22} {len(old_df):>13,} {old_time:>11.3f} "
+                  f"{len(old_df) / old_time:>10,.0f} {'-':>10}{note}")
+            base_time = None
+            for workers in args.workers:
+                new_time, new_df = _timeit(fetch_budget_paginated, server.url, server.resource_id,
+                                           workers, args.page_size)
+                assert len(new_df) == rows, f"Se esperaban {rows} filas, llegaron {len(new_df)}"
+                base_time = base_time or new_time
+                label = f"paginado ({workers} hilos)"
+                print(f"{rows:>10,} {label:<22} {len(new_df):>13,} {new_time:>11.3f} "
+                      f"{rows / new_time:>10,.0f} {base_time / new_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la descarga paginada de CKAN")
+    parser.add_argument("--rows", nargs="+", type=int, default=[10_000, 100_000], help="Filas del recurso")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 4], help="Hilos de descarga")
+    parser.add_argument("--page-size", type=int, default=5_000, help="Filas por página")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latencia agregada por consulta (s)")
+    run(parser.parse_args())
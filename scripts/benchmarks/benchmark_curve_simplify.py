@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark de curvas acumuladas con presupuesto de puntos
+========================================================
+
+Compara la figura de distribución original de ``budget_analysis_app_v2.py``
+(un punto por entidad en la diagonal de igualdad y en la curva acumulada)
+con la simplificada de ``modules.curve_simplify`` (diagonal de dos puntos y
+curva reducida con LTTB). Reporta puntos enviados, tamaño del JSON de la
+figura, tiempo de serialización y el error máximo de la curva simplificada
+(en puntos porcentuales, interpolando linealmente entre los puntos
+conservados).
+
+Uso:
+    python scripts/benchmarks/benchmark_curve_simplify.py
+    python scripts/benchmarks/benchmark_curve_simplify.py --entities 5000 500000 --max-points 200 400 1000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Agregar el directorio de apps al path para imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "app" / "apps"))
+
+from modules.concentration import concentration_metrics
+from modules.curve_simplify import simplify_curve
+
+
+def distribution_figure(equality_x, curve_x, curve_y):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=equality_x, y=equality_x, name='Igualdad Perfecta',
+                             line=dict(color='gray', dash='dash')))
+    fig.add_trace(go.Scatter(x=curve_x, y=curve_y, name='Distribución Real',
+                             line=dict(color='firebrick'), fill='tonexty'))
+    return fig
+
+
+def _timeit(func, *args, repeat=3):
+    """Mejor tiempo de varias ejecuciones"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(args):
+    rng = np.random.default_rng(42)
+    print(f"{'entidades':>10} {'presupuesto':>12} {'puntos':>9} {'JSON (KB)':>10} "
+          f"{'serializar (ms)':>16} {'simplificar (ms)':>17} {'error máx (pp)':>15}")
+    for n in args.entities:
+        metrics = concentration_metrics(rng.lognormal(17, 2, n))
+        x, y = metrics.lorenz_x, metrics.lorenz_y
+
+        full = distribution_figure(x, x, y)
+        json_time, payload = _timeit(full.to_json)
+        print(f"{n:>10,} {'-':>12} {2 * n:>9,} {len(payload) / 1024:>10,.0f} {json_time * 1000:>16.1f} "
+              f"{'-':>17} {0.0:>15.4f}")
+
+        for max_points in args.max_points:
+            simplify_time, (sx, sy) = _timeit(simplify_curve, x, y, max_points, (2, 9))
+            fig = distribution_figure([0, 100], sx, sy)
+            json_time, payload = _timeit(fig.to_json)
+            error = np.abs(np.interp(x, sx, sy) - y).max()
+            print(f"{n:>10,} {max_points:>12,} {len(sx) + 2:>9,} {len(payload) / 1024:>10,.0f} "
+                  f"{json_time * 1000:>16.1f} {simplify_time * 1000:>17.1f} {error:>15.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de curvas acumuladas con presupuesto de puntos")
+    parser.add_argument("--entities", nargs="+", type=int, default=[1_000, 20_000, 200_000],
+                        help="Entidades (puntos de la curva original)")
+    parser.add_argument("--max-points", nargs="+", type=int, default=[200, 400],
+                        help="Presupuestos de puntos a evaluar")
+    run(parser.parse_args())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark del generador de datos de demostración de calidad del agua
+====================================================================
+
+Compara la implementación original (un registro por iteración con llamadas
+escalares a ``np.random``) con el generador vectorizado de
+``modules.water_quality.create_demo_water_data``.
+
+Uso:
+    python scripts/benchmarks/benchmark_demo_water_data.py
+    python scripts/benchmarks/benchmark_demo_water_data.py --sizes 5000 50000 1000000
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio de apps al path para imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "app" / "apps"))
+
+from modules.config import DEMO_STATIONS
+from modules.water_quality import create_demo_water_data
+
+# Sobre este tamaño la versión por filas se omite (tarda minutos)
+LEGACY_MAX_RECORDS = 200_000
+
+
+def create_demo_water_data_legacy(n_records=5000):
+    """Implementación original por filas, conservada sólo como referencia"""
+    np.random.seed(42)
+    dates = pd.date_range(datetime(2020, 1, 1), datetime(2024, 12, 31), periods=n_records)
+    stations = list(DEMO_STATIONS.keys())
+    data = []
+
+    for date in dates:
+        station = np.random.choice(stations)
+        seasonal_factor = np.sin(2 * np.pi * (date.month - 1) / 12)
+        temp = np.clip(15 + 8 * seasonal_factor + np.random.normal(0, 3), 5, 35)
+        ph = np.clip(np.random.normal(7.2, 0.6), 6.0, 9.0)
+        conductivity = np.clip(np.random.lognormal(5.5, 0.7), 50, 2000)
+        oxygen = np.clip(95 - (temp - 15) * 2 + np.random.normal(0, 10), 30, 120)
+        if np.random.random() < 0.05:
+            turbidity = np.random.lognormal(3, 1)
+        else:
+            turbidity = np.random.lognormal(0.5, 0.8)
+        turbidity = np.clip(turbidity, 0.1, 100)
+        solids = np.clip(turbidity * np.random.uniform(0.8, 2.0) + np.random.normal(5, 2), 1, 200)
+
+        data.append({
+            'COD_ESTACION': np.random.randint(1000000, 9999999),
+            'GLS_ESTACION': station,
+            'FEC_MEDICION': date,
+            'año': date.year,
+            'mes': date.month,
+            'mes_nombre': date.strftime('%B'),
+            'Temperatura Temperatura muestra °C': round(temp, 1),
+            'Ph a 25°C': round(ph, 2),
+            'Conductividad Específica (µS/cm a 25°C)': round(conductivity, 0),
+            'Oxigeno Disuelto (% Saturacion)': round(oxygen, 1),
+            'Turbiedad (NTU)': round(turbidity, 2),
+            'Solidos Suspendidos Totales ': round(solids, 1)
+        })
+
+    return pd.DataFrame(data)
+
+
+def _timeit(func, *args, repeat=3):
+    """Mejor tiempo de varias ejecuciones"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(sizes):
+    print(f"{'registros':>12} {'original (s)':>14} {'vectorizado (s)':>16} {'aceleración':>12}")
+    for n in sizes:
+        new_time, new_df = _timeit(create_demo_water_data, n)
+        if n <= LEGACY_MAX_RECORDS:
+            old_time, old_df = _timeit(create_demo_water_data_legacy, n, repeat=1)
+            assert list(old_df.columns) == list(new_df.columns), "El esquema de columnas difiere"
+            print(f"{n:>12,} {old_time:>14.3f} {new_time:>16.4f} {old_time / new_time:>11.0f}x")
+        else:
+            print(f"{n:>12,} {'-':>14} {new_time:>16.4f} {'-':>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de create_demo_water_data")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[5_000, 50_000, 1_000_000],
+                        help="Tamaños de muestra a evaluar")
+    args = parser.parse_args()
+    run(args.sizes)
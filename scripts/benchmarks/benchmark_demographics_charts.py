@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark de construcción de figuras de la app demográfica
+==========================================================
+
+Compara la construcción original de las figuras de tendencias (un
+``add_trace`` por nombre y década recorriendo ``iterrows``, un
+``add_annotation`` por evento y subgráfico, un ``add_vline`` por evento)
+con los constructores de ``modules.demographics_charts``, que emiten un
+trazo por nombre y agregan anotaciones y líneas en un solo ``update_layout``.
+
+Los rollups se calculan sobre datos sintéticos del tamaño indicado (por
+defecto el conjunto completo, ~50.000 nombres por género) o se leen de un
+almacén ya construido con ``--rollups``.
+
+Uso:
+    python scripts/benchmarks/benchmark_demographics_charts.py
+    python scripts/benchmarks/benchmark_demographics_charts.py --names 100000 --top-k 5 10
+    python scripts/benchmarks/benchmark_demographics_charts.py --rollups app/data/demographics_rollups
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Agregar el directorio de apps al path para imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "app" / "apps"))
+
+from modules.demographics_charts import add_event_lines, build_name_trends_figure
+from modules.demographics_rollups import DemographicsRollupStore, build_demographics_rollups
+from modules.synthetic_demographics import generate_synthetic_demographics
+
+# Mismos valores que demographics_app_new.py
+DECADES = list(range(1910, 2020, 10))
+HISTORICAL_EVENTS = {
+    1918: "Fin de la Primera Guerra Mundial",
+    1929: "Gran Depresión",
+    1945: "Fin de la Segunda Guerra Mundial",
+    1946: "Inicio del Baby Boom",
+    1964: "Fin del Baby Boom",
+    1973: "Crisis del petróleo",
+    1991: "Fin de la Guerra Fría",
+    2007: "Inicio de la Gran Recesión"
+}
+
+
+def build_name_trends_figure_legacy(decade_top, name_history, top_k=5):
+    """Construcción original trazo por trazo, conservada sólo como referencia"""
+    fig = make_subplots(
+        rows=2, cols=1,
+        subplot_titles=('Nombres Masculinos más Populares por Década',
+                        'Nombres Femeninos más Populares por Década'),
+        vertical_spacing=0.15, shared_xaxes=True, x_title="Década"
+    )
+    for gender_idx, gender in enumerate(['M', 'F']):
+        gender_top = decade_top[(decade_top['gender'] == gender) & (decade_top['rank'] <= top_k)]
+        gender_history = name_history[name_history['gender'] == gender]
+        for decade, top_names in gender_top.groupby('decade'):
+            for _, row in top_names.iterrows():
+                history = gender_history[gender_history['name'] == row['name']]
+                fig.add_trace(
+                    go.Scatter(
+                        x=history['decade'], y=history['total_count'], mode='lines+markers',
+                        name=row['name'], line=dict(width=2), marker=dict(size=6),
+                        showlegend=decade == 2010, legendgroup=row['name']
+                    ),
+                    row=gender_idx + 1, col=1
+                )
+    for gender_idx in range(2):
+        for year, event in HISTORICAL_EVENTS.items():
+            decade = (year // 10) * 10
+            if decade not in DECADES:
+                continue
+            fig.add_annotation(
+                x=decade, y=0.9, text=f"{year}: {event}", showarrow=True, arrowhead=2, ax=0, ay=-40,
+                row=gender_idx + 1, col=1, bgcolor="rgba(255, 255, 255, 0.8)",
+                bordercolor="#c7c7c7", borderwidth=1, font=dict(size=10)
+            )
+    for row in (1, 2):
+        fig.update_xaxes(title_text="Década", row=row, col=1, tickmode='array', tickvals=DECADES)
+        fig.update_yaxes(title_text="Número de Nacimientos", row=row, col=1)
+    return fig
+
+
+def historical_figure(yearly_totals, legacy):
+    """Área apilada por género con las líneas de eventos históricos"""
+    fig = go.Figure()
+    for gender in ['M', 'F']:
+        gender_data = yearly_totals[yearly_totals['gender'] == gender]
+        fig.add_trace(go.Scatter(x=gender_data['year'], y=gender_data['count'], mode='lines',
+                                 line=dict(width=0), stackgroup='one'))
+    x_min, x_max = yearly_totals['year'].min(), yearly_totals['year'].max()
+    if not legacy:
+        return add_event_lines(fig, HISTORICAL_EVENTS, x_min, x_max)
+    for year, event in HISTORICAL_EVENTS.items():
+        if x_min <= year <= x_max:
+            fig.add_vline(
+                x=year, line_width=1, line_dash="dash", line_color="rgba(0, 0, 0, 0.3)",
+                annotation_text=f"{year}: {event}", annotation_position="top",
+                annotation=dict(font_size=10, font_color="black", bgcolor="white",
+                                bordercolor="black", borderwidth=1)
+            )
+    return fig
+
+
+def _timeit(func, *args, repeat=5):
+    """Mejor tiempo de varias ejecuciones"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def load_rollups(args):
+    if args.rollups:
+        store = DemographicsRollupStore(args.rollups)
+        if not store.available:
+            sys.exit(f"❌ No hay rollups en {args.rollups}")
+        return {name: store.load(name) for name in store.names()}
+    start = time.perf_counter()
+    frames = generate_synthetic_demographics(names_per_gender=args.names)
+    rollups = build_demographics_rollups(**frames, top_k_decade=max(args.top_k))
+    print(f"Datos sintéticos: {len(frames['data']):,} filas, rollups en {time.perf_counter() - start:.2f} s")
+    return rollups
+
+
+def run(args):
+    rollups = load_rollups(args)
+    decade_top, name_history = rollups['decade_top'], rollups['name_history']
+
+    print(f"\n{'figura':<24} {'trazos':>14} {'original (ms)':>14} {'por lotes (ms)':>15} {'aceleración':>12}")
+    for top_k in args.top_k:
+        old_time, old_fig = _timeit(build_name_trends_figure_legacy, decade_top, name_history, top_k)
+        new_time, new_fig = _timeit(build_name_trends_figure, decade_top, name_history, DECADES,
+                                    HISTORICAL_EVENTS, top_k)
+        traces = f"{len(old_fig.data)} -> {len(new_fig.data)}"
+        print(f"{'tendencias (top ' + str(top_k) + ')':<24} {traces:>14} {old_time * 1000:>14.1f} "
+              f"{new_time * 1000:>15.1f} {old_time / new_time:>11.1f}x")
+
+    if 'yearly_totals' in rollups:
+        old_time, _ = _timeit(historical_figure, rollups['yearly_totals'], True)
+        new_time, _ = _timeit(historical_figure, rollups['yearly_totals'], False)
+        print(f"{'eventos históricos':<24} {'-':>14} {old_time * 1000:>14.1f} "
+              f"{new_time * 1000:>15.1f} {old_time / new_time:>11.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de construcción de figuras demográficas")
+    parser.add_argument("--names", type=int, default=50_000, help="Nombres sintéticos por género")
+    parser.add_argument("--top-k", nargs="+", type=int, default=[5, 10], help="Nombres por década y género")
+    parser.add_argument("--rollups", help="Directorio de rollups ya construidos (en vez de datos sintéticos)")
+    run(parser.parse_args())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark de conversión de números en formato chileno
+=====================================================
+
+Compara la conversión original (``astype(str).str.replace(',', '.')`` +
+``pd.to_numeric``) con ``modules.number_parsing.parse_chilean_numbers`` sobre
+una columna sintética con coma decimal, punto de miles, vacíos y ``N/A``.
+
+Se miden dos orígenes de la columna: ``object`` (lo que entrega
+``pd.read_csv`` por defecto) y cadenas Arrow (``dtype_backend='pyarrow'`` o
+lectura por bloques con pyarrow).
+
+Uso:
+    python scripts/benchmarks/benchmark_number_parsing.py
+    python scripts/benchmarks/benchmark_number_parsing.py --rows 1000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "app" / "apps"))
+
+from modules.number_parsing import parse_chilean_numbers
+
+
+def make_column(n_rows, seed=42):
+    """Columna de textos con la mezcla de formatos de los archivos RETC/DGA"""
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.lognormal(3, 2, n_rows), 2)
+    plain = np.char.replace(values.astype(str), '.', ',')
+
+    # ~10% con punto de miles (1.234,56)
+    text = plain.astype(object)
+    thousands = rng.random(n_rows) < 0.10
+    text[thousands] = [f"{v:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+                       for v in values[thousands]]
+
+    # ~2% vacíos y ~1% N/A
+    marker = rng.random(n_rows)
+    text[marker < 0.02] = ''
+    text[(marker >= 0.02) & (marker < 0.03)] = 'N/A'
+    return pd.Series(text, dtype=object)
+
+
+def legacy_parse(series):
+    """Conversión original usada en convert_numeric_columns"""
+    return pd.to_numeric(
+        series.astype(str).str.replace(',', '.', regex=False),
+        errors='coerce'
+    ).fillna(0)
+
+
+def _timeit(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de parse_chilean_numbers")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Filas de la columna sintética")
+    args = parser.parse_args()
+
+    print(f"Generando columna sintética de {args.rows:,} filas...")
+    column = make_column(args.rows)
+    arrow_column = column.astype('string[pyarrow]')
+
+    legacy_time, legacy = _timeit(legacy_parse, column)
+    object_time, parsed = _timeit(parse_chilean_numbers, column, 0)
+    arrow_time, _ = _timeit(parse_chilean_numbers, arrow_column, 0)
+
+    # La versión original sólo es correcta en valores sin punto de miles
+    simple = ~column.str.contains('.', regex=False).to_numpy()
+    assert np.allclose(legacy.to_numpy()[simple], parsed[simple]), "Los resultados difieren"
+    lost = int(((legacy.to_numpy() == 0) & (parsed != 0)).sum())
+
+    print(f"\n{'método':<34} {'segundos':>10} {'aceleración':>12}")
+    print(f"{'original (object)':<34} {legacy_time:>10.2f} {'1x':>12}")
+    print(f"{'parse_chilean_numbers (object)':<34} {object_time:>10.2f} {legacy_time / object_time:>11.1f}x")
+    print(f"{'parse_chilean_numbers (Arrow)':<34} {arrow_time:>10.2f} {legacy_time / arrow_time:>11.1f}x")
+    print(f"\nValores con punto de miles que la versión original convertía en 0: {lost:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark del simulador de reasignaciones
+=========================================
+
+Mide lo que cuesta actualizar las métricas de concentración después de
+mover un monto entre dos entidades:
+
+- recálculo desde los registros (modificar el DataFrame, ``groupby`` y las
+  fórmulas originales de ``calculate_concentration_metrics``), la forma directa
+- recálculo desde los totales por entidad con ``concentration_metrics``
+- actualización incremental O(log n) de ``modules.reallocation``
+
+y comprueba que las tres den las mismas métricas (salvo redondeo).
+
+Uso:
+    python scripts/benchmarks/benchmark_reallocation.py
+    python scripts/benchmarks/benchmark_reallocation.py --entities 100 10000 1000000 --moves 200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio de apps al path para imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "app" / "apps"))
+
+from modules.concentration import concentration_metrics
+from modules.reallocation import ReallocationSimulator
+
+# Registros por entidad en el DataFrame de la versión "desde los registros"
+ROWS_PER_ENTITY = 5
+
+
+def metrics_from_records(df):
+    """Fórmulas originales de calculate_concentration_metrics sobre los registros, sólo como referencia"""
+    grouped = df.groupby('Entidad')['Monto Pesos'].sum().sort_values(ascending=False)
+    total = grouped.sum()
+    top_3_pct = (grouped.head(3).sum() / total) * 100
+    top_10_pct = (grouped.head(10).sum() / total) * 100
+    shares = (grouped / total) * 100
+    hhi = (shares ** 2).sum() / 10000
+    return hhi, top_3_pct, top_10_pct
+
+
+def run(args):
+    rng = np.random.default_rng(42)
+    print(f"{'entidades':>10} {'desde registros (ms)':>21} {'desde totales (ms)':>19} "
+          f"{'incremental (µs)':>17} {'aceleración':>12}")
+    for n in args.entities:
+        values = np.round(rng.lognormal(17, 2, n))
+        moves = [(int(rng.integers(n)), int(rng.integers(n)), float(rng.random())) for _ in range(args.moves)]
+
+        df = pd.DataFrame({
+            'Entidad': np.repeat(np.arange(n), ROWS_PER_ENTITY),
+            'Monto Pesos': np.repeat(values / ROWS_PER_ENTITY, ROWS_PER_ENTITY)
+        })
+        first_row = np.arange(n) * ROWS_PER_ENTITY
+        record_moves = moves[:max(1, args.moves // 10)]  # La versión por registros es lenta
+        start = time.perf_counter()
+        for source, target, fraction in record_moves:
+            amount = df['Monto Pesos'].iat[first_row[source]] * fraction
+            df.iat[first_row[source], 1] -= amount
+            df.iat[first_row[target], 1] += amount
+            metrics_from_records(df)
+        records_time = (time.perf_counter() - start) / len(record_moves)
+
+        current = values.copy()
+        simulator = ReallocationSimulator(values)
+        totals_time = incremental_time = 0.0
+        for source, target, fraction in moves:
+            amount = current[source] * fraction
+            current[source] -= amount
+            current[target] += amount
+            start = time.perf_counter()
+            exact = concentration_metrics(current)
+            totals_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            simulator.transfer(source, target, simulator.value(source) * fraction)
+            metrics = simulator.metrics()
+            incremental_time += time.perf_counter() - start
+        totals_time /= len(moves)
+        incremental_time /= len(moves)
+
+        for field in ('hhi', 'gini', 'theil', 'top_3_pct', 'top_10_pct'):
+            a, b = getattr(exact, field), getattr(metrics, field)
+            assert abs(a - b) <= 1e-9 * max(1.0, abs(a)), (field, a, b)
+        print(f"{n:>10,} {records_time * 1000:>21.2f} {totals_time * 1000:>19.3f} "
+              f"{incremental_time * 1e6:>17.1f} {records_time / incremental_time:>11.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del simulador de reasignaciones")
+    parser.add_argument("--entities", nargs="+", type=int, default=[30, 1_000, 100_000],
+                        help="Entidades del nivel simulado")
+    parser.add_argument("--moves", type=int, default=100, help="Transferencias a simular")
+    run(parser.parse_args())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark de ingesta de archivos RETC
+=====================================
+
+Genera un CSV sintético con el formato del RETC (separador ';', coma decimal)
+y mide filas/segundo y RSS máximo para:
+
+- ``full``: lectura completa con ``pd.read_csv`` + ``process_real_emissions_data``
+- ``stream-pandas`` / ``stream-pyarrow``: ingesta por bloques de ``stream_emissions_data``
+
+La generación del CSV y cada modo corren en subprocesos separados para que el
+RSS máximo de cada medición sea comparable (Linux hereda el máximo del padre).
+Sirve para dimensionar instancias de Cloud Run con archivos RETC multianuales.
+
+Uso:
+    python scripts/benchmarks/benchmark_retc_ingestion.py --rows 2000000
+    python scripts/benchmarks/benchmark_retc_ingestion.py --csv data/raw/retc_emisiones_aire_2023.csv
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APPS_DIR = Path(__file__).resolve().parents[2] / "app" / "apps"
+sys.path.insert(0, str(APPS_DIR))
+
+from modules.config import CHILE_REGIONS
+
+MODES = ['full', 'stream-pandas', 'stream-pyarrow']
+
+
+def write_synthetic_retc(path, n_rows, seed=42, block=500_000):
+    """Escribe un CSV sintético con columnas y formato del RETC"""
+    rng = np.random.default_rng(seed)
+    regions = np.array(list(CHILE_REGIONS.keys()))
+    sectors = np.array([f"Actividad CIIU {code}" for code in range(100, 400)])
+    sources = np.array(['Caldera Industrial', 'Horno de Panadería', 'Grupo Electrógeno',
+                        'Turbina de Gas', 'Horno de Cal', 'Secador de Madera'])
+    pollutants = np.array(['Carbon dioxide', 'Carbon monoxide', 'Nitrogen oxides (NOx)',
+                           'PM10, primary', 'Mercury', 'Benzene'])
+
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("id;region;razon_social;ciiu4;tipo_fuente;contaminante;cantidad_toneladas\n")
+        while written < n_rows:
+            n = min(block, n_rows - written)
+            quantities = np.char.replace(
+                np.round(rng.lognormal(2, 2, n), 4).astype(str), '.', ','
+            )
+            frame = pd.DataFrame({
+                'id': np.arange(written, written + n),
+                'region': regions[rng.integers(0, len(regions), n)],
+                'razon_social': np.char.add('Empresa ', rng.integers(0, 20_000, n).astype(str)),
+                'ciiu4': sectors[rng.integers(0, len(sectors), n)],
+                'tipo_fuente': sources[rng.integers(0, len(sources), n)],
+                'contaminante': pollutants[rng.integers(0, len(pollutants), n)],
+                'cantidad_toneladas': quantities
+            })
+            frame.to_csv(f, sep=';', index=False, header=False)
+            written += n
+
+
+def run_mode(mode, csv_path, chunksize):
+    """Ejecuta un modo en este proceso y retorna sus métricas"""
+    from modules.emissions_stream import stream_emissions_data, get_peak_rss_mb
+
+    start = time.perf_counter()
+    if mode == 'full':
+        from modules.emissions import process_real_emissions_data
+        raw = pd.read_csv(csv_path, sep=';', encoding='utf-8', low_memory=False, on_bad_lines='skip')
+        rows = len(raw)
+        data = process_real_emissions_data(raw)
+    else:
+        data, stats = stream_emissions_data(csv_path, chunksize=chunksize, engine=mode.split('-')[1])
+        rows = stats['rows']
+    elapsed = time.perf_counter() - start
+
+    return {
+        'mode': mode,
+        'rows': rows,
+        'seconds': elapsed,
+        'rows_per_sec': rows / elapsed,
+        'peak_rss_mb': get_peak_rss_mb(),
+        'total_emissions': float(data['regions']['emisiones_totales_ton'].sum())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de ingesta de CSV RETC")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Filas del CSV sintético")
+    parser.add_argument("--csv", help="Usar un CSV RETC existente en lugar del sintético")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Filas por bloque")
+    # Uso interno (subprocesos)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--generate", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.csv, args.chunksize)))
+        return
+    if args.generate:
+        write_synthetic_retc(args.generate, args.rows)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv
+        if csv_path is None:
+            csv_path = str(Path(tmp) / "retc_sintetico.csv")
+            print(f"Generando CSV sintético de {args.rows:,} filas...")
+            subprocess.run(
+                [sys.executable, __file__, "--generate", csv_path, "--rows", str(args.rows)],
+                check=True
+            )
+        size_mb = Path(csv_path).stat().st_size / 1024 ** 2
+        print(f"Archivo: {csv_path} ({size_mb:,.0f} MB)\n")
+
+        print(f"{'modo':<16} {'filas':>12} {'segundos':>10} {'filas/s':>12} {'RSS máx (MB)':>14}")
+        for mode in MODES:
+            completed = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--csv", csv_path,
+                 "--chunksize", str(args.chunksize)],
+                capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                print(f"{mode:<16} error: {completed.stderr.strip().splitlines()[-1]}")
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            rss = f"{result['peak_rss_mb']:,.0f}" if result['peak_rss_mb'] else "n/d"
+            print(f"{mode:<16} {result['rows']:>12,} {result['seconds']:>10.2f} "
+                  f"{result['rows_per_sec']:>12,.0f} {rss:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark del generador de datos demográficos sintéticos
+========================================================
+
+Compara la implementación original de ``DemographicsApp.generate_synthetic_data``
+(un registro por iteración sobre décadas, nombres, años y géneros) con el
+generador vectorizado de ``modules.synthetic_demographics``.
+
+Con ``--output`` escribe además los CSV del último tamaño con los
+nombres que espera ``scripts/build_demographics_rollups.py``, para pruebas
+de carga con el conjunto completo.
+
+Uso:
+    python scripts/benchmarks/benchmark_synthetic_demographics.py
+    python scripts/benchmarks/benchmark_synthetic_demographics.py --names 15 1000 50000
+    python scripts/benchmarks/benchmark_synthetic_demographics.py --names 50000 --output /tmp/demografia
+    python scripts/build_demographics_rollups.py --raw-csv /tmp/demografia/nombres_demografia.csv \\
+        --extra-dir /tmp/demografia --output /tmp/demografia/rollups
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio de apps al path para imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "app" / "apps"))
+
+from modules.demographics_rollups import EXTRA_SOURCES
+from modules.synthetic_demographics import SYNTHETIC_DECADES, _names_for_gender, generate_synthetic_demographics
+
+# Sobre este número de nombres por género la versión por filas se omite
+LEGACY_MAX_NAMES = 5_000
+
+
+def generate_synthetic_demographics_legacy(names_per_gender=15):
+    """Implementación original por filas, conservada sólo como referencia"""
+    np.random.seed(42)
+    decades = list(range(1910, 2020, 10))
+    names = {g: list(_names_for_gender(g, names_per_gender)) for g in ('M', 'F')}
+    records = []
+    for decade in decades:
+        for gender in ('M', 'F'):
+            for name in names[gender]:
+                base_count = np.random.randint(1000, 20000)
+                peak_decade = np.random.choice(decades)
+                time_factor = 1 - min(abs(decade - peak_decade), 50) / 50
+                count = int(base_count * (0.5 + time_factor))
+                records.append({'decade': decade, 'name': name, 'gender': gender, 'total_count': count})
+    data = pd.DataFrame(records)
+
+    gender_records = []
+    for year in range(1910, 2014):
+        male_count = int(np.random.normal(100000, 10000))
+        female_count = int(np.random.normal(95000, 10000))
+        if 1946 <= year <= 1964:
+            boost = (year - 1946) / 2 if year < 1955 else (1964 - year) / 2
+            boost_factor = 1.0 + boost / 10.0
+            male_count = int(male_count * boost_factor)
+            female_count = int(female_count * boost_factor)
+        gender_records.append({'year': year, 'gender': 'M', 'count': male_count})
+        gender_records.append({'year': year, 'gender': 'F', 'count': female_count})
+
+    diversity_records = []
+    for decade in decades:
+        for gender, gender_name in [('M', 'Masculino'), ('F', 'Femenino')]:
+            base_concentration = 80 - (decade - 1910) / 10
+            gender_factor = 1.0 if gender == 'M' else 0.9
+            top_25_percent = max(5, base_concentration * gender_factor)
+            top_50_percent = max(15, min(top_25_percent + 15, 95))
+            diversity_records.append({'decade': decade, 'gender': gender_name, 'top_n': 'Top 25',
+                                      'metric': 'Concentración', 'percentage': top_25_percent})
+            diversity_records.append({'decade': decade, 'gender': gender_name, 'top_n': 'Top 50',
+                                      'metric': 'Concentración', 'percentage': top_50_percent})
+
+    length_records = []
+    for year in range(1910, 2014):
+        for gender, gender_name in [('M', 'Masculino'), ('F', 'Femenino')]:
+            avg_length = 5.5 + (year - 1910) / 100 + (0 if gender == 'M' else 0.8)
+            avg_length += np.random.normal(0, 0.2)
+            length_records.append({'year': year, 'gender': gender_name, 'avg_length': round(avg_length, 2)})
+
+    return {
+        'data': data,
+        'gender_year': pd.DataFrame(gender_records),
+        'diversity': pd.DataFrame(diversity_records),
+        'name_length': pd.DataFrame(length_records)
+    }
+
+
+def _timeit(func, *args, repeat=3):
+    """Mejor tiempo de varias ejecuciones"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _check_schema(old, new):
+    for key in old:
+        assert list(old[key].columns) == list(new[key].columns), f"Columnas distintas en {key}"
+        assert list(old[key].dtypes) == list(new[key].dtypes), f"Tipos distintos en {key}"
+        assert len(old[key]) == len(new[key]), f"Número de filas distinto en {key}"
+
+
+def write_csvs(frames, output):
+    """Escribe las tablas con los nombres de archivo que lee build_demographics_rollups.py"""
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    frames['data'].to_csv(output / 'nombres_demografia.csv', index=False)
+    for key, file_name in EXTRA_SOURCES.items():
+        frames[key].to_csv(output / file_name, index=False)
+    print(f"📁 CSV escritos en {output}")
+
+
+def run(sizes, output=None):
+    print(f"{'nombres/género':>15} {'filas':>12} {'original (s)':>14} {'vectorizado (s)':>16} {'aceleración':>12}")
+    frames = None
+    for n in sizes:
+        new_time, frames = _timeit(generate_synthetic_demographics, n)
+        rows = len(frames['data'])
+        if n <= LEGACY_MAX_NAMES:
+            old_time, old_frames = _timeit(generate_synthetic_demographics_legacy, n, repeat=1)
+            _check_schema(old_frames, frames)
+            print(f"{n:>15,} {rows:>12,} {old_time:>14.3f} {new_time:>16.4f} {old_time / new_time:>11.0f}x")
+        else:
+            print(f"{n:>15,} {rows:>12,} {'-':>14} {new_time:>16.4f} {'-':>12}")
+    if output and frames is not None:
+        write_csvs(frames, output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de generate_synthetic_demographics")
+    parser.add_argument("--names", nargs="+", type=int, default=[15, 1_000, 50_000],
+                        help="Nombres por género a evaluar")
+    parser.add_argument("--output", help="Directorio donde escribir los CSV del último tamaño")
+    args = parser.parse_args()
+    print(f"Décadas: {SYNTHETIC_DECADES[0]}-{SYNTHETIC_DECADES[-1]}")
+    run(args.names, args.output)
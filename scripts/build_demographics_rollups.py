@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Construcción de los rollups de la app demográfica
+=================================================
+
+Lee ``nombres_demografia.csv`` y los CSV adicionales de
+``notebooks/visualizaciones/demographics`` y escribe los rollups en Parquet
+definidos en ``modules/demographics_rollups.py``. Se ejecuta al construir
+la imagen de Docker, para que la app nunca tenga que leer el CSV original.
+
+Uso:
+    python scripts/build_demographics_rollups.py
+    python scripts/build_demographics_rollups.py --output /tmp/rollups --top-k-decade 20
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Agregar el directorio de apps al path para imports
+sys.path.insert(0, str(ROOT / "app" / "apps"))
+
+from modules.config import DEMOGRAPHICS_ROLLUP_CONFIG
+from modules.demographics_rollups import (
+    DemographicsRollupStore,
+    build_demographics_rollups,
+    read_demographics_sources
+)
+
+
+def build(output=None, raw_csv=None, extra_dir=None, top_k_decade=None, top_k_all_time=None):
+    """Construye el almacén y retorna False si no se encontró el CSV de nombres"""
+    raw_csv = raw_csv or DEMOGRAPHICS_ROLLUP_CONFIG['raw_csv']
+    extra_dir = extra_dir or DEMOGRAPHICS_ROLLUP_CONFIG['extra_dir']
+
+    sources = read_demographics_sources(raw_csv, extra_dir)
+    if sources['data'] is None:
+        print(f"❌ No se encontró {raw_csv}")
+        return False
+
+    data = sources.pop('data')
+    rollups = build_demographics_rollups(
+        data,
+        top_k_decade=top_k_decade,
+        top_k_all_time=top_k_all_time,
+        **sources
+    )
+
+    store = DemographicsRollupStore(output)
+    store.write(rollups, sources={
+        'raw_csv': str(raw_csv),
+        'raw_rows': len(data),
+        'extra': sorted(key for key, frame in sources.items() if frame is not None)
+    })
+
+    for name, info in store.manifest['rollups'].items():
+        print(f"✅ {name}: {info['rows']} filas ({info['bytes']:,} bytes)")
+    missing = sorted(key for key, frame in sources.items() if frame is None)
+    if missing:
+        print(f"⏭️  Sin datos de origen: {', '.join(missing)}")
+    print(f"📁 Rollups: {store.path}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construye los rollups en Parquet de la app demográfica")
+    parser.add_argument("--output", help="Directorio de salida (por defecto DEMOGRAPHICS_ROLLUP_DIR)")
+    parser.add_argument("--raw-csv", help="Ruta de nombres_demografia.csv")
+    parser.add_argument("--extra-dir", help="Directorio de los CSV adicionales")
+    parser.add_argument("--top-k-decade", type=int, help="Nombres por década y género")
+    parser.add_argument("--top-k-all-time", type=int, help="Nombres por género en el ranking histórico")
+
+    args = parser.parse_args()
+    ok = build(args.output, args.raw_csv, args.extra_dir, args.top_k_decade, args.top_k_all_time)
+    sys.exit(0 if ok else 1)
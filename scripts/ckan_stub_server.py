@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita ``datastore_search`` de CKAN
+=====================================================
+
+Sirve un recurso sintético con la estructura de la Ley de Presupuestos
+(Partida, Capitulo, Programa, Subtitulo, Denominacion, Monto Pesos, Monto
+Dolar) para probar y medir la descarga del presupuesto sin conexión.
+
+Soporta lo que usa ``modules.ckan_fetcher``: ``limit``/``offset``,
+``include_total``, ``records_format=lists|objects``, respuestas con gzip y
+un tope de filas por consulta como ``ckan.datastore.search.rows_max``.
+Opcionalmente agrega latencia y errores 500 aleatorios para probar los
+reintentos.
+
+Uso:
+    python scripts/ckan_stub_server.py --rows 200000 --port 8765
+    BUDGET_API_URL=http://127.0.0.1:8765/api/3/action/datastore_search streamlit run app/main.py
+
+Desde Python (pruebas y benchmarks):
+    with CKANStubServer(rows=50000) as server:
+        df = CKANDatastoreFetcher(server.url).fetch_frame(server.resource_id)
+"""
+
+import argparse
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+# Mismo recurso que AppConfig.RESOURCE_ID en budget_analysis_app_v2.py
+DEFAULT_RESOURCE_ID = '372b0680-d5f0-4d53-bffa-7997cf6e6512'
+DATASTORE_PATH = '/api/3/action/datastore_search'
+
+FIELDS = [
+    {'id': '_id', 'type': 'int'},
+    {'id': 'Partida', 'type': 'text'},
+    {'id': 'Capitulo', 'type': 'text'},
+    {'id': 'Programa', 'type': 'text'},
+    {'id': 'Subtitulo', 'type': 'text'},
+    {'id': 'Denominacion', 'type': 'text'},
+    {'id': 'Monto Pesos', 'type': 'numeric'},
+    {'id': 'Monto Dolar', 'type': 'numeric'}
+]
+
+SUBTITULOS = {
+    '21': 'Gastos en Personal',
+    '22': 'Bienes y Servicios de Consumo',
+    '24': 'Transferencias Corrientes',
+    '29': 'Adquisición de Activos No Financieros',
+    '31': 'Iniciativas de Inversión',
+    '33': 'Transferencias de Capital'
+}
+
+
+def make_budget_records(rows, seed=42):
+    """
+    Filas sintéticas del presupuesto como listas en el orden de ``FIELDS``.
+
+    Los códigos de Capitulo y Programa se repiten entre partidas, como en
+    los datos reales; los montos siguen una distribución log-normal (pocas
+    partidas concentran gran parte del gasto).
+    """
+    rng = np.random.default_rng(seed)
+    partida = rng.zipf(1.6, rows) % 30 + 1
+    capitulo = rng.integers(1, 6, rows)
+    programa = rng.integers(1, 5, rows)
+    subtitulo_codes = np.array(list(SUBTITULOS))
+    subtitulo = subtitulo_codes[rng.integers(0, len(subtitulo_codes), rows)]
+    pesos = np.round(rng.lognormal(17, 2, rows), 0)
+    dolar = np.round(pesos / 950, 2)
+
+    return [
+        [i + 1, f"{p:02d}", f"{c:02d}", f"{g:02d}", s, SUBTITULOS[s], float(mp), float(md)]
+        for i, (p, c, g, s, mp, md) in enumerate(zip(
+            partida.tolist(), capitulo.tolist(), programa.tolist(), subtitulo.tolist(),
+            pesos.tolist(), dolar.tolist()
+        ))
+    ]
+
+
+class _DatastoreHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server.stub
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        server.record_request()
+
+        if server.latency:
+            time.sleep(server.latency)
+        if url.path != DATASTORE_PATH:
+            return self._send_json(404, {'success': False, 'error': {'message': 'Not found'}})
+        if params.get('resource_id') != server.resource_id:
+            return self._send_json(404, {'success': False, 'error': {'message': 'Resource not found', '__type': 'Not Found Error'}})
+        if server.fail_rate and server.rng_random() < server.fail_rate:
+            return self._send_json(500, {'success': False, 'error': {'message': 'Internal Server Error'}})
+
+        try:
+            offset = max(0, int(params.get('offset', 0)))
+            limit = max(0, min(int(params.get('limit', 100)), server.rows_max))
+        except ValueError:
+            return self._send_json(409, {'success': False, 'error': {'message': 'Invalid limit/offset'}})
+
+        rows = server.records[offset:offset + limit]
+        if params.get('records_format') != 'lists':
+            names = [field['id'] for field in FIELDS]
+            rows = [dict(zip(names, row)) for row in rows]
+
+        result = {
+            'resource_id': server.resource_id,
+            'fields': FIELDS,
+            'records': rows,
+            'limit': limit,
+            'offset': offset
+        }
+        if params.get('include_total', 'true') == 'true':
+            result['total'] = len(server.records)
+        self._send_json(200, {'success': True, 'result': result})
+
+
+class CKANStubServer:
+    """Servidor ``datastore_search`` en un hilo, para pruebas y benchmarks"""
+
+    def __init__(self, rows=20000, resource_id=DEFAULT_RESOURCE_ID, host='127.0.0.1', port=0,
+                 rows_max=32000, latency=0.0, fail_rate=0.0, seed=42):
+        self.resource_id = resource_id
+        self.records = make_budget_records(rows, seed)
+        self.rows_max = rows_max
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.requests = 0
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _DatastoreHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{DATASTORE_PATH}"
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def rng_random(self):
+        with self._lock:
+            return self._rng.random()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita datastore_search de CKAN")
+    parser.add_argument("--rows", type=int, default=100_000, help="Filas del recurso sintético")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rows-max", type=int, default=32000, help="Tope de filas por consulta")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia agregada por consulta (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fracción de consultas que responden 500")
+    args = parser.parse_args()
+
+    server = CKANStubServer(args.rows, port=args.port, rows_max=args.rows_max,
+                            latency=args.latency, fail_rate=args.fail_rate)
+    print(f"📡 datastore_search en {server.url} (resource_id={server.resource_id}, {args.rows:,} filas)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server._httpd.server_close()
@@ -38,9 +38,11 @@ def export_budget_visualizations():
         df = app.fetch_budget_data()
         
         if df is not None:
+            # Los gráficos leen el cubo del presupuesto, cacheado por la huella de los datos
+            cube = app.get_budget_cube()
             for nivel in app.config.NIVELES:
                 # Exportar análisis de distribución
-                fig_dist = app.plot_distribution_analysis(df, nivel)
+                fig_dist = app.plot_distribution_analysis(app.get_concentration()[nivel], nivel)
                 fig_dist.update_layout(
                     title=f'Análisis de Desigualdad en la Distribución - {nivel}',
                     height=600,
@@ -56,7 +58,7 @@ def export_budget_visualizations():
                 print(f"  ✓ Exportado: {output_path}")
                 
                 # Exportar evolución presupuestaria
-                fig_evol = app.plot_budget_evolution(df, nivel)
+                fig_evol = app.plot_budget_evolution(cube, nivel)
                 fig_evol.update_layout(
                     title=f'Simulación de Evolución Presupuestaria - Top 5 {nivel}s',
                     height=600,
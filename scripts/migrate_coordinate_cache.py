@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Migración de caches de coordenadas JSON a SQLite
+================================================
+
+Importa los caches JSON de coordenadas (el de ``geo_utils`` y los de
+``GeocodificadorChile`` en ``notebooks/``) al almacén SQLite compartido
+definido en ``COORDINATE_STORE_CONFIG``.
+
+Uso:
+    python scripts/migrate_coordinate_cache.py                  # archivos conocidos del proyecto
+    python scripts/migrate_coordinate_cache.py cache.json --db /tmp/coordenadas.sqlite
+    python scripts/migrate_coordinate_cache.py --overwrite      # reemplaza entradas existentes
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Agregar el directorio de apps al path para imports
+sys.path.insert(0, str(ROOT / "app" / "apps"))
+
+from modules.coordinate_store import CoordinateStore
+
+# Caches JSON existentes en el proyecto y la procedencia con que se registran
+DEFAULT_SOURCES = {
+    ROOT / "app" / "data" / "cache_coordenadas_chile.json": 'geo_utils',
+    ROOT / "notebooks" / "cache_coordenadas_chile.json": 'geocodificador',
+    ROOT / "notebooks" / "cache_coordenadas_agua.json": 'geocodificador'
+}
+
+
+def migrate(json_files, db_path=None, overwrite=False):
+    """Importa cada archivo JSON al almacén y retorna el total de entradas importadas"""
+    store = CoordinateStore(db_path)
+    total = 0
+    for json_path, source in json_files.items():
+        if not Path(json_path).exists():
+            print(f"⏭️  {json_path}: no existe")
+            continue
+        try:
+            imported = store.import_json(json_path, source=source, overwrite=overwrite)
+            total += imported
+            print(f"✅ {json_path}: {imported} entradas importadas")
+        except Exception as e:
+            print(f"❌ {json_path}: {e}")
+
+    print(f"📊 Entradas en el almacén: {store.count()}")
+    print(f"📁 Base de datos: {store.path}")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra caches de coordenadas JSON al almacén SQLite")
+    parser.add_argument("files", nargs="*", help="Archivos JSON a importar (por defecto los del proyecto)")
+    parser.add_argument("--db", help="Archivo SQLite (por defecto COORDINATE_DB_PATH)")
+    parser.add_argument("--source", default="json", help="Procedencia para los archivos indicados")
+    parser.add_argument("--overwrite", action="store_true", help="Reemplazar entradas existentes")
+
+    args = parser.parse_args()
+    files = {Path(f): args.source for f in args.files} if args.files else DEFAULT_SOURCES
+    migrate(files, args.db, args.overwrite)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Precalentamiento del caché de datos
+===================================
+
+Descarga las fuentes remotas configuradas en ``DATA_SOURCES`` y las deja
+guardadas en el caché Parquet, de modo que el primer arranque del contenedor
+no tenga que descargar ni parsear el Excel de la DGA.
+
+Uso:
+    python scripts/prewarm_data_cache.py            # respeta el TTL
+    python scripts/prewarm_data_cache.py --force    # revalida contra el servidor
+    python scripts/prewarm_data_cache.py --clear    # borra el caché antes de descargar
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Agregar el directorio de apps al path para imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app" / "apps"))
+
+from modules.config import DATA_SOURCES
+from modules.data_cache import ParquetDataCache, get_cache_stats
+from modules.data_loaders import parse_water_quality_content
+
+# Parser asociado a cada fuente de DATA_SOURCES
+PARSERS = {
+    'water_quality': parse_water_quality_content
+}
+
+
+def prewarm(sources, cache_dir=None, force=False, clear=False):
+    """Descarga y guarda en caché las fuentes indicadas"""
+    cache = ParquetDataCache(cache_dir=cache_dir)
+    if clear:
+        cache.clear()
+
+    failures = 0
+    for name in sources:
+        url = DATA_SOURCES[name]
+        start = time.perf_counter()
+        try:
+            df, status = cache.get_frame(url, PARSERS[name], force_refresh=force)
+            elapsed = time.perf_counter() - start
+            print(f"✅ {name}: {status} - {len(df):,} filas en {elapsed:.2f}s")
+        except Exception as e:
+            failures += 1
+            print(f"❌ {name}: {e}")
+
+    print(f"📊 Estadísticas del caché: {get_cache_stats()}")
+    print(f"📁 Directorio: {cache.cache_dir}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precalienta el caché Parquet de fuentes de datos")
+    parser.add_argument("sources", nargs="*", choices=sorted(PARSERS), default=sorted(PARSERS),
+                        help="Fuentes a descargar (por defecto todas)")
+    parser.add_argument("--cache-dir", help="Directorio del caché (por defecto DATA_CACHE_DIR)")
+    parser.add_argument("--force", action="store_true", help="Revalidar aunque la entrada esté vigente")
+    parser.add_argument("--clear", action="store_true", help="Borrar el caché antes de descargar")
+
+    args = parser.parse_args()
+    sys.exit(1 if prewarm(args.sources, args.cache_dir, args.force, args.clear) else 0)